@@ -15,3 +15,73 @@ RISK = r""
 # Absolute path to the NARA Preservation Action Plans CSV. Download from:
 # https://github.com/usnationalarchives/digital-preservation/tree/master/Digital_Preservation_Plan_Spreadsheet
 NARA = r""
+
+# Optional. The number of FITS processes to run at once when making FITS XML for a new accession.
+# Each process is a separate Java program, so use no more than the number of processor cores. Default is 1.
+FITS_WORKERS = 1
+
+# Optional. The most files given to one FITS process when making FITS XML.
+# Larger batches start FITS fewer times. Default is 500.
+FITS_BATCH_SIZE = 500
+
+# Optional. How FITS is run: "command" starts the FITS command line tool for each batch of files (default),
+# "daemon" sends files to FITS processes that keep running until the script ends, so Java does not start again
+# for each batch, and "service" sends files to the FITS web service, which keeps running between runs of the script.
+FITS_BACKEND = "command"
+
+# Required if FITS_BACKEND is "daemon". The command that starts a FITS daemon, which reads file paths and
+# returns FITS XML as described in FitsDaemon in format_analysis_functions.py. FITS does not include a daemon,
+# so this must start a program that runs FITS this way, and the program (the first part of the command) must exist.
+# To test or time the script without Java, use the stand-in: python path/fits_standin.py --daemon
+FITS_DAEMON = r""
+
+# Required if FITS_BACKEND is "service". The address of the FITS web service (FITS Service, which runs in Tomcat),
+# for example http://localhost:8080/fits. The service must be able to read the accession folder with the same paths.
+FITS_SERVICE = r""
+
+# Optional. Absolute path to a SQLite file (made by the script if it does not exist) to save FITS identifications in,
+# so files with the same content as a file identified before, in any accession, are not identified again.
+# Leave blank to not use a cache.
+FITS_CACHE = r""
+
+# Optional. The largest size of the FITS cache, in MB. The least recently used identifications are deleted
+# when it is larger. Default is 1000.
+FITS_CACHE_SIZE = 1000
+
+# Optional. The most seconds FITS can take for one file before it is stopped, so one file cannot hold up the rest.
+# Files that take longer are tried again at the end with FITS_RETRY_TIMEOUT seconds (default is ten times FITS_TIMEOUT),
+# and are included in the analysis as "Identification Failed" if they still do not finish.
+# Leave out to have no time limit, which is the default. Remove the # from both lines to use a time limit.
+# FITS_TIMEOUT = 600
+# FITS_RETRY_TIMEOUT = 6000
+
+# Optional. "full" (default) to identify every file with all the FITS tools, or "triage" to identify every file with
+# a reduced set of tools first and then only use all the tools for files where that result is ambiguous
+# (more than one format, no PUID, no version, or no NARA match).
+FITS_MODE = "full"
+
+# Required for triage mode. Absolute path to a FITS configuration file (a copy of fits.xml from the FITS folder)
+# with only the tools to use for triage, for example DROID and file utility.
+FITS_TRIAGE_CONFIG = r""
+
+# Optional. File signatures that are certain of the format, so files with them are identified by the script
+# instead of FITS, which is faster for accessions with many small files. Choices: "empty", "gif".
+# "empty" is for files with no content, which get the same format as from FITS ("empty"), but with
+# format_analysis.py instead of the file utility as the identifying tool. Default is none.
+FITS_SIGNATURES = []
+
+# Optional. How FITS XML is saved in the FITS folder: "flat" (default) saves all of it in the FITS folder,
+# "sharded" saves it in 256 subfolders (00 to ff, from the path of the file), which is faster for very large
+# accessions on network drives, and "archive" saves it compressed in one file (fits_archive.db), which is much faster
+# to copy. FITS folders with any of the layouts, or more than one, can be read and updated.
+# Use export-fits-xml.py to save the XML in an archive as files.
+FITS_LAYOUT = "flat"
+
+# Optional. True to only keep the parts of the FITS XML used by the script (identification, file information, and
+# file status) and compress it with gzip (file.ext.fits.xml.gz), which makes the FITS folder much smaller.
+# Default is False, to keep all the FITS XML.
+FITS_COMPRESS = False
+
+# Optional. True to print the most memory the script used after FITS, to check if the computer has enough memory
+# for very large accessions. Default is False.
+REPORT_MEMORY = False
@@ -0,0 +1,40 @@
+"""FITS Archive Exporter
+
+This script saves the FITS XML from the archive in a FITS folder made by format_analysis.py with the archive layout
+(FITS_LAYOUT = "archive" in configuration.py) as one XML file for each file in the accession,
+the same as a FITS folder made with the flat layout.
+
+If an export folder is given, the XML is saved there and the archive is not changed.
+Otherwise, the XML is saved in the FITS folder and the archive is deleted, so the FITS folder has the flat layout
+and format_analysis.py will use the XML files the next time it is run.
+
+Script usage: python /path/to/script /path/to/accession_FITS [/path/to/export_folder]
+"""
+
+import os
+import sys
+from format_analysis_functions import FITS_ARCHIVE, fits_archive
+
+if len(sys.argv) not in (2, 3):
+    print("\nScript usage: python /path/to/script /path/to/accession_FITS [/path/to/export_folder]")
+    sys.exit()
+fits_output = sys.argv[1]
+export_folder = sys.argv[2] if len(sys.argv) == 3 else fits_output
+
+# Verifies the FITS folder has an archive.
+archive = fits_archive(fits_output)
+if archive is None:
+    print(f"\nThere is no {FITS_ARCHIVE} in the FITS folder {fits_output}.")
+    sys.exit()
+
+# Saves the XML from the archive to the export folder.
+if not os.path.exists(export_folder):
+    os.makedirs(export_folder)
+count = archive.export(export_folder)
+archive.close()
+print(f"\nSaved {count} FITS XML files to {export_folder}.")
+
+# If the XML was saved to the FITS folder, deletes the archive so the XML is not in the FITS folder twice.
+if export_folder == fits_output:
+    os.remove(os.path.join(fits_output, FITS_ARCHIVE))
+    print(f"Deleted {FITS_ARCHIVE}, since the FITS folder now has the XML files.")
@@ -0,0 +1,167 @@
+"""
+Purpose: a pure-Python stand-in for FITS, which makes FITS XML with made up format identifications,
+so format_analysis.py can be tested and timed on a machine without Java or FITS.
+
+The format identification is based only on the file extension (see FORMATS),
+but the file information (path, name, size, MD5, and date last modified) is calculated from the file,
+so the XML works with the rest of format_analysis.py the same as XML made by FITS.
+
+Script usage, the same as the FITS command line tool:
+    python path/fits_standin.py -i path/file -o path/file.fits.xml
+    python path/fits_standin.py [-r] -i path/folder -o path/output_folder
+    python path/fits_standin.py -v
+Script usage, as the daemon for the daemon backend (see FitsDaemon in format_analysis_functions.py):
+    python path/fits_standin.py --daemon
+
+Optional arguments to imitate how long FITS takes, which are useful for timing the script:
+    --startup seconds: time to start, like Java does each time FITS is run
+    --delay seconds: time to identify each file
+    --slow seconds: time to identify each file with "slow" in its name, like a file that holds up FITS
+    --hang seconds: time to wait after the last file before ending, like FITS when Java does not exit
+"""
+
+import datetime
+import hashlib
+import os
+import sys
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+# The FITS version included in the XML and printed for -v.
+VERSION = "1.5.0-standin"
+
+# Made up format identifications for common file extensions: (format name, version, PUID).
+# Anything not in this list is identified as Unknown Binary, like FITS does when no tool can identify a file.
+FORMATS = {"csv": ("Comma-Separated Values (CSV)", None, "x-fmt/18"),
+           "gz": ("GZIP Format", None, "x-fmt/266"),
+           "html": ("Hypertext Markup Language", "4.01", "fmt/100"),
+           "pdf": ("Portable Document Format", "1.4", "fmt/18"),
+           "txt": ("Plain text", None, "x-fmt/111"),
+           "xlsx": ("Office Open XML Workbook", None, "fmt/214"),
+           "xml": ("Extensible Markup Language", "1.0", "fmt/101"),
+           "zip": ("ZIP Format", "2.0", "x-fmt/263")}
+
+
+def md5(file_path):
+    """Calculates the MD5 of the file, reading it in chunks to avoid memory issues."""
+    hash_md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1048576), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def fits_xml(file_path, delay=0, slow=0):
+    """Returns a string with made up FITS XML for the file."""
+
+    time.sleep(slow if "slow" in os.path.basename(file_path) else delay)
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    tool = 'toolname="OIS File Information" toolversion="1.0" status="SINGLE_RESULT"'
+
+    # Identifies the format from the file extension, or as empty if the file has no content.
+    extension = os.path.splitext(file_path)[1][1:].lower()
+    if stat.st_size == 0:
+        name, version, puid = ("empty", None, None)
+    else:
+        name, version, puid = FORMATS.get(extension, ("Unknown Binary", None, None))
+    identity = f'    <identity format={quoteattr(name)} toolname="FITS" toolversion="{VERSION}">\n' \
+               f'      <tool toolname="Standin" toolversion="{VERSION}" />\n'
+    if version:
+        identity += f'      <version toolname="Standin" toolversion="{VERSION}">{version}</version>\n'
+    if puid:
+        identity += f'      <externalIdentifier toolname="Standin" toolversion="{VERSION}" type="puid">' \
+                    f'{puid}</externalIdentifier>\n'
+    identity += '    </identity>\n'
+
+    timestamp = datetime.datetime.now().strftime("%m/%d/%y %I:%M %p")
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' \
+           f'<fits xmlns="http://hul.harvard.edu/ois/xml/ns/fits/fits_output" version="{VERSION}" ' \
+           f'timestamp="{timestamp}">\n' \
+           '  <identification>\n' \
+           f'{identity}' \
+           '  </identification>\n' \
+           '  <fileinfo>\n' \
+           f'    <filepath {tool}>{escape(file_path)}</filepath>\n' \
+           f'    <filename {tool}>{escape(os.path.basename(file_path))}</filename>\n' \
+           f'    <size {tool}>{stat.st_size}</size>\n' \
+           f'    <md5checksum {tool}>{md5(file_path)}</md5checksum>\n' \
+           f'    <fslastmodified {tool}>{stat.st_mtime_ns // 1000000}</fslastmodified>\n' \
+           '  </fileinfo>\n' \
+           '  <filestatus />\n' \
+           '  <metadata />\n' \
+           '</fits>\n'
+
+
+def run_command(arguments, delay, slow):
+    """Makes FITS XML the same way as the FITS command line tool: for one file (-i file -o file.fits.xml)
+    or for every file in a folder (-i folder -o folder, and -r to include subfolders)."""
+
+    input_path = arguments[arguments.index("-i") + 1]
+    output_path = arguments[arguments.index("-o") + 1]
+
+    if not os.path.isdir(input_path):
+        with open(output_path, "w", encoding="utf-8") as output:
+            output.write(fits_xml(input_path, delay, slow))
+        return
+
+    # Makes a list of the files in the folder, including subfolders if -r is used.
+    if "-r" in arguments:
+        paths = []
+        for root, directories, files in os.walk(input_path):
+            for file in files:
+                paths.append(os.path.join(root, file))
+    else:
+        paths = [entry.path for entry in os.scandir(input_path) if entry.is_file()]
+
+    # Names the XML the same as FITS, numbering it if there is already XML for a file with the same name.
+    for path in paths:
+        file_name = os.path.basename(path)
+        output = os.path.join(output_path, f"{file_name}.fits.xml")
+        number = 0
+        while os.path.exists(output):
+            number += 1
+            output = os.path.join(output_path, f"{file_name}-{number}.fits.xml")
+        with open(output, "w", encoding="utf-8") as output_file:
+            output_file.write(fits_xml(path, delay, slow))
+
+
+def run_daemon(delay, slow):
+    """Makes FITS XML for each file path read from standard input, until standard input is closed.
+    Each response is "OK" and the number of bytes of XML, a new line, and the XML,
+    or "ERROR" and a message, with a new line. The request VERSION gets the version instead of XML.
+    A file with "crash" in its name ends the daemon without a response, like a file that makes FITS stop."""
+
+    for line in sys.stdin.buffer:
+        path = line.decode("utf-8").rstrip("\r\n")
+        if "crash" in os.path.basename(path):
+            sys.exit(1)
+        if path == "VERSION":
+            sys.stdout.buffer.write(f"OK {len(VERSION)}\n{VERSION}".encode("utf-8"))
+            sys.stdout.buffer.flush()
+            continue
+        try:
+            response = fits_xml(path, delay, slow).encode("utf-8")
+            sys.stdout.buffer.write(f"OK {len(response)}\n".encode("utf-8") + response)
+        except OSError as error:
+            sys.stdout.buffer.write(f"ERROR {error.strerror}\n".encode("utf-8"))
+        sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+
+    # Gets the optional arguments for imitating how long FITS takes.
+    args = sys.argv[1:]
+    startup = float(args[args.index("--startup") + 1]) if "--startup" in args else 0
+    delay = float(args[args.index("--delay") + 1]) if "--delay" in args else 0
+    slow = float(args[args.index("--slow") + 1]) if "--slow" in args else delay
+    hang = float(args[args.index("--hang") + 1]) if "--hang" in args else 0
+    time.sleep(startup)
+
+    if "-v" in args:
+        print(VERSION)
+    elif "--daemon" in args:
+        run_daemon(delay, slow)
+    else:
+        run_command(args, delay, slow)
+        time.sleep(hang)
@@ -8,173 +8,258 @@ Produces a spreadsheet with risk information based on NARA preservation action p
 typically indicate removal during technical appraisal or other risks, with several tabs that summarize this information
 in different ways.
 
-Script usage: python path/format_analysis.py path/accession_folder
+Script usage: python path/format_analysis.py path/accession_folder [--workers number] [--batch-size number]
+                                             [--backend command|daemon|service] [--timeout seconds]
+                                             [--mode full|triage|preview]
 The accession_folder is the path to the folder with files to be analyzed.
+The optional --workers is the number of FITS processes to run at once, overriding FITS_WORKERS in configuration.py.
+The optional --batch-size is the most files given to one FITS process, overriding FITS_BATCH_SIZE in configuration.py.
+The optional --backend is how FITS is run, overriding FITS_BACKEND in configuration.py.
+The optional --timeout is the most seconds FITS can take for one file, overriding FITS_TIMEOUT in configuration.py.
+The optional --mode triage identifies files with fewer FITS tools first, overriding FITS_MODE in configuration.py.
+The optional --mode preview makes a preliminary report from file extensions only, without running FITS.
 Script output is saved in the parent folder of the accession folder.
 """
 
 from format_analysis_functions import *
 
-# Configuration.py is made by the archivist on each new machine the script is installed on, so it could be missing.
-try:
-    import configuration as c
-except ModuleNotFoundError:
-    print("\nCould not run the script. Missing the required configuration.py file.")
-    print("Make a configuration.py file using configuration_template.py and save it to the folder with the script.")
-    sys.exit()
-
-# Gets the accession folder path from the script argument and verifies it is correct.
-# If there is an error, ends the script.
-accession_folder = argument(sys.argv)
-if accession_folder is False:
-    sys.exit()
-
-# Verifies the configuration file has all of the required variables and the file paths are valid.
-# If there are any errors, ends the script.
-configuration_errors = check_configuration()
-if len(configuration_errors) > 0:
-    print('\nProblems detected with configuration.py:')
-    for error in configuration_errors:
-        print("   *", error)
-    print('\nCorrect the configuration file, using configuration_template.py as a model.')
-    sys.exit()
-
-# Calculates the accession number, which is the name of the last folder in the accession_folder path,
-# and the collection folder, which is everything in the accession_folder path except the accession folder.
-# These are used for naming script outputs, so it will not cause an error if they don't match id naming conventions.
-collection_folder, accession_number = os.path.split(accession_folder)
-
-# If there is already a FITS XML folder, updates the FITS folder to match the contents of the accession folder.
-# Otherwise, runs FITS to generate the FITS XML.
-fits_output = f"{collection_folder}/{accession_number}_FITS"
-if os.path.exists(fits_output):
-    print("\nUpdating the XML files in the FITS folder to match the files in the accession folder.")
-    print("This will update fits.csv and remove deleted files from full_risk_data.csv from a previous script iteration.")
-    print("If new files have been added to the accession, delete full_risk_data.csv so it can be updated.")
-    update_fits(accession_folder, fits_output, collection_folder, accession_number)
-else:
-    print("\nGenerating new FITS format identification information.")
-    os.mkdir(fits_output)
-    fits_status = subprocess.run(f'"{c.FITS}" -r -i "{accession_folder}" -o "{fits_output}"',
-                                 shell=True, stderr=subprocess.PIPE)
-    if fits_status.stderr == b'Error: Could not find or load main class edu.harvard.hul.ois.fits.Fits\r\n':
-        print("Unable to generate FITS XML.")
-        print("The FITS folder and accession folder need to be on the same letter drive.")
+# The script only runs when it is started, and not when make_fits_csv() starts processes to read FITS XML,
+# which on Windows import this script to start.
+if __name__ == "__main__":
+
+    # Configuration.py is made by the archivist on each new machine the script is installed on, so it could be missing.
+    try:
+        import configuration as c
+    except ModuleNotFoundError:
+        print("\nCould not run the script. Missing the required configuration.py file.")
+        print("Make a configuration.py file using configuration_template.py and save it to the folder with the script.")
+        sys.exit()
+
+    # Gets the accession folder path from the script argument and verifies it is correct.
+    # If there is an error, ends the script.
+    accession_folder = argument(sys.argv)
+    if accession_folder is False:
+        sys.exit()
+
+    # Gets any optional script arguments, using the configuration file or defaults for the rest.
+    # If there is an error, ends the script.
+    options = optional_arguments(sys.argv)
+    if options is False:
+        sys.exit()
+
+    # Verifies the configuration file has all of the required variables and the file paths are valid.
+    # If there are any errors, ends the script.
+    configuration_errors = check_configuration()
+    if len(configuration_errors) > 0:
+        print('\nProblems detected with configuration.py:')
+        for error in configuration_errors:
+            print("   *", error)
+        print('\nCorrect the configuration file, using configuration_template.py as a model.')
         sys.exit()
 
-# Combines the FITS data into a CSV. If one is already present, this will replace it.
-make_fits_csv(fits_output, collection_folder, accession_number)
-
-# Read the CSVs with data (FITS, ITA (technical appraisal), other formats that can indicate risk, and NARA)
-# into pandas for analysis and summarizing, and prints a warning if encoding errors have to be ignored.
-df_fits = csv_to_dataframe(f"{collection_folder}/{accession_number}_fits.csv")
-df_fits['FITS_Size_KB'] = df_fits['FITS_Size_KB'].astype(float)
-df_ita = csv_to_dataframe(c.ITA)
-df_other = csv_to_dataframe(c.RISK)
-df_nara = csv_to_dataframe(c.NARA)
-
-# If there is already a spreadsheet with combined FITs and risk information from a previous iteration of the script,
-# reads that into a dataframe for additional analysis, removing any files from the dataframe deleted during appraisal.
-# This lets the archivist manually adjust the risk matches in the CSV before format analysis is complete.
-# Otherwise, combines FITS, NARA, technical appraisal, and other risk data into a dataframe and saves it as a CSV.
-csv_path = os.path.join(collection_folder, f"{accession_number}_full_risk_data.csv")
-if os.path.exists(csv_path):
-    print("\nUpdating the analysis report using existing risk data.")
-    df_risk = csv_to_dataframe(csv_path)
-    df_results = update_risk(df_fits, df_risk, csv_path)
-    df_results['FITS_Size_KB'] = df_results['FITS_Size_KB'].astype(float)
-else:
-    print("\nGenerating new risk data for the analysis report.")
-    df_results = match_nara_risk(df_fits, df_nara)
-    df_results = match_technical_appraisal(df_results, df_ita)
-    df_results = match_other_risk(df_results, df_other)
-    df_results.to_csv(csv_path, index=False)
-
-# Removes duplicates in df_results from multiple NARA matches (same risk and preservation plan) to a single file.
-# The full data with the duplicates is saved in the accession's full risk data CSV if matches need to be checked.
-df_results = df_results.drop(["NARA_Format_Name", "NARA_File_Extensions", "NARA_PRONOM_URL"], axis=1)
-df_results = df_results.drop_duplicates()
-
-# The next several code blocks make different subsets of the data based on different risk factors
-# and removes any columns not typically needed for review. If the subset is empty (no risk of that type),
-# the dataframe is given the default value of 'No data of this type'.
-
-# Subset: NARA risk. Any format that is not Low Risk.
-df_nara_risk = df_results[df_results["NARA_Risk_Level"] != "Low Risk"].copy()
-df_nara_risk.drop(["FITS_PUID", "FITS_Identifying_Tool(s)", "FITS_Creating_Application",
-                   "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message"], inplace=True, axis=1)
-if len(df_nara_risk) == 0:
-    df_nara_risk = pd.DataFrame([['No data of this type']])
-
-# Subset: multiple FITS format identifications for the same file.
-# The format name, version, and PUID need to be the same to be considered the same identification.
-# Makes a subset with duplicate file paths (so files in multiple places aren't counted),
-# removes NARA columns (so duplicates from different NARA identifications aren't counted),
-# and drops duplicate rows.
-df_multiple = df_results[df_results.duplicated('FITS_File_Path', keep=False) == True].copy()
-df_multiple.drop(['FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message', 'NARA_Risk_Level',
-                  'NARA_Proposed_Preservation_Plan', 'NARA_Match_Type'], inplace=True, axis=1)
-df_multiple.drop_duplicates(inplace=True)
-if len(df_multiple) == 0:
-    df_multiple = pd.DataFrame([['No data of this type']])
-
-# Subset: formats that are not valid.
-# FITS could have False in the Valid and/or Well-Formed fields and/or text in the Status Message.
-df_validation = df_results[(df_results["FITS_Valid"] == False) |
-                           (df_results["FITS_Well-Formed"] == False) |
-                           (df_results["FITS_Status_Message"].notnull())].copy()
-if len(df_validation) == 0:
-    df_validation = pd.DataFrame([['No data of this type']])
-
-# Subset: technical appraisal. Any format that is not 'Not for TA'.
-df_tech_appraisal = df_results[df_results["Technical_Appraisal"] != "Not for TA"].copy()
-df_tech_appraisal.drop(["FITS_PUID", "FITS_Date_Last_Modified", "FITS_MD5", "FITS_Valid", "FITS_Well-Formed",
-                        "FITS_Status_Message"], inplace=True, axis=1)
-if len(df_tech_appraisal) == 0:
-    df_tech_appraisal = pd.DataFrame([['No data of this type']])
-
-# Subset: other risk. Any format that is not 'Not for Other'.
-df_other_risk = df_results[df_results["Other_Risk"] != "Not for Other"].copy()
-df_other_risk.drop(["FITS_PUID", "FITS_Date_Last_Modified", "FITS_MD5", "FITS_Creating_Application",
-                    "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message"], inplace=True, axis=1)
-if len(df_other_risk) == 0:
-    df_other_risk = pd.DataFrame([['No data of this type']])
-
-# Subset: duplicate files. Any file that is in the directory in more than one location.
-# It does not include files repeated in the dataframe because of multiple FITS identifications or
-# multiple possible NARA matches by removing duplicates from the file path first
-# and only including any files with the same fixity and a different file path.
-df_duplicates = df_results[["FITS_File_Path", "FITS_Size_KB", "FITS_MD5"]].copy()
-df_duplicates = df_duplicates.drop_duplicates(subset=["FITS_File_Path"], keep=False)
-df_duplicates = df_duplicates.loc[df_duplicates.duplicated(subset="FITS_MD5", keep=False)]
-if len(df_duplicates) == 0:
-    df_duplicates = pd.DataFrame([['No data of this type']])
-
-# Calculates the number of files and total size in the dataframe to use for calculating percentages with the subtotals.
-# This gives percentages based on the entire accession and not just the files that are in a particular subtotal.
-totals_dict = {"Files": len(df_results.index), "MB": df_results["FITS_Size_KB"].sum()/1000}
-
-# Calculates file and size subtotals based on different criteria.
-# The input df for tech appraisal and other risk are filtered to exclude files which don't have that risk.
-df_format_subtotals = subtotal(df_results, ["FITS_Format_Name", "NARA_Risk_Level"], totals_dict)
-df_nara_risk_subtotals = subtotal(df_results, ["NARA_Risk_Level"], totals_dict)
-df_tech_appraisal_subtotals = subtotal(df_results[df_results["Technical_Appraisal"] != "Not for TA"],
-                                       ["Technical_Appraisal", "FITS_Format_Name"], totals_dict)
-df_other_risk_subtotals = subtotal(df_results[df_results["Other_Risk"] != "Not for Other"],
-                                   ["Other_Risk", "FITS_Format_Name"], totals_dict)
-df_media_subtotals = media_subtotal(df_results, accession_folder)
-
-# Saves all dataframes to a separate tab in an Excel spreadsheet in the collection folder.
-# The index is not included if it is the row numbers.
-with pd.ExcelWriter(f"{collection_folder}/{accession_number}_format-analysis.xlsx") as result:
-    df_format_subtotals.to_excel(result, sheet_name="Format Subtotal")
-    df_nara_risk_subtotals.to_excel(result, sheet_name="NARA Risk Subtotal")
-    df_tech_appraisal_subtotals.to_excel(result, sheet_name="Tech Appraisal Subtotal")
-    df_other_risk_subtotals.to_excel(result, sheet_name="Other Risk Subtotal")
-    df_media_subtotals.to_excel(result, sheet_name="Media Subtotal", index_label="Media")
-    df_nara_risk.to_excel(result, sheet_name="NARA Risk", index=False)
-    df_tech_appraisal.to_excel(result, sheet_name="For Technical Appraisal", index=False)
-    df_other_risk.to_excel(result, sheet_name="Other Risks", index=False)
-    df_multiple.to_excel(result, sheet_name="Multiple Formats", index=False)
-    df_duplicates.to_excel(result, sheet_name="Duplicates", index=False)
-    df_validation.to_excel(result, sheet_name="Validation", index=False)
+    # Calculates the accession number, which is the name of the last folder in the accession_folder path,
+    # and the collection folder, which is everything in the accession_folder path except the accession folder.
+    # These are used for naming script outputs, so it will not cause an error if they don't match id naming conventions.
+    collection_folder, accession_number = os.path.split(accession_folder)
+
+    # Read the CSVs with data (ITA (technical appraisal), other formats that can indicate risk, and NARA)
+    # into pandas for analysis and summarizing, and prints a warning if encoding errors have to be ignored.
+    df_ita = csv_to_dataframe(c.ITA)
+    df_other = csv_to_dataframe(c.RISK)
+    df_nara = csv_to_dataframe(c.NARA)
+
+    # In preview mode, matches NARA risk by file extension and applies the technical appraisal rules for temp files and
+    # trash folders, without running FITS, and saves a report marked as preliminary. Ends the script after the report.
+    # Nothing is saved in the FITS folder or the risk data CSV, so a later full run is not affected by the preview.
+    if options["mode"] == "preview":
+        print("\nGenerating a preliminary analysis report from file extensions, without FITS.")
+        df_preview = preview_risk(accession_folder, df_nara)
+        df_preview = match_technical_appraisal(df_preview, df_ita)
+        df_preview = match_other_risk(df_preview, df_other)
+        df_preview = df_preview.drop(["NARA_Format_Name", "NARA_File_Extensions", "NARA_PRONOM_URL"], axis=1)
+        df_preview = df_preview.drop_duplicates()
+
+        # Subsets and subtotals, the same as the full report but with file extensions instead of FITS formats.
+        df_preview_risk = df_preview[df_preview["NARA_Risk_Level"] != "Low Risk"].copy()
+        if len(df_preview_risk) == 0:
+            df_preview_risk = pd.DataFrame([['No data of this type']])
+        df_preview_ta = df_preview[df_preview["Technical_Appraisal"] != "Not for TA"].copy()
+        if len(df_preview_ta) == 0:
+            df_preview_ta = pd.DataFrame([['No data of this type']])
+        totals_dict = {"Files": len(df_preview.index), "MB": df_preview["FITS_Size_KB"].sum()/1000}
+        df_preliminary = pd.DataFrame([["PRELIMINARY: formats are not identified. NARA risk is matched by file "
+                                        "extension only. Run the script without --mode preview for the full "
+                                        "analysis."]],
+                                      columns=["Preview"])
+
+        with pd.ExcelWriter(f"{collection_folder}/{accession_number}_format-analysis_PREVIEW.xlsx") as result:
+            df_preliminary.to_excel(result, sheet_name="Preview", index=False)
+            subtotal(df_preview, ["File_Extension", "NARA_Risk_Level"], totals_dict).to_excel(
+                result, sheet_name="Extension Subtotal")
+            subtotal(df_preview, ["NARA_Risk_Level"], totals_dict).to_excel(result, sheet_name="NARA Risk Subtotal")
+            subtotal(df_preview[df_preview["Technical_Appraisal"] != "Not for TA"], ["Technical_Appraisal"],
+                     totals_dict).to_excel(result, sheet_name="Tech Appraisal Subtotal")
+            media_subtotal(df_preview, accession_folder).to_excel(result, sheet_name="Media Subtotal",
+                                                                  index_label="Media")
+            df_preview_risk.to_excel(result, sheet_name="NARA Risk", index=False)
+            df_preview_ta.to_excel(result, sheet_name="For Technical Appraisal", index=False)
+        sys.exit()
+
+    # If there is already a FITS XML folder, updates the FITS folder to match the contents of the accession folder.
+    # Otherwise, runs FITS to generate the FITS XML.
+    # The backend is how FITS is run: the FITS command line tool (default), FITS daemons that keep running
+    # until the script ends, or the FITS web service,
+    # and in triage mode the full FITS tools are only used for files that a reduced set of tools
+    # cannot identify clearly.
+    # The FITS cache, if there is one, has identifications of files from this and other accessions.
+    fits_output = f"{collection_folder}/{accession_number}_FITS"
+    backend = fits_backend(options["backend"], options["mode"])
+    cache = fits_cache()
+    if os.path.exists(fits_output):
+        print("\nUpdating the XML files in the FITS folder to match the files in the accession folder.")
+        print("This will update fits.csv and remove deleted files from full_risk_data.csv "
+              "from a previous script iteration.")
+        print("If new files have been added to the accession, delete full_risk_data.csv so it can be updated.")
+
+        # The rows for the FITS CSV are kept from the FITS XML that update_fits() reads, so it is only read once.
+        fits_rows = {}
+        update_fits(accession_folder, fits_output, collection_folder, accession_number,
+                    options["workers"], options["batch_size"], backend, cache, options["timeout"], fits_rows)
+
+        # Combines the FITS data into a CSV and a dataframe. If a CSV is already present, this will replace it.
+        # The CSV is saved in the background, since the analysis uses the dataframe.
+        df_fits = make_fits_csv(fits_output, collection_folder, accession_number, background=True, rows=fits_rows)
+    else:
+        print("\nGenerating new FITS format identification information.")
+        os.mkdir(fits_output)
+        if options["workers"] > 1:
+            print(f"Running {options['workers']} FITS processes at once.")
+
+        # Combines the FITS data into a CSV and a dataframe while FITS runs, adding each FITS XML as soon as it is made.
+        fits_csv = FitsCsvStream(fits_output, collection_folder, accession_number)
+        fits_errors = make_fits_xml(accession_file_list(accession_folder), fits_output, options["workers"],
+                                    options["batch_size"], backend, cache, options["timeout"], fits_csv=fits_csv)
+        df_fits = fits_csv.finish(background=True)
+        log_fits_errors(fits_errors, collection_folder, accession_number)
+    backend.close()
+    if cache is not None:
+        cache.close()
+
+    # With REPORT_MEMORY in the configuration file, reports the most memory used so far,
+    # which is mostly the FITS information for every file in the accession.
+    if getattr(c, "REPORT_MEMORY", False):
+        memory = peak_memory()
+        if memory is not None:
+            print(f"\nPeak memory use after FITS: {memory} MB")
+
+    # Prepares the FITS dataframe, which has the same information as the FITS CSV, for analysis and summarizing.
+    df_fits = df_fits.drop(columns="FITS_Tier", errors="ignore")
+    df_fits['FITS_Size_KB'] = df_fits['FITS_Size_KB'].astype(float)
+
+    # If there is already a spreadsheet with combined FITs and risk information from a previous iteration of the
+    # script, reads that into a dataframe for additional analysis, removing any files from the dataframe deleted
+    # during appraisal.
+    # This lets the archivist manually adjust the risk matches in the CSV before format analysis is complete.
+    # Otherwise, combines FITS, NARA, technical appraisal, and other risk data into a dataframe and saves it as a CSV.
+    csv_path = os.path.join(collection_folder, f"{accession_number}_full_risk_data.csv")
+    if os.path.exists(csv_path):
+        print("\nUpdating the analysis report using existing risk data.")
+        df_risk = csv_to_dataframe(csv_path)
+        df_results = update_risk(df_fits, df_risk, csv_path)
+        df_results['FITS_Size_KB'] = df_results['FITS_Size_KB'].astype(float)
+    else:
+        print("\nGenerating new risk data for the analysis report.")
+        df_results = match_nara_risk(df_fits, df_nara)
+        df_results = match_technical_appraisal(df_results, df_ita)
+        df_results = match_other_risk(df_results, df_other)
+        df_results.to_csv(csv_path, index=False)
+
+    # Removes duplicates in df_results from multiple NARA matches (same risk and preservation plan) to a single file.
+    # The full data with the duplicates is saved in the accession's full risk data CSV if matches need to be checked.
+    df_results = df_results.drop(["NARA_Format_Name", "NARA_File_Extensions", "NARA_PRONOM_URL"], axis=1)
+    df_results = df_results.drop_duplicates()
+
+    # The next several code blocks make different subsets of the data based on different risk factors
+    # and removes any columns not typically needed for review. If the subset is empty (no risk of that type),
+    # the dataframe is given the default value of 'No data of this type'.
+
+    # Subset: NARA risk. Any format that is not Low Risk.
+    df_nara_risk = df_results[df_results["NARA_Risk_Level"] != "Low Risk"].copy()
+    df_nara_risk.drop(["FITS_PUID", "FITS_Identifying_Tool(s)", "FITS_Creating_Application",
+                       "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message"], inplace=True, axis=1)
+    if len(df_nara_risk) == 0:
+        df_nara_risk = pd.DataFrame([['No data of this type']])
+
+    # Subset: multiple FITS format identifications for the same file.
+    # The format name, version, and PUID need to be the same to be considered the same identification.
+    # Makes a subset with duplicate file paths (so files in multiple places aren't counted),
+    # removes NARA columns (so duplicates from different NARA identifications aren't counted),
+    # and drops duplicate rows.
+    df_multiple = df_results[df_results.duplicated('FITS_File_Path', keep=False) == True].copy()
+    df_multiple.drop(['FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message', 'NARA_Risk_Level',
+                      'NARA_Proposed_Preservation_Plan', 'NARA_Match_Type'], inplace=True, axis=1)
+    df_multiple.drop_duplicates(inplace=True)
+    if len(df_multiple) == 0:
+        df_multiple = pd.DataFrame([['No data of this type']])
+
+    # Subset: formats that are not valid.
+    # FITS could have False in the Valid and/or Well-Formed fields and/or text in the Status Message.
+    df_validation = df_results[(df_results["FITS_Valid"] == False) |
+                               (df_results["FITS_Well-Formed"] == False) |
+                               (df_results["FITS_Status_Message"].notnull())].copy()
+    if len(df_validation) == 0:
+        df_validation = pd.DataFrame([['No data of this type']])
+
+    # Subset: technical appraisal. Any format that is not 'Not for TA'.
+    df_tech_appraisal = df_results[df_results["Technical_Appraisal"] != "Not for TA"].copy()
+    df_tech_appraisal.drop(["FITS_PUID", "FITS_Date_Last_Modified", "FITS_MD5", "FITS_Valid", "FITS_Well-Formed",
+                            "FITS_Status_Message"], inplace=True, axis=1)
+    if len(df_tech_appraisal) == 0:
+        df_tech_appraisal = pd.DataFrame([['No data of this type']])
+
+    # Subset: other risk. Any format that is not 'Not for Other'.
+    df_other_risk = df_results[df_results["Other_Risk"] != "Not for Other"].copy()
+    df_other_risk.drop(["FITS_PUID", "FITS_Date_Last_Modified", "FITS_MD5", "FITS_Creating_Application",
+                        "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message"], inplace=True, axis=1)
+    if len(df_other_risk) == 0:
+        df_other_risk = pd.DataFrame([['No data of this type']])
+
+    # Subset: duplicate files. Any file that is in the directory in more than one location.
+    # It does not include files repeated in the dataframe because of multiple FITS identifications or
+    # multiple possible NARA matches by removing duplicates from the file path first
+    # and only including any files with the same fixity and a different file path.
+    df_duplicates = df_results[["FITS_File_Path", "FITS_Size_KB", "FITS_MD5"]].copy()
+    df_duplicates = df_duplicates.drop_duplicates(subset=["FITS_File_Path"], keep=False)
+    df_duplicates = df_duplicates.loc[df_duplicates.duplicated(subset="FITS_MD5", keep=False)]
+    if len(df_duplicates) == 0:
+        df_duplicates = pd.DataFrame([['No data of this type']])
+
+    # Calculates the number of files and total size in the dataframe to use for calculating percentages
+    # with the subtotals.
+    # This gives percentages based on the entire accession and not just the files that are in a particular subtotal.
+    totals_dict = {"Files": len(df_results.index), "MB": df_results["FITS_Size_KB"].sum()/1000}
+
+    # Calculates file and size subtotals based on different criteria.
+    # The input df for tech appraisal and other risk are filtered to exclude files which don't have that risk.
+    df_format_subtotals = subtotal(df_results, ["FITS_Format_Name", "NARA_Risk_Level"], totals_dict)
+    df_nara_risk_subtotals = subtotal(df_results, ["NARA_Risk_Level"], totals_dict)
+    df_tech_appraisal_subtotals = subtotal(df_results[df_results["Technical_Appraisal"] != "Not for TA"],
+                                           ["Technical_Appraisal", "FITS_Format_Name"], totals_dict)
+    df_other_risk_subtotals = subtotal(df_results[df_results["Other_Risk"] != "Not for Other"],
+                                       ["Other_Risk", "FITS_Format_Name"], totals_dict)
+    df_media_subtotals = media_subtotal(df_results, accession_folder)
+
+    # Saves all dataframes to a separate tab in an Excel spreadsheet in the collection folder.
+    # The index is not included if it is the row numbers.
+    with pd.ExcelWriter(f"{collection_folder}/{accession_number}_format-analysis.xlsx") as result:
+        df_format_subtotals.to_excel(result, sheet_name="Format Subtotal")
+        df_nara_risk_subtotals.to_excel(result, sheet_name="NARA Risk Subtotal")
+        df_tech_appraisal_subtotals.to_excel(result, sheet_name="Tech Appraisal Subtotal")
+        df_other_risk_subtotals.to_excel(result, sheet_name="Other Risk Subtotal")
+        df_media_subtotals.to_excel(result, sheet_name="Media Subtotal", index_label="Media")
+        df_nara_risk.to_excel(result, sheet_name="NARA Risk", index=False)
+        df_tech_appraisal.to_excel(result, sheet_name="For Technical Appraisal", index=False)
+        df_other_risk.to_excel(result, sheet_name="Other Risks", index=False)
+        df_multiple.to_excel(result, sheet_name="Multiple Formats", index=False)
+        df_duplicates.to_excel(result, sheet_name="Duplicates", index=False)
+        df_validation.to_excel(result, sheet_name="Validation", index=False)
@@ -1,13 +1,40 @@
+import copy
 import csv
 import datetime
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import locale
+import math
 import os
 import pandas as pd
+import queue
 import re
+import shutil
+import signal
+import socket
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
 import xml.etree.ElementTree as ET
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+# lxml is optional. If it is installed, it is used to read FITS XML for the FITS CSV, since it is faster.
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
 # Configuration is made by the user on each new machine the script is installed on, so it could be missing.
 try:
     import configuration as c
@@ -16,6 +43,66 @@ except ModuleNotFoundError:
     print("Make a configuration.py file using configuration_template.py and save it to the folder with the script.")
     sys.exit()
 
+# FITS namespace. All elements in the FITS XML are part of this namespace.
+# Registering it keeps FITS XML that the script rewrites in the same form as XML written by FITS.
+FITS_NS = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+ET.register_namespace("", FITS_NS)
+ET.register_namespace("xsi", "http://www.w3.org/2001/XMLSchema-instance")
+
+# Number of FITS XML files given to a process at a time when reading FITS XML for the FITS CSV (see make_fits_csv()).
+FITS_CSV_CHUNK = 200
+
+# Tags of the parts of the FITS XML used by fits_row(): identification, fileinfo, and filestatus.
+# FITS puts these first, so fits_row() stops reading once it has them (see read_fits_parts()).
+FITS_ROW_TAGS = frozenset(f"{{{FITS_NS}}}{name}" for name in ("identification", "fileinfo", "filestatus"))
+
+# Columns in the FITS CSV (see make_fits_csv()), in the same order as the rows from fits_row().
+# The columns that are the text of a FITS XML element are also in FITS_FIELDS.
+FITS_COLUMNS = ["FITS_File_Path", "FITS_Format_Name", "FITS_Format_Version", "FITS_PUID", "FITS_Identifying_Tool(s)",
+                "FITS_Multiple_IDs", "FITS_Date_Last_Modified", "FITS_Size_KB", "FITS_MD5", "FITS_Creating_Application",
+                "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message", "FITS_Tier"]
+
+# Text that pandas reads as NaN from a CSV by default, which fits_dataframe() also makes NaN,
+# so the dataframe is the same as the FITS CSV read with csv_to_dataframe().
+CSV_NA_VALUES = frozenset(["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                           "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"])
+
+# Name of the index of the FITS XML that is saved in the FITS folder (see fits_index()).
+FITS_INDEX = "fits_index.csv"
+
+# Name of the journal of the FITS XML being made, which is saved in the FITS folder during a run (see FitsJournal).
+FITS_JOURNAL = "fits_journal.csv"
+
+# Endings of the names of FITS XML files in the FITS folder: FITS XML, and pruned and compressed FITS XML
+# (see save_fits_xml()).
+FITS_XML_ENDINGS = (".fits.xml", ".fits.xml.gz")
+
+# Name of the SQLite file in the FITS folder with the FITS XML for the archive layout (see FitsArchive).
+FITS_ARCHIVE = "fits_archive.db"
+
+# Number of FITS XML saved to or deleted from the FITS archive that are committed together (see FitsArchive).
+FITS_ARCHIVE_BATCH = 100
+
+# Name of the SQLite file in the FITS folder with the rows for the FITS CSV from each FITS XML (see FitsRowCache).
+FITS_ROWS = "fits_rows.db"
+
+# Number of bytes read at a time, and the most that is read, when searching the start of FITS XML for fileinfo
+# (see scan_fits_fileinfo()).
+FITS_SCAN_BYTES = 65536
+FITS_SCAN_LIMIT = 1048576
+
+# Seconds between checks of the FITS output folder for new FITS XML, when FITS has a timeout (see FitsCommand.run()).
+FITS_PROGRESS_SECONDS = 1
+
+# File signatures that are certain of the format, so the script can identify the file without FITS
+# (see signature_fits_xml()). Which are used is set with FITS_SIGNATURES in the configuration file,
+# which can also include "empty" for files with no content.
+# Each is a list of (first bytes of the file, file extensions, format name, format version, PUID).
+# Only formats with the version in the signature are included. For example, PDF is not, since the version can also
+# be in the document catalog and PDF/A has the same signature, and PNG is not, since its signature has no version.
+SIGNATURES = {"gif": [(b"GIF87a", (".gif",), "Graphics Interchange Format", "87a", "fmt/3"),
+                      (b"GIF89a", (".gif",), "Graphics Interchange Format", "89a", "fmt/4")]}
+
 
 def argument(arg_list):
     """Gets the accession folder path from the script argument and verifies it is correct.
@@ -38,6 +125,92 @@ def argument(arg_list):
     return accession_folder
 
 
+def daemon_program(command):
+    """Returns the program that a FITS_DAEMON command starts, which is the first part of the command,
+    without the quotes that are needed if the path has spaces."""
+    command = command.strip()
+    if command.startswith('"'):
+        return command[1:].split('"', 1)[0]
+    return command.split(" ", 1)[0]
+
+
+def optional_arguments(arg_list):
+    """Gets the optional script arguments, which come after the accession folder, and verifies they are correct.
+       Values not given as an argument are taken from the configuration file, or a default if it is not there.
+       Prints an explanation of any error encountered.
+       Returns a dictionary of the options or False if there is an error."""
+
+    options = {"workers": getattr(c, "FITS_WORKERS", 1),
+               "batch_size": getattr(c, "FITS_BATCH_SIZE", 500),
+               "backend": getattr(c, "FITS_BACKEND", "command"),
+               "timeout": getattr(c, "FITS_TIMEOUT", None),
+               "mode": getattr(c, "FITS_MODE", "full")}
+
+    # Options that are text instead of a number, and the values they are allowed to have.
+    # The preview mode, which does not run FITS, is only an argument since it is not for every accession.
+    choices = {"backend": ("command", "daemon", "service"), "mode": ("full", "triage", "preview")}
+
+    # Tests each argument after the accession folder, which must be a known option followed by its value.
+    # The option name is the dictionary key, without the leading dashes and with underscores instead of dashes.
+    arguments = arg_list[2:]
+    while len(arguments) > 0:
+        option = arguments.pop(0)
+        key = option[2:].replace("-", "_")
+        if not option.startswith("--") or key not in options:
+            print(f"\nThe optional script argument '{option}' is not recognized.")
+            return False
+        if key in choices:
+            if len(arguments) == 0 or arguments[0] not in choices[key]:
+                print(f"\nThe optional script argument {option} must be followed by one of: {', '.join(choices[key])}.")
+                return False
+            options[key] = arguments.pop(0)
+            continue
+        try:
+            value = int(arguments.pop(0))
+        except (IndexError, ValueError):
+            print(f"\nThe optional script argument {option} must be followed by a whole number.")
+            return False
+        if value < 1:
+            print(f"\nThe optional script argument {option} must be at least 1.")
+            return False
+        options[key] = value
+
+    # The daemon backend needs the command that starts the daemon, which is only in the configuration file.
+    # The program the command starts (the first part of the command) must exist.
+    if options["backend"] == "daemon":
+        daemon = getattr(c, "FITS_DAEMON", "")
+        if not daemon:
+            print("\nThe daemon backend requires the FITS_DAEMON variable in the configuration file.")
+            return False
+        program = daemon_program(daemon)
+        if not os.path.exists(program) and shutil.which(program) is None:
+            print(f"\nThe program '{program}' in FITS_DAEMON in the configuration file is not correct.")
+            return False
+
+    # The service backend needs the address of the FITS web service, which is only in the configuration file.
+    if options["backend"] == "service":
+        service = getattr(c, "FITS_SERVICE", "")
+        if not service.startswith(("http://", "https://")):
+            print("\nThe service backend requires the FITS_SERVICE variable in the configuration file, "
+                  "with the address of the FITS web service (http://...).")
+            return False
+
+    # Triage mode needs the reduced FITS tool configuration, which is only in the configuration file.
+    # Without it, FITS would use no tools for triage and every file would quietly go to the full tools.
+    if options["mode"] == "triage":
+        triage_config = getattr(c, "FITS_TRIAGE_CONFIG", "")
+        if not triage_config:
+            print("\nThe triage mode requires the path to a FITS configuration file in FITS_TRIAGE_CONFIG "
+                  "in the configuration file.")
+            return False
+        if not os.path.exists(triage_config):
+            print(f"\nThe FITS_TRIAGE_CONFIG path '{triage_config}' in the configuration file is not correct.")
+            return False
+
+    # If the tests are passed, returns the options.
+    return options
+
+
 def check_configuration():
     """Verifies all the expected variables are in the configuration file and paths are valid.
     Returns a list of errors or an empty list if there are no errors."""
@@ -68,6 +241,44 @@ def check_configuration():
     except AttributeError:
         errors.append("NARA variable is missing from the configuration file.")
 
+    # The remaining variables are optional, so it is only an error if they are present but not a valid value.
+    for signature_name in getattr(c, "FITS_SIGNATURES", []):
+        if signature_name != "empty" and signature_name not in SIGNATURES:
+            errors.append(f"FITS_SIGNATURES '{signature_name}' is not one of: empty, {', '.join(SIGNATURES)}.")
+
+    for variable in ("FITS_WORKERS", "FITS_BATCH_SIZE", "FITS_CACHE_SIZE", "FITS_TIMEOUT", "FITS_RETRY_TIMEOUT"):
+        value = getattr(c, variable, 1)
+        if not isinstance(value, int) or value < 1:
+            errors.append(f"{variable} '{value}' is not a whole number of at least 1.")
+
+    cache = getattr(c, "FITS_CACHE", "")
+    if cache and not os.path.exists(os.path.dirname(os.path.abspath(cache))):
+        errors.append(f"FITS_CACHE folder '{os.path.dirname(cache)}' is not correct.")
+
+    backend = getattr(c, "FITS_BACKEND", "command")
+    if backend not in ("command", "daemon", "service"):
+        errors.append(f"FITS_BACKEND '{backend}' is not command, daemon, or service.")
+
+    mode = getattr(c, "FITS_MODE", "full")
+    if mode not in ("full", "triage"):
+        errors.append(f"FITS_MODE '{mode}' is not full or triage.")
+
+    triage_config = getattr(c, "FITS_TRIAGE_CONFIG", "")
+    if triage_config and not os.path.exists(triage_config):
+        errors.append(f"FITS_TRIAGE_CONFIG path '{triage_config}' is not correct.")
+
+    compress = getattr(c, "FITS_COMPRESS", False)
+    if not isinstance(compress, bool):
+        errors.append(f"FITS_COMPRESS '{compress}' is not True or False.")
+
+    layout = getattr(c, "FITS_LAYOUT", "flat")
+    if layout not in ("flat", "sharded", "archive"):
+        errors.append(f"FITS_LAYOUT '{layout}' is not flat, sharded, or archive.")
+
+    report_memory = getattr(c, "REPORT_MEMORY", False)
+    if not isinstance(report_memory, bool):
+        errors.append(f"REPORT_MEMORY '{report_memory}' is not True or False.")
+
     return errors
 
 
@@ -99,52 +310,1531 @@ def csv_to_dataframe(csv_file):
     return df
 
 
-def update_fits(accession_folder, fits_output, collection_folder, accession_number):
-    """Deletes any XML files in the FITS folder that do not have a corresponding file in the accession folder
-    and makes a FITS XML file for anything in the accession folder that doesn't have one.
-    This is used when the script is run again after doing some appraisal and/or file renaming."""
+def accession_file_list(accession_folder):
+    """Returns a list with the path of every file in the accession folder, including files in subfolders."""
 
-    # Makes a dataframe with the file paths from the accession folder.
     accession_paths = []
     for root, directories, files in os.walk(accession_folder):
         for file in files:
             accession_paths.append(os.path.join(root, file))
+    return accession_paths
+
+
+def fits_xml_entries(fits_output):
+    """Returns a list of (name, size, date modified in nanoseconds) for the FITS XML in the FITS folder,
+    skipping anything else saved there, such as the FITS index.
+    The name is the path from the FITS folder, so it includes the subfolder if the XML is in the sharded layout
+    (see fits_xml_folder()), or starts with FITS_ARCHIVE if the XML is in the archive layout (see FitsArchive).
+    XML in the FITS folder itself, in subfolders, and in the archive are all included,
+    so a FITS folder made before the layout was changed can still be read and updated."""
+
+    entries = []
+    for dir_entry in os.scandir(fits_output):
+        if dir_entry.is_dir():
+            for shard_entry in os.scandir(dir_entry.path):
+                if shard_entry.name.endswith(FITS_XML_ENDINGS):
+                    xml_stat = shard_entry.stat()
+                    entries.append((os.path.join(dir_entry.name, shard_entry.name), xml_stat.st_size,
+                                    xml_stat.st_mtime_ns))
+        elif dir_entry.name.endswith(FITS_XML_ENDINGS):
+            xml_stat = dir_entry.stat()
+            entries.append((dir_entry.name, xml_stat.st_size, xml_stat.st_mtime_ns))
+    archive = fits_archive(fits_output)
+    if archive is not None:
+        entries.extend(archive.entries())
+        archive.close()
+    return entries
+
+
+def fits_xml_list(fits_output):
+    """Returns a list of the names of the FITS XML in the FITS folder (see fits_xml_entries())."""
+    return [name for name, size, modified in fits_xml_entries(fits_output)]
+
+
+def fits_xml_folder(source_path):
+    """Returns the subfolder of the FITS folder to save the FITS XML for source_path in.
+    With the flat layout (the default) this is "", the FITS folder itself.
+    With the sharded layout (FITS_LAYOUT in the configuration file), it is the first two characters of the MD5
+    of the path, so the XML is spread evenly over 256 subfolders and no folder gets too large to list quickly."""
+
+    if getattr(c, "FITS_LAYOUT", "flat") == "sharded":
+        return hashlib.md5(source_path.encode("utf-8", "surrogateescape")).hexdigest()[:2]
+    return ""
+
+
+def fits_xml_file(fits_output, fits_name, archive=None):
+    """Returns the FITS XML with this name (see fits_xml_entries()), to read with ET.parse() or fits_row():
+    the path of the XML file, or a file object with the XML if it is in the archive.
+    An archive that is already open can be given, to not open it again for each XML."""
+
+    if not fits_name.startswith(FITS_ARCHIVE + os.sep):
+        return os.path.join(fits_output, fits_name)
+    if archive is not None:
+        return archive.open(fits_name)
+    archive = FitsArchive(fits_output)
+    try:
+        return archive.open(fits_name)
+    finally:
+        archive.close()
+
+
+def remove_fits_xml(fits_output, fits_name, archive=None):
+    """Deletes the FITS XML with this name (see fits_xml_entries()), from the FITS folder or the archive.
+    An archive that is already open can be given, to not open it again for each XML.
+    With the sharded layout, the subfolder is also deleted if this was the last XML in it."""
+
+    if not fits_name.startswith(FITS_ARCHIVE + os.sep):
+        os.remove(os.path.join(fits_output, fits_name))
+        shard = os.path.dirname(fits_name)
+        if shard:
+            try:
+                os.rmdir(os.path.join(fits_output, shard))
+            except OSError:
+                pass
+        return
+    if archive is not None:
+        archive.remove(fits_name)
+        return
+    archive = FitsArchive(fits_output)
+    try:
+        archive.remove(fits_name)
+    finally:
+        archive.close()
+
+
+class FitsArchive:
+    """Saves FITS XML in one SQLite file in the FITS folder (FITS_ARCHIVE), instead of one file for each file in the
+    accession, which is much faster to copy between staging and storage. This is the archive layout.
+
+    Each XML is compressed, with the name it would have in the FITS folder as the key, and the source path is indexed.
+    To the rest of the script, the name of XML in the archive starts with FITS_ARCHIVE, like the path to a file in
+    a folder, so it can tell where to read it from (see fits_xml_file()). export() makes the XML files again.
+
+    One archive is opened for each run of make_fits_xml() and shared by the threads, instead of a connection for each
+    XML, and changes are committed FITS_ARCHIVE_BATCH at a time and when it is closed, since each commit waits for
+    the file to be saved to disk, which is slow on network drives. If a run is interrupted before a commit,
+    those files have no XML, so update_fits() identifies them again."""
+
+    def __init__(self, fits_output):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(fits_output, FITS_ARCHIVE), timeout=60,
+                                          check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fits_xml "
+                                "(name TEXT PRIMARY KEY, file_path TEXT, fits_xml BLOB, size INTEGER, modified INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS fits_xml_file_path ON fits_xml (file_path)")
+        self.connection.commit()
+        self.changes = 0
+
+    def changed(self):
+        """Counts a change to the archive, and commits the changes if there are FITS_ARCHIVE_BATCH of them.
+        Must be called with the lock."""
+        self.changes += 1
+        if self.changes >= FITS_ARCHIVE_BATCH:
+            self.connection.commit()
+            self.changes = 0
+
+    def save(self, tree, source_path):
+        """Saves FITS XML for source_path, using the same names as save_fits_xml().
+        Returns the name of the FITS XML, which starts with FITS_ARCHIVE."""
+        fits_xml = io.BytesIO()
+        tree.write(fits_xml, encoding="UTF-8", xml_declaration=True)
+        fits_xml = fits_xml.getvalue()
+        file_name = os.path.basename(source_path)
+        fits_name = f"{file_name}.fits.xml"
+        number = 0
+        with self.lock:
+            while True:
+                try:
+                    self.connection.execute("INSERT INTO fits_xml VALUES (?, ?, ?, ?, ?)",
+                                            (fits_name, source_path, zlib.compress(fits_xml), len(fits_xml),
+                                             time.time_ns()))
+                    self.changed()
+                    return os.path.join(FITS_ARCHIVE, fits_name)
+                except sqlite3.IntegrityError:
+                    number += 1
+                    fits_name = f"{file_name}-{number}.fits.xml"
+
+    def entries(self):
+        """Returns a list of (name, size, date modified in nanoseconds) for the FITS XML in the archive."""
+        with self.lock:
+            rows = self.connection.execute("SELECT name, size, modified FROM fits_xml").fetchall()
+        return [(os.path.join(FITS_ARCHIVE, name), size, modified) for name, size, modified in rows]
+
+    def open(self, fits_name):
+        """Returns a file object with the FITS XML with this name, which has the name for error messages.
+        Raises FileNotFoundError if it is not in the archive."""
+        with self.lock:
+            row = self.connection.execute("SELECT fits_xml FROM fits_xml WHERE name = ?",
+                                          (os.path.basename(fits_name),)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"{fits_name} is not in the FITS archive")
+        fits_xml = io.BytesIO(zlib.decompress(row[0]))
+        fits_xml.name = fits_name
+        return fits_xml
+
+    def remove(self, fits_name):
+        """Deletes the FITS XML with this name."""
+        with self.lock:
+            self.connection.execute("DELETE FROM fits_xml WHERE name = ?", (os.path.basename(fits_name),))
+            self.changed()
+
+    def export(self, export_folder):
+        """Saves each FITS XML in the archive as a file in export_folder, with the same names as save_fits_xml(),
+        so it is the same as a FITS folder with the flat layout. Returns the number of files saved."""
+        with self.lock:
+            rows = self.connection.execute("SELECT name, fits_xml FROM fits_xml").fetchall()
+        for fits_name, fits_xml in rows:
+            file_name = fits_name[:-len(".fits.xml")]
+            number = 0
+            while True:
+                try:
+                    with open(os.path.join(export_folder, fits_name), "xb") as export_xml:
+                        export_xml.write(zlib.decompress(fits_xml))
+                    break
+                except FileExistsError:
+                    number += 1
+                    fits_name = f"{file_name}-{number}.fits.xml"
+        return len(rows)
+
+    def close(self):
+        """Saves any changes and closes the archive."""
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+def fits_archive(fits_output):
+    """Returns the archive in the FITS folder (see FitsArchive), or None if there is not one."""
+    if not os.path.exists(os.path.join(fits_output, FITS_ARCHIVE)):
+        return None
+    return FitsArchive(fits_output)
+
+
+def fits_index_entry(fits_name, xml_size, xml_modified, fits_output, archive=None, rows=None, scan=True):
+    """Reads the file information from one FITS XML file for the FITS index (see fits_index()).
+    xml_size and xml_modified (nanoseconds) are from fits_xml_entries(), and are saved to tell later
+    if the XML has changed. archive is the FITS archive, if it is already open.
+    If rows is a dictionary, the XML is read and the rows for the FITS CSV (see fits_xml_rows()) are added to it
+    with the FITS XML name as the key, so make_fits_csv() does not need to read the XML again.
+    Otherwise, if scan is True, the file information is found without reading the XML (see scan_fits_fileinfo()),
+    unless the XML is not in the expected form. scan is False to make sure the whole XML can be read.
+    Returns a dictionary with a value for each column in the index."""
+
+    names = ("filepath", "size", "fslastmodified", "md5checksum")
+    fileinfo_values = None
+    if rows is None and scan:
+        fileinfo_values = scan_fits_fileinfo(fits_xml_file(fits_output, fits_name, archive), names)
+
+        # FITS always includes the path, so if the search did not find it, the XML is read to be sure.
+        if fileinfo_values is not None and fileinfo_values["filepath"] is None:
+            fileinfo_values = None
+
+    if fileinfo_values is None:
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        root = parse_fits_xml(fits_xml_file(fits_output, fits_name, archive)).getroot()
+        fileinfo = root.find("fits:fileinfo", ns)
+        fileinfo_values = {name: get_text(fileinfo, name) for name in names}
+
+        # The XML is already read, so any error reading it (ET.ParseError, including from incomplete compressed XML)
+        # was raised by parse_fits_xml() for fits_index() to handle. Errors making the rows are not hidden.
+        if rows is not None:
+            rows[fits_name] = fits_xml_rows(root)
+
+    return {"FITS_Name": fits_name,
+            "XML_Size": str(xml_size),
+            "XML_Modified": str(xml_modified),
+            "File_Path": fileinfo_values["filepath"],
+            "File_Size": fileinfo_values["size"],
+            "File_Modified": fileinfo_values["fslastmodified"],
+            "File_MD5": fileinfo_values["md5checksum"]}
+
+
+def scan_fits_fileinfo(fits_file, names):
+    """Returns a dictionary with the text of each element in names from fileinfo in a FITS XML file,
+    the same as get_text() would return, by searching the bytes at the start of the file instead of reading the XML.
+    FITS puts fileinfo before the metadata and tool output, which are usually most of the file,
+    so only the start of the file is read, FITS_SCAN_BYTES at a time.
+    fits_file is the path of the XML, which can be compressed, or a file object (see fits_xml_file()).
+    Returns None if the XML is not in the form FITS saves it in, for example if it is not UTF-8,
+    fileinfo is not in the first FITS_SCAN_LIMIT bytes, the elements have comments or CDATA,
+    or the namespace is declared differently, so it can be read with parse_fits_xml() instead."""
+
+    if isinstance(fits_file, str):
+        try:
+            with (gzip.open if fits_file.endswith(".gz") else open)(fits_file, "rb") as xml_file:
+                return scan_fits_fileinfo(xml_file, names)
+        except (OSError, EOFError, zlib.error):
+            return None
+
+    # Reads the start of the file until the end of fileinfo.
+    head = b""
+    while True:
+        block = fits_file.read(FITS_SCAN_BYTES)
+        head += block
+        end = head.find(b"</fileinfo>")
+        if end != -1 or not block or len(head) >= FITS_SCAN_LIMIT:
+            break
+
+    # Attributes of a tag, which are matched as quoted values, since a value can include ">".
+    attributes = rb"""(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*"""
+    start = re.search(rb"<fileinfo" + attributes + rb">", head)
+    if end == -1 or start is None or start.start() > end:
+        return None
+
+    # Checks that the XML is UTF-8 and the root is FITS, and that fileinfo only has elements with text.
+    # Line endings are not used, since XML changes them to a newline.
+    declaration = re.match(rb"(?:\xef\xbb\xbf)?<\?xml[^>]*encoding=[\"']([^\"']*)", head)
+    if declaration is not None and declaration.group(1).lower() not in (b"utf-8", b"utf8"):
+        return None
+    root = re.search(rb"<([^?!][^\s/>]*)(" + attributes + rb")>", head)
+    if root is None or root.group(1) != b"fits":
+        return None
+
+    # The elements are matched by name without a prefix, so they are only the FITS elements if the root has the only
+    # default namespace (xmlns=) until the end of fileinfo, and no element until then has a prefix.
+    namespaces = rb"\sxmlns\s*=\s*[\"']([^\"']*)[\"']"
+    if re.findall(namespaces, root.group(2)) != [FITS_NS.encode()] or len(re.findall(namespaces, head[:end])) != 1:
+        return None
+    if re.search(rb"<[^\s/>!?]*:", head[:end]) is not None:
+        return None
+    fileinfo = head[start.end():end]
+    if b"<!--" in fileinfo or b"<![CDATA[" in fileinfo or b"<?" in fileinfo or b"\r" in fileinfo:
+        return None
+
+    # Finds every instance of each element, which must all be matched, and combines the text like get_text().
+    values = {}
+    for name in names:
+        tag = re.escape(name.encode())
+        texts = re.findall(rb"<" + tag + attributes + rb"(?:/>|>([^<]*)</" + tag + rb"\s*>)", fileinfo)
+        if len(texts) != len(re.findall(rb"<" + tag + rb"[\s/>]", fileinfo)):
+            return None
+        value = None
+        for text in texts:
+            if not text:
+                continue
+            text = xml_unescape(text)
+            if text is None:
+                return None
+            value = text if value is None else f"{value}; {text}"
+        values[name] = value
+    return values
+
+
+def xml_unescape(text):
+    """Returns the text of an XML element from its bytes (UTF-8), replacing the entities that XML defines
+    and character references with the character. Returns None if the text cannot be decoded
+    or has an entity that is not defined by XML, which means the XML needs to be read to get the text."""
+
+    try:
+        text = text.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "&" not in text:
+        return text
+    if re.search(r"&(?!(?:amp|lt|gt|quot|apos|#[0-9]+|#x[0-9a-fA-F]+);)", text):
+        return None
+    entities = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+    try:
+        return re.sub(r"&(#?)(x?)(\w+);", lambda match: entities[match.group(3)] if not match.group(1)
+                      else chr(int(match.group(3), 16 if match.group(2) else 10)), text)
+    except (ValueError, OverflowError):
+        return None
+
+
+def fits_index(fits_output, remove_unreadable=False, rows=None):
+    """Returns a dictionary with the FITS XML name as the key and the index entry (see fits_index_entry()),
+    which has the original path, size, date last modified, and MD5 of the file, as the value.
+    If rows is a dictionary, the rows for the FITS CSV from the FITS XML that is read are added to it.
+
+    The index is saved as a CSV in the FITS folder, so the next time the script is run only FITS XML that is new,
+    or has a different size or date modified than when it was indexed, needs to be read.
+    Entries for FITS XML that was deleted are removed.
+    If remove_unreadable is True, FITS XML that cannot be read, such as XML that was only partly written
+    when the script was interrupted, is deleted so it will be made again."""
+
+    index_path = os.path.join(fits_output, FITS_INDEX)
+    header = ["FITS_Name", "XML_Size", "XML_Modified", "File_Path", "File_Size", "File_Modified", "File_MD5"]
+
+    # Reads the saved index, if there is one.
+    saved = {}
+    if os.path.exists(index_path):
+        with open(index_path, newline="", encoding="utf-8") as index_file:
+            for entry in csv.DictReader(index_file):
+                saved[entry["FITS_Name"]] = entry
+
+    # If the rows for the FITS CSV are wanted, only FITS XML without saved rows (see FitsRowCache) is read for them.
+    # The rest is searched for the file information without reading the XML, unless remove_unreadable is True.
+    entries = fits_xml_entries(fits_output)
+    saved_rows = set()
+    if rows is not None:
+        row_cache = FitsRowCache(fits_output)
+        saved_rows = row_cache.saved(entries)
+        row_cache.close()
+
+    # Uses the saved entry for each FITS XML that has not changed, and reads the rest.
+    index = {}
+    archive = fits_archive(fits_output)
+    for fits_name, xml_size, xml_modified in entries:
+        entry = saved.get(fits_name)
+        if entry is None or entry["XML_Size"] != str(xml_size) or entry["XML_Modified"] != str(xml_modified):
+            try:
+                entry = fits_index_entry(fits_name, xml_size, xml_modified, fits_output, archive,
+                                         None if fits_name in saved_rows else rows, not remove_unreadable)
+            except ET.ParseError:
+                if not remove_unreadable:
+                    raise
+                print(f"Deleting incomplete FITS XML {fits_name}, which will be made again.")
+                remove_fits_xml(fits_output, fits_name, archive)
+                continue
+        index[fits_name] = entry
+    if archive is not None:
+        archive.close()
+
+    # Saves the updated index. It is written to a temporary file first so an interruption never leaves half an index.
+    with open(f"{index_path}.tmp", "w", newline="", encoding="utf-8") as index_file:
+        index_write = csv.DictWriter(index_file, fieldnames=header)
+        index_write.writeheader()
+        index_write.writerows(index.values())
+    os.replace(f"{index_path}.tmp", index_path)
+    return index
+
+
+def fits_modified(file_stat):
+    """Returns the date last modified from os.stat() as FITS saves it (fslastmodified),
+    which is milliseconds since 1970 from Java's lastModified.
+    It is calculated from st_mtime_ns, since multiplying the st_mtime float by 1000 is sometimes one less."""
+    return file_stat.st_mtime_ns // 1000000
+
+
+def file_changed(path, entry):
+    """Returns True if the file is different from when its FITS XML was made, using the FITS index entry.
+    The size and date last modified are compared first. The MD5 is only calculated if the size is the same
+    and the date is different, for example if the file was copied over with the same content.
+    Values that are missing from the FITS XML are not used."""
+
+    file_stat = os.stat(path)
+    if entry["File_Size"] and entry["File_Size"] != str(file_stat.st_size):
+        return True
+    if entry["File_Modified"] and entry["File_Modified"] == str(fits_modified(file_stat)):
+        return False
+    if entry["File_MD5"]:
+        return entry["File_MD5"] != md5(path)
+    return False
+
+
+def update_fits(accession_folder, fits_output, collection_folder, accession_number, workers=1, batch_size=500,
+                backend=None, cache=None, timeout=None, rows=None):
+    """Deletes any XML files in the FITS folder that do not have a corresponding file in the accession folder
+    and makes a FITS XML file for anything in the accession folder that doesn't have one,
+    or that was edited or replaced since its FITS XML was made (see file_changed()).
+    This is used when the script is run again after doing some appraisal and/or file renaming.
+    If rows is a dictionary, the rows for the FITS CSV from every FITS XML that is read are added to it
+    (see fits_index()), so make_fits_csv() only needs to read the FITS XML that update_fits() did not."""
+
+    # If the last run was interrupted while making FITS XML, the FITS folder is not complete.
+    # Any XML that was only partly written is deleted, and then the files without XML are identified as usual.
+    journal = read_fits_journal(fits_output)
+    if journal is not None:
+        finished, in_progress = journal
+        print(f"Resuming FITS from an interrupted run: {len(finished)} files were finished "
+              f"and {len(in_progress)} were in progress.")
+
+    # Makes a dataframe with the file paths from the accession folder.
+    accession_paths = accession_file_list(accession_folder)
     accession_df = pd.DataFrame(accession_paths, columns=["accession_path"])
 
     # Makes a dataframe with the file names from the FITS folder and the original path from the FITS XML.
     # The original path will match the accession path.
-    fits_data = {"fits_name": [], "fits_path": []}
-    for file in os.listdir(fits_output):
-        fits_data["fits_name"].append(file)
-        tree = ET.parse(os.path.join(fits_output, file))
-        root = tree.getroot()
-        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
-        fileinfo = root.find("fits:fileinfo", ns)
-        path = fileinfo.find("fits:filepath", ns)
-        fits_data["fits_path"].append(path.text)
+    # The FITS index is used so only FITS XML that changed since the last time the script was run is read.
+    index = fits_index(fits_output, remove_unreadable=journal is not None, rows=rows)
+    fits_data = {"fits_name": list(index.keys()), "fits_path": [entry["File_Path"] for entry in index.values()]}
     fits_df = pd.DataFrame(fits_data)
 
     # Makes a list of any files in the FITS folder but not the accession folder.
     # Deletes the FITS files without a corresponding file in the accession folder.
+    # If there is a FITS archive, it is opened once for all the FITS XML that is deleted.
+    archive = fits_archive(fits_output)
     compare_df = fits_df.merge(accession_df, left_on="fits_path", right_on="accession_path", how="left")
     fits_only_df = compare_df[compare_df["accession_path"].isnull()]
     fits_only_list = fits_only_df["fits_name"].to_list()
     for fits in fits_only_list:
-        os.remove(os.path.join(fits_output, fits))
+        remove_fits_xml(fits_output, fits, archive)
+        if rows is not None:
+            rows.pop(fits, None)
 
     # Makes a list of any files in the accession folder but not in the FITs folder.
-    # Creates a FITS file for any files in the accession folder that do not have one.
     compare_df = fits_df.merge(accession_df, left_on="fits_path", right_on="accession_path", how="right")
     acc_only_df = compare_df[compare_df["fits_path"].isnull()]
     acc_only_list = acc_only_df["accession_path"].to_list()
-    for file in acc_only_list:
-        file_name = os.path.basename(file)
-        fits_status = subprocess.run(f'"{c.FITS}" -i "{file}" -o "{collection_folder}/{accession_number}_FITS/{file_name}.fits.xml"',
-                                     shell=True, stderr=subprocess.PIPE)
-        if fits_status.stderr == b'Error: Could not find or load main class edu.harvard.hul.ois.fits.Fits\r\n':
+
+    # Adds any files in both folders that were edited or replaced since the FITS XML was made to the list,
+    # and deletes their FITS XML.
+    accession_set = set(accession_paths)
+    for fits_name, entry in index.items():
+        if entry["File_Path"] in accession_set and file_changed(entry["File_Path"], entry):
+            remove_fits_xml(fits_output, fits_name, archive)
+            if rows is not None:
+                rows.pop(fits_name, None)
+            acc_only_list.append(entry["File_Path"])
+    if archive is not None:
+        archive.close()
+
+    # Creates a FITS file for any files in the accession folder that do not have one or that changed.
+    # The files are identified in batches, so the time for FITS to start is only needed once per batch,
+    # and any files that FITS could not make XML for are reported to the archivist.
+    if len(acc_only_list) > 0:
+        fits_errors = make_fits_xml(acc_only_list, fits_output, workers, batch_size, backend, cache, timeout)
+        log_fits_errors(fits_errors, collection_folder, accession_number)
+
+    # Updates the FITS index with the new FITS XML and without the deleted FITS XML.
+    # The FITS folder is now complete, so the journal from an interrupted run is no longer needed.
+    fits_index(fits_output, rows=rows)
+    if os.path.exists(os.path.join(fits_output, FITS_JOURNAL)):
+        os.remove(os.path.join(fits_output, FITS_JOURNAL))
+
+
+def fits_shards(paths, shard_count, batch_size=None, sizes=None):
+    """Divides a list of file paths into up to shard_count lists, one per FITS process, with no more than batch_size
+    files in a list. If there is a dictionary of file sizes, the files are assigned largest first, each to the shard
+    with the smallest total size so far, so the shards take about the same time and the largest files start first.
+    Without sizes, the shards have nearly equal numbers of files.
+    Returns a list of the shards, largest first, leaving out any that would be empty."""
+
+    if sizes is None:
+        sizes = {}
+    if batch_size is None:
+        batch_size = len(paths)
+
+    # The heap has the total size, number of files, and shard number of every shard with room for more files,
+    # so the smallest shard is always first. sorted() is stable, so files with the same size stay in order.
+    shards = [[] for shard_number in range(shard_count)]
+    shard_sizes = [0] * shard_count
+    heap = [(0, 0, shard_number) for shard_number in range(shard_count)]
+    for path in sorted(paths, key=lambda path: sizes.get(path, 0), reverse=True):
+        total, count, shard_number = heapq.heappop(heap)
+        shards[shard_number].append(path)
+        shard_sizes[shard_number] = total + sizes.get(path, 0)
+        if count + 1 < batch_size:
+            heapq.heappush(heap, (shard_sizes[shard_number], count + 1, shard_number))
+
+    order = sorted(range(shard_count), key=lambda shard_number: shard_sizes[shard_number], reverse=True)
+    return [shards[shard_number] for shard_number in order if len(shards[shard_number]) > 0]
+
+
+def file_sizes(paths):
+    """Returns a dictionary with the size of each file, or 0 if the size cannot be read."""
+
+    sizes = {}
+    for path in paths:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    return sizes
+
+
+def critical_path(shards, sizes, workers):
+    """Estimates how much work the busiest FITS process will have, since the FITS stage is not done until it is.
+    The shards are given to the workers in order, each to the next worker that is free,
+    which is assumed to be the worker with the least work so far.
+    Returns the size of the busiest worker's files, in bytes."""
+
+    worker_sizes = [0] * workers
+    for shard in shards:
+        worker_sizes[worker_sizes.index(min(worker_sizes))] += sum(sizes.get(path, 0) for path in shard)
+    return max(worker_sizes)
+
+
+def save_fits_xml(tree, source_path, fits_output, archive=None):
+    """Saves FITS XML for source_path to the FITS folder, using the same names as FITS does when run on a folder:
+    file.ext.fits.xml, or file.ext-1.fits.xml, file.ext-2.fits.xml, etc. if the name is already used.
+    With the sharded layout, it is saved in a subfolder of the FITS folder (see fits_xml_folder()),
+    and with the archive layout, it is saved in the archive in the FITS folder (see FitsArchive).
+    The XML file is created exclusively, so FITS processes running at the same time never overwrite each other.
+    An archive that is already open can be given, to not open it again for each XML.
+    Returns the name of the FITS XML file, which includes the subfolder or archive if there is one."""
+
+    # With FITS_COMPRESS in the configuration file, only the parts of the XML used by the script are kept
+    # (see prune_fits_xml()), and XML files are compressed with gzip and named file.ext.fits.xml.gz.
+    compress = getattr(c, "FITS_COMPRESS", False)
+    if compress:
+        tree = prune_fits_xml(tree)
+
+    if getattr(c, "FITS_LAYOUT", "flat") == "archive":
+        if archive is not None:
+            return archive.save(tree, source_path)
+        archive = FitsArchive(fits_output)
+        try:
+            return archive.save(tree, source_path)
+        finally:
+            archive.close()
+
+    file_name = os.path.basename(source_path)
+    ending = ".fits.xml.gz" if compress else ".fits.xml"
+    folder = fits_xml_folder(source_path)
+    if folder:
+        os.makedirs(os.path.join(fits_output, folder), exist_ok=True)
+    fits_name = os.path.join(folder, f"{file_name}{ending}")
+    number = 0
+    while True:
+        try:
+            with open(os.path.join(fits_output, fits_name), "xb") as fits_xml:
+                if compress:
+                    with gzip.GzipFile(fileobj=fits_xml, mode="wb") as gzip_xml:
+                        tree.write(gzip_xml, encoding="UTF-8", xml_declaration=True)
+                else:
+                    tree.write(fits_xml, encoding="UTF-8", xml_declaration=True)
+            return fits_name
+        except FileExistsError:
+            number += 1
+            fits_name = os.path.join(folder, f"{file_name}-{number}{ending}")
+
+
+def stop_process(process):
+    """Stops a process that was started with shell=True in a new session, and everything it started,
+    such as the Java program for FITS, which would otherwise keep running after the shell is stopped."""
+
+    if os.name == "nt":
+        subprocess.run(f"taskkill /F /T /PID {process.pid}", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    process.wait()
+
+
+def replace_staged_path(tree, staged_path, source_path):
+    """Replaces the path a file was staged at for FITS, and the folder it was staged in, with the original path
+    and folder everywhere in the FITS XML, including fileinfo and the output of each tool.
+    Some tools write the path with / instead of \\ on Windows, so that form is also replaced."""
+
+    replacements = [(staged_path, source_path), (os.path.dirname(staged_path), os.path.dirname(source_path))]
+    if os.sep == "\\":
+        replacements += [(old.replace("\\", "/"), new.replace("\\", "/")) for old, new in replacements]
+
+    def replace(text):
+        for old, new in replacements:
+            text = text.replace(old, new)
+        return text
+
+    for element in tree.iter():
+        if element.text:
+            element.text = replace(element.text)
+        if element.tail:
+            element.tail = replace(element.tail)
+        for name, value in element.attrib.items():
+            element.set(name, replace(value))
+
+
+class FitsCommand:
+    """Identification backend that runs the FITS command line tool, which starts a new Java program for each batch.
+    FITS can only process a single file or a folder, so each batch of files is linked (or copied, if linking
+    is not possible) into a staging folder, and the path in each FITS XML is changed back to the original path."""
+
+    def __init__(self, command=None):
+        # The command is the quoted path to fits.bat or fits.sh, unless a different command is given for testing.
+        self.command = command if command else f'"{c.FITS}"'
+        self.fits_version = None
+
+    def identify(self, paths, staging_folder, timeout=None):
+        """Runs FITS once on a batch of files.
+        Returns a dictionary with the path as the key and the FITS XML (ElementTree) as the value.
+        Files that FITS did not make XML for are not in the dictionary.
+
+        If there is a timeout (seconds per file) and FITS does not finish another file within that time, FITS is stopped.
+        The file it was stopped on has None as the value, and the files it had not started are run again."""
+
+        # Stages each file in the batch. FITS names the XML after the file name, so files with the same name are
+        # staged in different numbered folders, and the staged path is used to match each XML to its original file.
+        # A file that cannot be staged, for example because it was deleted, will not have XML.
+        input_folder = os.path.join(staging_folder, "input")
+        output_folder = os.path.join(staging_folder, "output")
+        os.makedirs(output_folder)
+        staged_paths = {}
+        name_count = {}
+        for path in paths:
+            file_name = os.path.basename(path)
+            name_count[file_name] = name_count.get(file_name, 0) + 1
+            staged_path = os.path.join(input_folder, str(name_count[file_name]), file_name)
+            os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+            try:
+                os.link(path, staged_path)
+            except OSError:
+                try:
+                    shutil.copy2(path, staged_path)
+                except OSError:
+                    continue
+            staged_paths[os.path.normcase(os.path.abspath(staged_path))] = path
+
+        finished = self.run(input_folder, output_folder, timeout)
+
+        # Replaces the staged path in each FITS XML with the original path, using filepath to find the original.
+        # If FITS could not read a file, it will not have XML and is not included in the dictionary.
+        ns = {"fits": FITS_NS}
+        fits_trees = {}
+        for fits_xml in os.listdir(output_folder):
+            try:
+                tree = ET.parse(os.path.join(output_folder, fits_xml))
+            except ET.ParseError:
+                continue
+            filepath = tree.getroot().find("fits:fileinfo/fits:filepath", ns)
+            if filepath is None or filepath.text is None:
+                continue
+            source_path = staged_paths.pop(os.path.normcase(os.path.abspath(filepath.text)), None)
+            if source_path is None:
+                continue
+            replace_staged_path(tree, filepath.text, source_path)
+            fits_trees[source_path] = tree
+
+        # If FITS was stopped, the files still in staged_paths were not finished.
+        # FITS identifies the files in the order they are in the input folder, so the first of them in that order
+        # is the one FITS was stopped on, which is set aside. The rest are run again as one batch.
+        if not finished and staged_paths:
+            input_paths = (os.path.normcase(os.path.abspath(os.path.join(root, file)))
+                           for root, directories, files in os.walk(input_folder) for file in files)
+            stopped = next((path for path in input_paths if path in staged_paths), next(iter(staged_paths)))
+            fits_trees[staged_paths.pop(stopped)] = None
+            if staged_paths:
+                fits_trees.update(self.identify(list(staged_paths.values()), os.path.join(staging_folder, "rest"),
+                                                timeout))
+
+        shutil.rmtree(staging_folder)
+        return fits_trees
+
+    def run(self, input_folder, output_folder, timeout=None):
+        """Runs FITS on every file in the input folder.
+        If there is a timeout, FITS saving new FITS XML in the output folder is checked for progress,
+        and FITS is stopped if it goes longer than timeout seconds without saving any.
+        Returns False if FITS was stopped, or True if it finished."""
+
+        process = subprocess.Popen(f'{self.command} -r -i "{os.path.abspath(input_folder)}" -o "{output_folder}"',
+                                   shell=True, stderr=subprocess.PIPE, start_new_session=True)
+        xml_count = 0
+        last_progress = time.monotonic()
+        while True:
+            try:
+                stderr = process.communicate(timeout=min(timeout, FITS_PROGRESS_SECONDS) if timeout else None)[1]
+                break
+            except subprocess.TimeoutExpired:
+                new_count = len(os.listdir(output_folder))
+                if new_count > xml_count:
+                    xml_count = new_count
+                    last_progress = time.monotonic()
+                elif time.monotonic() - last_progress >= timeout:
+                    stop_process(process)
+                    process.communicate()
+                    return False
+        if stderr == b'Error: Could not find or load main class edu.harvard.hul.ois.fits.Fits\r\n':
             print("Unable to generate FITS XML.")
             print("The FITS folder and accession folder need to be on the same letter drive.")
             sys.exit()
+        return True
+
+    def version(self):
+        """Returns the FITS version, which is only looked up the first time it is needed."""
+        if self.fits_version is None:
+            fits_status = subprocess.run(f'{self.command} -v', shell=True, stdout=subprocess.PIPE)
+            self.fits_version = fits_status.stdout.decode("utf-8").strip()
+        return self.fits_version
+
+    def close(self):
+        """Nothing to stop, since each FITS process ends when its batch is done."""
+        pass
+
+
+class FitsDaemon:
+    """Identification backend that sends files to FITS processes which keep running between files and batches,
+    so Java does not have to start again for every batch or every run of update_fits.
+    The daemons are stopped at the end of each run of the script. To keep FITS running between runs, use FitsService.
+
+    FITS does not include a daemon, so FITS_DAEMON in the configuration file must be the command for a program that
+    starts FITS once (for example, a Java wrapper around the FITS library) and reads and writes
+    through standard input and output, one file at a time:
+        request: the file path, followed by a new line
+        response: "OK" and the number of bytes of FITS XML, followed by a new line and then that FITS XML,
+                  or "ERROR" and a message, followed by a new line.
+    The request VERSION, followed by a new line, gets the same response with the FITS version instead of XML.
+    fits_standin.py --daemon does this with made up FITS XML, to test and time this script without Java.
+    One daemon is started for each worker that needs one, and it is reused by later batches."""
+
+    def __init__(self, command=None):
+        self.command = command if command else c.FITS_DAEMON
+        self.idle = queue.Queue()
+        self.processes = []
+        self.lock = threading.Lock()
+        self.fits_version = None
+
+    def start(self):
+        """Starts a new daemon process and returns it."""
+        process = subprocess.Popen(self.command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   start_new_session=True)
+        with self.lock:
+            self.processes.append(process)
+        return process
+
+    def send(self, process, line):
+        """Sends one request to a daemon process.
+        Returns the bytes of the response, or None if the response is an error.
+        Raises OSError if the daemon stopped before responding."""
+        process.stdin.write(line.encode("utf-8") + b"\n")
+        process.stdin.flush()
+        status_line = process.stdout.readline()
+        if not status_line:
+            raise OSError("The FITS daemon stopped without responding.")
+        status = status_line.decode("utf-8").split(" ", 1)
+        if status[0] != "OK":
+            return None
+        return process.stdout.read(int(status[1]))
+
+    def request(self, process, path):
+        """Sends one file path to a daemon process.
+        Returns the FITS XML (ElementTree), or None if the daemon could not identify the file."""
+        if "\n" in path:
+            return None
+        fits_xml = self.send(process, path)
+        if fits_xml is None:
+            return None
+        try:
+            return ET.ElementTree(ET.fromstring(fits_xml))
+        except ET.ParseError:
+            return None
+
+    def version(self):
+        """Returns the FITS version, which is only requested from a daemon the first time it is needed."""
+        if self.fits_version is None:
+            try:
+                process = self.idle.get_nowait()
+            except queue.Empty:
+                process = self.start()
+            response = self.send(process, "VERSION")
+            self.fits_version = response.decode("utf-8") if response else ""
+            self.idle.put(process)
+        return self.fits_version
+
+    def identify(self, paths, staging_folder, timeout=None):
+        """Sends a batch of files to an idle daemon process, starting a new one if none are idle.
+        Returns a dictionary with the path as the key and the FITS XML (ElementTree) as the value.
+        Files that the daemon did not make XML for are not in the dictionary.
+        If there is a timeout (seconds per file), a daemon that takes longer than that for a file is stopped.
+        If the daemon is stopped or ends while identifying a file, the file has None as the value,
+        and a new daemon is started for the rest of the batch.
+        The staging folder is not used, since the daemon reads each file from its original location."""
+
+        try:
+            process = self.idle.get_nowait()
+        except queue.Empty:
+            process = self.start()
+
+        fits_trees = {}
+        for path in paths:
+            # A daemon that ended while it was idle is replaced.
+            if process.poll() is not None:
+                process = self.start()
+            tree, stopped = self.timed_request(process, path, timeout)
+            if stopped:
+                stop_process(process)
+                process = self.start()
+                if tree is None:
+                    fits_trees[path] = None
+                    continue
+            if tree is not None:
+                fits_trees[path] = tree
+
+        self.idle.put(process)
+        return fits_trees
+
+    def timed_request(self, process, path, timeout=None):
+        """Sends one file path to a daemon process, which is stopped if it takes longer than timeout seconds.
+        Returns the FITS XML (ElementTree), or None if the daemon could not identify the file,
+        and True if the daemon was stopped or ended before responding, or False if it can be used again."""
+
+        answered = threading.Event()
+        expired = threading.Event()
+        guard = threading.Lock()
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self.expire, [process, answered, expired, guard])
+            timer.start()
+
+        # A response that cannot be read means the daemon is not following the protocol, so it is not used again.
+        stopped = False
+        try:
+            tree = self.request(process, os.path.abspath(path))
+        except (OSError, ValueError):
+            tree = None
+            stopped = True
+
+        # Once there is a response, the timer does not stop the daemon, even if it is already due.
+        with guard:
+            answered.set()
+        if timer is not None:
+            timer.cancel()
+        return tree, stopped or expired.is_set()
+
+    @staticmethod
+    def expire(process, answered, expired, guard):
+        """Stops a daemon process that took too long for a file, unless it has responded,
+        and sets the expired event so it is reported."""
+        with guard:
+            if answered.is_set():
+                return
+            expired.set()
+            stop_process(process)
+
+    def close(self):
+        """Stops all the daemon processes. Each daemon ends when its standard input is closed."""
+        for process in self.processes:
+            if process.poll() is None:
+                process.stdin.close()
+                process.wait()
+        self.processes = []
+        self.idle = queue.Queue()
+
+
+class FitsService:
+    """Identification backend that sends files to the FITS web service (FITS Service, which runs FITS in Tomcat),
+    so FITS keeps running between batches and between runs of the script, and Java is only started with Tomcat.
+
+    FITS_SERVICE in the configuration file is the address of the service, for example http://localhost:8080/fits.
+    Each file is identified with a GET request to examine, with the file path as the file parameter,
+    which returns the FITS XML, and the FITS version is from a GET request to version.
+    The service reads each file from its path, so it must be able to reach the accession folder with the same paths."""
+
+    def __init__(self, url=None):
+        self.url = (url if url else c.FITS_SERVICE).rstrip("/")
+        self.fits_version = None
+
+    def get(self, endpoint, timeout=None):
+        """Sends one GET request to the service.
+        Returns the bytes of the response, or None if the service gave an error or took longer than the timeout."""
+        try:
+            with urllib.request.urlopen(f"{self.url}/{endpoint}", timeout=timeout) as response:
+                return response.read()
+        except (urllib.error.URLError, OSError):
+            return None
+
+    def version(self):
+        """Returns the FITS version, which is only requested from the service the first time it is needed."""
+        if self.fits_version is None:
+            response = self.get("version")
+            self.fits_version = response.decode("utf-8").strip() if response else ""
+        return self.fits_version
+
+    def identify(self, paths, staging_folder, timeout=None):
+        """Sends a batch of files to the service, one request per file.
+        Returns a dictionary with the path as the key and the FITS XML (ElementTree) as the value.
+        Files that the service did not make XML for are not in the dictionary.
+        If there is a timeout (seconds per file), a file the service does not answer within that has None as the value.
+        The staging folder is not used, since the service reads each file from its original location."""
+
+        fits_trees = {}
+        for path in paths:
+            query = urllib.parse.urlencode({"file": os.path.abspath(path)})
+            try:
+                with urllib.request.urlopen(f"{self.url}/examine?{query}", timeout=timeout) as response:
+                    fits_xml = response.read()
+            except socket.timeout:
+                fits_trees[path] = None
+                continue
+            except urllib.error.URLError as error:
+                if isinstance(error.reason, socket.timeout):
+                    fits_trees[path] = None
+                continue
+            except OSError:
+                continue
+            try:
+                fits_trees[path] = ET.ElementTree(ET.fromstring(fits_xml))
+            except ET.ParseError:
+                continue
+        return fits_trees
+
+    def close(self):
+        """Nothing to stop, since the service keeps running after the script ends."""
+        pass
+
+
+def triage_ambiguous(fits_trees, df_nara):
+    """Finds files where the identification from triage is not good enough to use,
+    because there is more than one format identification, no PUID, no version, or no match to a NARA format.
+    fits_trees is a dictionary with the path as the key and the FITS XML from triage (ElementTree) as the value.
+    Returns a set of the paths that need to be identified with the full FITS tools."""
+
+    rows = []
+    for path, tree in fits_trees.items():
+        for row in fits_xml_rows(tree.getroot()):
+            rows.append(row._replace(file_path=path))
+    if len(rows) == 0:
+        return set()
+    df_fits = pd.DataFrame(rows, columns=FITS_COLUMNS)
+
+    unclear = df_fits["FITS_Multiple_IDs"] | df_fits["FITS_PUID"].isnull() | df_fits["FITS_Format_Version"].isnull()
+    ambiguous = set(df_fits.loc[unclear, "FITS_File_Path"])
+    df_nara_match = match_nara_risk(df_fits, df_nara.copy())
+    ambiguous.update(df_nara_match.loc[df_nara_match["NARA_Match_Type"] == "No NARA Match", "FITS_File_Path"])
+    return ambiguous
+
+
+class FitsTriage:
+    """Identification backend for triage mode, which identifies every file with a reduced set of FITS tools
+    that is much faster (FITS run with FITS_TRIAGE_CONFIG, such as only DROID and file utility),
+    and then identifies only the files with an ambiguous result (see triage_ambiguous()) with the full FITS tools.
+    The triage tools always use the FITS command line tool. The full tools use the backend given (see fits_backend()).
+    FITS XML that is from triage has the attribute tier="triage", so fits.csv shows which tier identified each file."""
+
+    def __init__(self, full_backend, triage_backend=None, df_nara=None):
+        self.full_backend = full_backend
+        if triage_backend is None:
+            triage_backend = FitsCommand(f'"{c.FITS}" -f "{c.FITS_TRIAGE_CONFIG}"')
+        self.triage_backend = triage_backend
+        self.df_nara = df_nara if df_nara is not None else csv_to_dataframe(c.NARA)
+
+    def identify(self, paths, staging_folder, timeout=None):
+        """Identifies a batch of files with the triage tools, and then any that are ambiguous with the full tools.
+        Files that triage could not make XML for are also tried with the full tools.
+        Returns a dictionary with the path as the key and the FITS XML (ElementTree) as the value,
+        in the same way as the other backends."""
+
+        fits_trees = self.triage_backend.identify(paths, os.path.join(staging_folder, "triage"), timeout)
+        triaged = {path: tree for path, tree in fits_trees.items() if tree is not None}
+        ambiguous = triage_ambiguous(triaged, self.df_nara)
+        for path, tree in triaged.items():
+            if path not in ambiguous:
+                tree.getroot().set("tier", "triage")
+
+        full_paths = [path for path in paths if path in ambiguous or path not in fits_trees]
+        if len(full_paths) > 0:
+            for path in full_paths:
+                fits_trees.pop(path, None)
+            fits_trees.update(self.full_backend.identify(full_paths, os.path.join(staging_folder, "full"), timeout))
+        return fits_trees
+
+    def version(self):
+        """Returns the FITS version with "triage" added, so the FITS cache keeps triage and full results separate."""
+        return f"{self.full_backend.version()} triage"
+
+    def close(self):
+        """Stops the processes for both tiers."""
+        self.triage_backend.close()
+        self.full_backend.close()
+
+
+def fits_backend(name, mode="full"):
+    """Returns the identification backend for the name in the script options: "command", "daemon", or "service".
+    If the mode is "triage", the backend is only used for files that need the full FITS tools (see FitsTriage)."""
+
+    if name == "daemon":
+        backend = FitsDaemon()
+    elif name == "service":
+        backend = FitsService()
+    else:
+        backend = FitsCommand()
+    if mode == "triage":
+        return FitsTriage(backend)
+    return backend
+
+
+def md5(file_path):
+    """Calculates the MD5 of the specified file path. Reads the file in chunks to avoid memory issues.
+    Returns the MD5."""
+    hash_md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1048576), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def duplicate_files(paths, md5_values=None):
+    """Finds files with the same content, so FITS only needs to identify one of them.
+    Files are first grouped by size, and the MD5 is only calculated for files with the same size as another file.
+    The file extension must also match, since some FITS tools use the extension to identify the format.
+    If md5_values (a dictionary) is given, the MD5 calculated for each path is added to it,
+    so it does not have to be calculated again when the FITS cache or a file signature needs it.
+    Returns a dictionary with the first path with each content as the key
+    and a list of any other paths with the same content as the value."""
+
+    # Groups the files by size and extension. Files that cannot be read are each kept on their own.
+    unique = {}
+    size_groups = {}
+    for path in paths:
+        try:
+            size_groups.setdefault((os.path.getsize(path), os.path.splitext(path)[1].lower()), []).append(path)
+        except OSError:
+            unique[path] = []
+
+    # Groups files that have the same size and extension by MD5.
+    for size_group in size_groups.values():
+        if len(size_group) == 1:
+            unique[size_group[0]] = []
+            continue
+        md5_groups = {}
+        for path in size_group:
+            try:
+                md5_value = md5(path)
+            except OSError:
+                unique[path] = []
+                continue
+            md5_groups.setdefault(md5_value, []).append(path)
+            if md5_values is not None:
+                md5_values[path] = md5_value
+        for md5_group in md5_groups.values():
+            unique[md5_group[0]] = md5_group[1:]
+
+    return unique
+
+
+def copy_fits_xml(tree, copy_path):
+    """Makes FITS XML for a file that has the same content as the file the FITS XML is for,
+    by copying the XML and replacing the path, name, and date last modified with those of copy_path.
+    Returns the new FITS XML (ElementTree)."""
+
+    ns = {"fits": FITS_NS}
+    root = copy.deepcopy(tree.getroot())
+    fileinfo = root.find("fits:fileinfo", ns)
+    changes = {"filepath": copy_path,
+               "filename": os.path.basename(copy_path),
+               "fslastmodified": str(fits_modified(os.stat(copy_path)))}
+    for element_name, text in changes.items():
+        element = fileinfo.find(f"fits:{element_name}", ns)
+        if element is not None:
+            element.text = text
+    return ET.ElementTree(root)
+
+
+def prune_fits_xml(tree):
+    """Returns a copy of the FITS XML with only the parts that are used by fits_row():
+    identification, fileinfo, and filestatus. The rest, such as metadata, can be much larger."""
+
+    ns = {"fits": FITS_NS}
+    root = ET.Element(tree.getroot().tag, tree.getroot().attrib)
+    for element_name in ("identification", "fileinfo", "filestatus"):
+        element = tree.getroot().find(f"fits:{element_name}", ns)
+        if element is not None:
+            root.append(copy.deepcopy(element))
+    return ET.ElementTree(root)
+
+
+class FitsCache:
+    """Saves FITS identifications in a SQLite database, so a file with the same content as a file that was already
+    identified, in this or any other accession, does not need to be identified again.
+
+    The key is the MD5, the file extension (since some FITS tools use it), and the FITS version,
+    so the cache does not need to be cleared when FITS is updated. Only the parts of the FITS XML used by the script
+    are saved (see prune_fits_xml()). When the cache is larger than size_limit (MB),
+    the identifications that were used least recently are deleted."""
+
+    def __init__(self, cache_path, size_limit):
+        self.size_limit = size_limit * 1000000
+        self.fits_version = ""
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(cache_path, timeout=60, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fits_cache "
+                                "(key TEXT PRIMARY KEY, fits_xml BLOB, size INTEGER, last_used REAL)")
+        self.connection.commit()
+
+    def key(self, md5_value, path):
+        """Returns the cache key for a file with this MD5 and path."""
+        return f"{md5_value}|{os.path.splitext(path)[1].lower()}|{self.fits_version}"
+
+    def get(self, path, md5_value=None):
+        """Returns the FITS XML (ElementTree) for a file with the same content as path, or None if it is not cached.
+        The MD5 of the file is calculated if it is not given.
+        The XML has the path, name, and date last modified from the file that was first identified."""
+        try:
+            key = self.key(md5_value if md5_value else md5(path), path)
+        except OSError:
+            return None
+        with self.lock:
+            row = self.connection.execute("SELECT fits_xml FROM fits_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE fits_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return ET.ElementTree(ET.fromstring(zlib.decompress(row[0])))
+
+    def put(self, fits_trees):
+        """Saves the FITS XML for each file in a dictionary with the path as the key and FITS XML as the value.
+        The MD5 calculated by FITS is used, so the files do not need to be read again."""
+        ns = {"fits": FITS_NS}
+        with self.lock:
+            for path, tree in fits_trees.items():
+                md5_value = tree.getroot().find("fits:fileinfo/fits:md5checksum", ns)
+                if md5_value is None or md5_value.text is None:
+                    continue
+                fits_xml = zlib.compress(ET.tostring(prune_fits_xml(tree).getroot(), encoding="UTF-8"))
+                self.connection.execute("INSERT OR REPLACE INTO fits_cache VALUES (?, ?, ?, ?)",
+                                        (self.key(md5_value.text, path), fits_xml, len(fits_xml), time.time()))
+            self.connection.commit()
+
+    def evict(self):
+        """Deletes the least recently used identifications until the cache is no larger than the size limit."""
+        with self.lock:
+            total = self.connection.execute("SELECT TOTAL(size) FROM fits_cache").fetchone()[0]
+            if total > self.size_limit:
+                rows = self.connection.execute("SELECT key, size FROM fits_cache ORDER BY last_used").fetchall()
+                for key, size in rows:
+                    if total <= self.size_limit:
+                        break
+                    self.connection.execute("DELETE FROM fits_cache WHERE key = ?", (key,))
+                    total -= size
+            self.connection.commit()
+
+    def close(self):
+        """Saves any changes and closes the database."""
+        self.connection.commit()
+        self.connection.close()
+
+
+def fits_cache():
+    """Returns the FITS cache from FITS_CACHE in the configuration file, or None if the cache is not used."""
+
+    if not getattr(c, "FITS_CACHE", ""):
+        return None
+    return FitsCache(c.FITS_CACHE, getattr(c, "FITS_CACHE_SIZE", 1000))
+
+
+class FitsJournal:
+    """Records the progress of making FITS XML in a CSV in the FITS folder, so a run that is interrupted
+    can be resumed by update_fits() instead of the partly filled FITS folder being treated as complete.
+    Each row is a status and a file path: STARTED when the file is given to FITS and DONE when its XML is saved.
+    The journal is deleted when the run finishes, so a journal in the FITS folder means the last run was interrupted.
+    Rows are written as soon as they are recorded, and threads identifying different shards can share the journal."""
+
+    def __init__(self, fits_output):
+        self.path = os.path.join(fits_output, FITS_JOURNAL)
+        self.lock = threading.Lock()
+        self.journal_file = open(self.path, "a", newline="", encoding="utf-8")
+        self.journal_write = csv.writer(self.journal_file)
+
+    def record(self, status, paths):
+        """Adds a row with the status for each path."""
+        with self.lock:
+            self.journal_write.writerows([status, path] for path in paths)
+            self.journal_file.flush()
+
+    def finish(self):
+        """Deletes the journal, since the run is complete."""
+        self.journal_file.close()
+        os.remove(self.path)
+
+
+def read_fits_journal(fits_output):
+    """Reads the journal left in the FITS folder by an interrupted run (see FitsJournal).
+    Returns a set of the paths that were finished and a set of the paths that were started but not finished,
+    or None if there is no journal, because the last run was not interrupted."""
+
+    journal_path = os.path.join(fits_output, FITS_JOURNAL)
+    if not os.path.exists(journal_path):
+        return None
+    started = set()
+    finished = set()
+    with open(journal_path, newline="", encoding="utf-8") as journal_file:
+        for row in csv.reader(journal_file):
+            # The last row may be incomplete if the run was interrupted while it was written.
+            if len(row) != 2:
+                continue
+            if row[0] == "STARTED":
+                started.add(row[1])
+            elif row[0] == "DONE":
+                finished.add(row[1])
+    return finished, started - finished
+
+
+def save_fits_group(tree, path, fits_output, duplicates, journal=None, fits_csv=None, archive=None):
+    """Saves the FITS XML for path to the FITS folder, and a copy for every other path with the same content.
+    duplicates is a dictionary with any other paths with the same content as each path (see duplicate_files()).
+    If there is a journal (see FitsJournal), the paths with saved XML are recorded as done.
+    If there is a FITS CSV being made at the same time (see FitsCsvStream), the saved XML is added to it.
+    archive is the FITS archive, if the XML is saved with the archive layout (see FitsArchive).
+    Returns a list of the paths with the same content that a copy could not be made for."""
+
+    fits_errors = []
+    fits_names = [save_fits_xml(tree, path, fits_output, archive)]
+    for copy_path in duplicates.get(path, []):
+        try:
+            fits_names.append(save_fits_xml(copy_fits_xml(tree, copy_path), copy_path, fits_output, archive))
+        except OSError:
+            fits_errors.append(copy_path)
+    if fits_csv is not None:
+        for fits_name in fits_names:
+            fits_csv.add(fits_name, archive)
+    if journal is not None:
+        journal.record("DONE", [done for done in [path] + duplicates.get(path, []) if done not in fits_errors])
+    return fits_errors
+
+
+def script_fits_xml(path, format_name, tool=None, version=None, puid=None, md5_value=None, message=None):
+    """Makes FITS XML for a file that was identified by this script instead of FITS, in the same form as FITS,
+    so it works with the rest of the script. tool is the version for the tool "format_analysis.py" in the XML.
+    Returns the FITS XML (ElementTree)."""
+
+    root = ET.Element(f"{{{FITS_NS}}}fits")
+    identification = ET.SubElement(root, f"{{{FITS_NS}}}identification")
+    identity = ET.SubElement(identification, f"{{{FITS_NS}}}identity", {"format": format_name})
+    if tool:
+        ET.SubElement(identity, f"{{{FITS_NS}}}tool", {"toolname": "format_analysis.py", "toolversion": tool})
+    if version:
+        ET.SubElement(identity, f"{{{FITS_NS}}}version").text = version
+    if puid:
+        ET.SubElement(identity, f"{{{FITS_NS}}}externalIdentifier", {"type": "puid"}).text = puid
+    fileinfo = ET.SubElement(root, f"{{{FITS_NS}}}fileinfo")
+    ET.SubElement(fileinfo, f"{{{FITS_NS}}}filepath").text = path
+    ET.SubElement(fileinfo, f"{{{FITS_NS}}}filename").text = os.path.basename(path)
+    ET.SubElement(fileinfo, f"{{{FITS_NS}}}size").text = str(os.path.getsize(path))
+    if md5_value:
+        ET.SubElement(fileinfo, f"{{{FITS_NS}}}md5checksum").text = md5_value
+    ET.SubElement(fileinfo, f"{{{FITS_NS}}}fslastmodified").text = str(fits_modified(os.stat(path)))
+    filestatus = ET.SubElement(root, f"{{{FITS_NS}}}filestatus")
+    if message:
+        ET.SubElement(filestatus, f"{{{FITS_NS}}}message").text = message
+    return ET.ElementTree(root)
+
+
+def failed_fits_xml(path, message):
+    """Makes FITS XML for a file that FITS could not identify, so it is still in the analysis,
+    with "Identification Failed" as the format name and the reason as the status message.
+    The file information only includes what can be found without reading the file.
+    Returns the FITS XML (ElementTree)."""
+    return script_fits_xml(path, "Identification Failed", message=message)
+
+
+def signature_fits_xml(path, signatures, md5_value=None):
+    """Makes FITS XML without running FITS for a file that is empty, if signatures includes "empty",
+    which FITS identifies as the format "empty" (but with the file utility as the tool),
+    or that starts with one of the signatures (a key in SIGNATURES) and has the expected file extension.
+    These files do not need the FITS tools, and there are often many of them, such as in disk images.
+    The XML has the attribute tier="signature", so fits.csv shows the file was not identified by FITS.
+    The MD5 of the file is calculated if it is not given.
+    Returns the FITS XML (ElementTree), or None if the file needs to be identified by FITS."""
+
+    try:
+        if "empty" in signatures and os.path.getsize(path) == 0:
+            tree = script_fits_xml(path, "empty", tool="zero-byte", md5_value=hashlib.md5().hexdigest())
+            tree.getroot().set("tier", "signature")
+            return tree
+        with open(path, "rb") as file:
+            header = file.read(16)
+    except OSError:
+        return None
+
+    extension = os.path.splitext(path)[1].lower()
+    for signature_name in signatures:
+        for magic, extensions, format_name, version, puid in SIGNATURES.get(signature_name, []):
+            if header.startswith(magic) and extension in extensions:
+                tree = script_fits_xml(path, format_name, tool="signature", version=version, puid=puid,
+                                       md5_value=md5_value if md5_value else md5(path))
+                tree.getroot().set("tier", "signature")
+                return tree
+    return None
+
+
+def identify_shard(backend, paths, staging_folder, fits_output, duplicates, cache=None, journal=None, timeout=None,
+                   fits_csv=None, archive=None):
+    """Identifies a shard (list) of the files in the accession with the backend and saves the XML to the FITS folder.
+    duplicates is a dictionary with any other paths with the same content as each path (see duplicate_files()),
+    which get a copy of that path's XML instead of being identified again.
+    If there is a FITS cache, the new identifications are added to it.
+    If there is a journal (see FitsJournal), the paths are recorded as started and then done.
+    If there is a FITS CSV being made at the same time (see FitsCsvStream), the saved XML is added to it.
+    If there is a timeout, files that take FITS longer than that many seconds are not saved.
+    archive is the FITS archive, if the XML is saved with the archive layout (see FitsArchive).
+    Returns a list of the paths in the shard, and their duplicates, that the backend did not make XML for,
+    and a list of the paths in the shard that took longer than the timeout."""
+
+    fits_errors = []
+    timed_out = []
+    if journal is not None:
+        journal.record("STARTED", paths)
+    fits_trees = backend.identify(paths, staging_folder, timeout)
+    for path in paths:
+        if path not in fits_trees:
+            fits_errors.append(path)
+            fits_errors.extend(duplicates.get(path, []))
+        elif fits_trees[path] is None:
+            timed_out.append(path)
+        else:
+            fits_errors.extend(save_fits_group(fits_trees[path], path, fits_output, duplicates, journal, fits_csv,
+                                               archive))
+    if cache is not None:
+        cache.put({path: tree for path, tree in fits_trees.items() if tree is not None})
+    return fits_errors, timed_out
+
+
+def make_fits_xml(paths, fits_output, workers, batch_size=500, backend=None, cache=None, timeout=None,
+                  retry_timeout=None, fits_csv=None):
+    """Makes FITS XML for every file in the list of paths, running several FITS processes at the same time.
+    The files are divided into at least one shard per worker, with no more than batch_size files in a shard
+    and the largest files first (see fits_shards()), and each shard is identified by a single FITS process
+    so the time for FITS to start is only needed once a shard.
+    The backend is how FITS is run (see fits_backend()), and is the FITS command line tool if one is not given.
+    Only one file with each content is identified, and the other files with the same content get a copy of its XML.
+    Files that are empty or have a signature that is certain of the format do not need FITS, if that signature is in
+    FITS_SIGNATURES in the configuration file (see signature_fits_xml()).
+    If there is a FITS cache (see FitsCache), files that are in it are not identified again.
+    Progress is recorded in a journal in the FITS folder (see FitsJournal) until all the XML is made,
+    so an interrupted run can be resumed.
+    If there is a timeout, files that take FITS longer than that many seconds are put in quarantine and tried again
+    after everything else, with retry_timeout (FITS_RETRY_TIMEOUT in the configuration file, or ten times timeout).
+    Files that still do not finish get FITS XML with "Identification Failed" as the format (see failed_fits_xml()).
+    All of the XML is saved to the FITS folder, so it can be combined into a CSV by make_fits_csv()
+    the same as XML from FITS run on the accession folder. If fits_csv is given (see FitsCsvStream),
+    each XML is also added to the CSV as soon as it is saved, while the other files are still being identified.
+    Returns a list of the paths that FITS did not make XML for."""
+
+    # The staging folder is next to the FITS folder, so it is on the same letter drive as FITS requires.
+    # If a run was interrupted, its staging folder is still there and is deleted, since those files are staged again.
+    staging_folder = f"{fits_output}_staging"
+    if os.path.exists(staging_folder):
+        shutil.rmtree(staging_folder)
+
+    # Finds files with the same content, so FITS only runs on one of them.
+    # The MD5 of each file that had to be calculated for this is kept, so it is not calculated again.
+    md5_values = {}
+    duplicates = duplicate_files(paths, md5_values)
+    unique_paths = list(duplicates.keys())
+    if len(unique_paths) < len(paths):
+        print(f"FITS will identify {len(unique_paths)} files, since {len(paths) - len(unique_paths)} files "
+              f"have the same content as another file.")
+
+    # Makes FITS XML without FITS for files that are empty or have a signature that is certain of the format,
+    # for the signatures in the configuration file.
+    # With the archive layout, all the XML is saved with one connection to the archive (see FitsArchive).
+    fits_errors = []
+    journal = FitsJournal(fits_output)
+    archive = FitsArchive(fits_output) if getattr(c, "FITS_LAYOUT", "flat") == "archive" else None
+    signatures = getattr(c, "FITS_SIGNATURES", [])
+    unsigned_paths = []
+    for path in unique_paths:
+        tree = signature_fits_xml(path, signatures, md5_values.get(path))
+        if tree is None:
+            unsigned_paths.append(path)
+        else:
+            fits_errors.extend(save_fits_group(tree, path, fits_output, duplicates, journal, fits_csv, archive))
+    if len(unsigned_paths) < len(unique_paths):
+        print(f"Identified {len(unique_paths) - len(unsigned_paths)} empty files or file signatures without FITS.")
+    unique_paths = unsigned_paths
+
+    # Uses the FITS cache, if there is one, for files that have the same content as a file identified before.
+    if backend is None:
+        backend = FitsCommand()
+    if cache is not None:
+        cache.fits_version = backend.version()
+        uncached_paths = []
+        for path in unique_paths:
+            tree = cache.get(path, md5_values.get(path))
+            if tree is None:
+                uncached_paths.append(path)
+            else:
+                fits_errors.extend(save_fits_group(copy_fits_xml(tree, path), path, fits_output, duplicates, journal,
+                                                   fits_csv, archive))
+        if len(uncached_paths) < len(unique_paths):
+            print(f"Used the FITS cache for {len(unique_paths) - len(uncached_paths)} files.")
+        unique_paths = uncached_paths
+
+    # Divides the files into shards with the largest files first, so a very large file does not start last
+    # and keep one FITS process running long after the others are done.
+    # Reports the critical path, the work for the busiest FITS process, so the archivist can tell when it may finish.
+    sizes = file_sizes(unique_paths)
+    shards = fits_shards(unique_paths, max(workers, math.ceil(len(unique_paths) / batch_size)), batch_size, sizes)
+    if len(shards) > 1:
+        total_mb = sum(sizes.values()) / 1000000
+        print(f"FITS will identify {total_mb:.1f} MB. The busiest FITS process has "
+              f"{critical_path(shards, sizes, workers) / 1000000:.1f} MB, "
+              f"including the largest file ({max(sizes.values()) / 1000000:.1f} MB).")
+
+    # Each FITS process is started from a thread. The FITS processes do the work, so the threads are mostly idle.
+    quarantine = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(identify_shard, backend, shard, os.path.join(staging_folder, str(number)),
+                                   fits_output, duplicates, cache, journal, timeout, fits_csv, archive)
+                   for number, shard in enumerate(shards)]
+        for future in futures:
+            shard_errors, timed_out = future.result()
+            fits_errors.extend(shard_errors)
+            quarantine.extend(timed_out)
+
+    # Files that took longer than the timeout are tried again one at a time, now that nothing else is waiting on them.
+    if len(quarantine) > 0:
+        if retry_timeout is None:
+            retry_timeout = getattr(c, "FITS_RETRY_TIMEOUT", timeout * 10)
+        print(f"FITS took longer than {timeout} seconds for {len(quarantine)} files, "
+              f"which will be tried again with {retry_timeout} seconds.")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(identify_shard, backend, [path], os.path.join(staging_folder, f"retry{number}"),
+                                       fits_output, duplicates, cache, journal, retry_timeout, fits_csv, archive)
+                       for number, path in enumerate(sorted(quarantine, key=sizes.get, reverse=True))]
+            for future in futures:
+                shard_errors, timed_out = future.result()
+                fits_errors.extend(shard_errors)
+                for path in timed_out:
+                    print(f"FITS did not finish identifying {path} in {retry_timeout} seconds.")
+                    failed_tree = failed_fits_xml(path, f"FITS did not finish in {retry_timeout} seconds")
+                    fits_errors.extend(save_fits_group(failed_tree, path, fits_output, duplicates, journal, fits_csv,
+                                                       archive))
+
+    if cache is not None:
+        cache.evict()
+
+    # The FITS CSV being made at the same time reads the XML from the archive, so it must finish reading first.
+    if archive is not None:
+        if fits_csv is not None:
+            fits_csv.wait()
+        archive.close()
+
+    if os.path.exists(staging_folder):
+        shutil.rmtree(staging_folder)
+    journal.finish()
+    return fits_errors
+
+
+def log_fits_errors(fits_errors, collection_folder, accession_number):
+    """Prints the path of each file that FITS did not make XML for and saves them to a text file
+    in the collection folder, so the archivist can check the files. These files are not included in the analysis."""
+
+    if len(fits_errors) == 0:
+        return
+
+    print("\nFITS did not make XML for these files, so they will not be included in the analysis:")
+    with open(f"{collection_folder}/{accession_number}_fits_errors.txt", "a", encoding="utf-8") as text:
+        for path in fits_errors:
+            print(f"\t* {path}")
+            text.write(path + "\n")
+
+
+def peak_memory():
+    """Returns the most memory (MB) the script has used so far, or None if it cannot be measured.
+    This is printed after FITS if REPORT_MEMORY is True in the configuration file,
+    since FITS information is kept in memory for every file in the accession.
+    Memory used by other processes, such as FITS or the processes that read FITS XML, is not included."""
+
+    # Windows does not have the resource module, so the peak working set is read with the Windows API instead.
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        ctypes.windll.psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters),
+                                                             wintypes.DWORD]
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                        ctypes.byref(counters), counters.cb):
+            return None
+        return round(counters.PeakWorkingSetSize / 1000000, 1)
+
+    # The resource module gives the peak in KB on Linux and in bytes on Mac.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1000000 if sys.platform == "darwin" else peak / 1000, 1)
 
 
 def get_text(parent, element):
@@ -176,22 +1866,206 @@ def get_text(parent, element):
         return None
 
 
+def parse_fits_xml(fits_file):
+    """Reads a FITS XML file, which can be compressed with gzip (.fits.xml.gz, see save_fits_xml()).
+    fits_file is the path of the XML, or a file object with the XML from the FITS archive (see fits_xml_file()).
+    Returns the FITS XML (ElementTree). A compressed file that is incomplete, for example because the script was
+    interrupted while it was saved, raises ET.ParseError the same as incomplete XML."""
+
+    if isinstance(fits_file, str) and fits_file.endswith(".gz"):
+        try:
+            with gzip.open(fits_file) as gzip_xml:
+                return ET.parse(gzip_xml)
+        except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+            raise ET.ParseError(f"compressed file is not complete: {error}")
+    return ET.parse(fits_file)
+
+
+def read_fits_parts(fits_file):
+    """Reads only the parts of a FITS XML file that are used by fits_row(), which can be compressed with gzip.
+    fits_file is the path of the XML, or a file object with the XML from the FITS archive (see fits_xml_file()).
+    The XML is read in one pass with iterparse (from lxml if it is installed) and reading stops as soon as
+    identification, fileinfo, and filestatus are read, so the metadata and tool output after them,
+    which are usually most of the file, are not read. Other parts that come before them are not kept.
+    Returns the root element with only those parts, which gives the same result with fits_xml_rows()
+    as the root of the whole XML. Raises ET.ParseError if the XML cannot be read before those parts are found."""
+
+    if isinstance(fits_file, str):
+        if fits_file.endswith(".gz"):
+            try:
+                with gzip.open(fits_file) as gzip_xml:
+                    return read_fits_parts(gzip_xml)
+            except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+                raise ET.ParseError(f"compressed file is not complete: {error}")
+        with open(fits_file, "rb") as xml_file:
+            return read_fits_parts(xml_file)
+
+    # ElementTree leaves out comments, so lxml does too, to have the same result.
+    if lxml_etree is None:
+        events = ET.iterparse(fits_file, events=("start", "end"))
+    else:
+        events = lxml_etree.iterparse(fits_file, events=("start", "end"), remove_comments=True, remove_pis=True)
+
+    # Depth is counted so only parts that are children of the root are used,
+    # and not elements with the same name in the tool output.
+    root = None
+    depth = 0
+    found = 0
+    try:
+        for event, element in events:
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if element.tag in FITS_ROW_TAGS:
+                found += 1
+                if found == len(FITS_ROW_TAGS):
+                    break
+            else:
+                root.remove(element)
+    except SyntaxError as error:
+        # lxml raises XMLSyntaxError, which is changed to the ElementTree error so fits_row() handles both.
+        if isinstance(error, ET.ParseError):
+            raise
+        raise ET.ParseError(str(error))
+    if root is None:
+        raise ET.ParseError("no element found")
+
+    # The parser reads ahead, so the start of the next part may already be in the root.
+    for element in list(root):
+        if element.tag not in FITS_ROW_TAGS:
+            root.remove(element)
+    return root
+
+
 def fits_row(fits_file):
     """Extracts desired fields from a FITS XML file, reformatting when necessary, for each format identification.
+    fits_file is the path of the XML, which can be compressed, or a file object with the XML from the FITS archive
+    (see read_fits_parts()).
     A single file may have multiple possible format identifications.
-    Returns a list of lists, where each list is the information for a single format identification.
+    Returns a list of FitsRecord, where each is the information for a single format identification.
     This function's output is used by make_fits_csv() to combine all FITS information into a single CSV."""
 
-    # Reads the FITS XML file. If there is a read error (rare), prints the filename and continues the script.
+    # Reads the parts of the FITS XML file that are used (see read_fits_parts()).
+    # If there is a read error (rare), prints the filename and continues the script.
     try:
-        tree = ET.parse(fits_file)
-        root = tree.getroot()
+        root = read_fits_parts(fits_file)
     except ET.ParseError as et_error:
-        print(f"\nCould not get format information from {os.path.basename(fits_file)}")
+        print(f"\nCould not get format information from {os.path.basename(getattr(fits_file, 'name', fits_file))}")
         print("ElementTree error:", et_error.msg)
         print("This file will not be included in the analysis.")
         return
 
+    return fits_xml_rows(root)
+
+
+def fits_date(timestamp):
+    """Converts the date last modified from a timestamp to something that is human readable.
+    Only uses the first 10 digits to get year, month, and day. Will be formatted YYYY-MM-DD."""
+    return datetime.date.fromtimestamp(int(timestamp[:10]))
+
+
+def fits_size_kb(size):
+    """Converts size from bytes to KB to be easier to read. Rounded to 3 decimal places unless that will make it 0."""
+    size = float(size) / 1000
+    if size > .001:
+        size = round(size, 3)
+    return size
+
+
+# Columns in the FITS CSV that are the text of a FITS XML element, with the path of the element from the root
+# and a function to reformat the text, if it needs reformatting. If an element repeats, the text is combined
+# like get_text(). The other columns in FITS_COLUMNS are made by fits_xml_rows().
+# To add a column, add it here and to FITS_COLUMNS. If it is not in identification, fileinfo, or filestatus,
+# also add its part of the FITS XML to FITS_ROW_TAGS and prune_fits_xml().
+FITS_FIELDS = [("FITS_File_Path", "fileinfo/filepath", None),
+               ("FITS_Date_Last_Modified", "fileinfo/fslastmodified", fits_date),
+               ("FITS_Size_KB", "fileinfo/size", fits_size_kb),
+               ("FITS_MD5", "fileinfo/md5checksum", None),
+               ("FITS_Creating_Application", "fileinfo/creatingApplicationName", None),
+               ("FITS_Valid", "filestatus/valid", None),
+               ("FITS_Well-Formed", "filestatus/well-formed", None),
+               ("FITS_Status_Message", "filestatus/message", None)]
+
+
+def fits_field_tree(fields):
+    """Combines the element paths of the fields (see FITS_FIELDS) into a tree, so every field is found in one pass
+    through the FITS XML by fits_field_values().
+    Each level is a dictionary with the element tag as the key and a tuple as the value, with the dictionary
+    for the next level and the positions in fields of the fields that are the text of that element."""
+
+    tree = {}
+    for position, (column, path, transform) in enumerate(fields):
+        level = tree
+        tags = [f"{{{FITS_NS}}}{name}" for name in path.split("/")]
+        for tag in tags[:-1]:
+            level = level.setdefault(tag, ({}, []))[0]
+        level.setdefault(tags[-1], ({}, []))[1].append(position)
+    return tree
+
+
+# The element paths of FITS_FIELDS as a tree (see fits_field_tree()).
+FITS_FIELD_TREE = fits_field_tree(FITS_FIELDS)
+
+
+def fits_field_values(root, fields=FITS_FIELDS, field_tree=FITS_FIELD_TREE):
+    """Returns a dictionary with the value of each field (see FITS_FIELDS) for the FITS XML, with the column as the key.
+    Only the parts of the XML in field_tree are read, in one pass. The value is the same as get_text() would return
+    for the element, reformatted if the field has a function for that, so it is None if the element is missing.
+    Like root.find(), only the first element is used for each part of a path above the element with the value."""
+
+    texts = [None] * len(fields)
+
+    def read_level(parent, level):
+        used = set()
+        for element in parent:
+            if element.tag not in level:
+                continue
+            next_level, positions = level[element.tag]
+            if element.text is not None:
+                for position in positions:
+                    texts[position] = element.text if texts[position] is None else f"{texts[position]}; {element.text}"
+            if next_level and element.tag not in used:
+                used.add(element.tag)
+                read_level(element, next_level)
+
+    read_level(root, field_tree)
+    values = {}
+    for (column, path, transform), text in zip(fields, texts):
+        values[column] = text if transform is None else transform(text)
+    return values
+
+
+# Columns in the FITS CSV that are usually different for every file. The text in the other columns, such as format
+# names and tools, is the same for many files, so it is interned (see fits_record()) to only be in memory once.
+FITS_UNIQUE_COLUMNS = ("FITS_File_Path", "FITS_MD5")
+FITS_INTERN = [column not in FITS_UNIQUE_COLUMNS for column in FITS_COLUMNS]
+
+
+class FitsRecord(namedtuple("FitsRecord", [re.sub(r"\W", "", column[5:].replace("-", "_")).lower()
+                                           for column in FITS_COLUMNS])):
+    """One format identification from FITS XML, which is a row in the FITS CSV, with a value for each column in
+    FITS_COLUMNS, for example record.format_name for FITS_Format_Name. It is a named tuple, which uses less memory
+    than a list, since there are rows for every file in the accession."""
+    __slots__ = ()
+
+
+def fits_record(values):
+    """Returns a FitsRecord with the values, in the order of FITS_COLUMNS, interning the text that is usually
+    the same for many files (see FITS_UNIQUE_COLUMNS)."""
+    return FitsRecord(*[sys.intern(value) if intern and isinstance(value, str) else value
+                        for intern, value in zip(FITS_INTERN, values)])
+
+
+def fits_xml_rows(root):
+    """Extracts the fields for fits_row() from the root of FITS XML that is already read,
+    such as FITS XML from triage that has not been saved yet (see FitsTriage).
+    Returns a list of FitsRecord, where each is the information for a single format identification."""
+
     # FITS namespace. All elements in the FITS XML are part of this namespace.
     ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
 
@@ -255,81 +2129,208 @@ def fits_row(fits_file):
         else:
             formats_dictionary[format_key] = format_data
 
-    # The information from fileinfo and filestatus is never repeated.
-    # It is saved to a list and added to each format identification before saving the format id to the CSV.
-    # If information does not need reformatting, it is found and appended to the list in the same line.
-    # If the information is reformatted or used to calculate additional information, it is saved to a variable first.
-    file_data = []
+    # The information from fileinfo and filestatus is never repeated, and is read in one pass (see FITS_FIELDS).
+    # It is added to each format identification before saving the format id to the CSV.
+    file_data = fits_field_values(root)
 
     # Calculates if there are multiple IDs for this format, based on how many items are in the formats_dictionary.
-    if len(formats_dictionary) == 1:
-        file_data.append(False)
-    else:
-        file_data.append(True)
+    file_data["FITS_Multiple_IDs"] = len(formats_dictionary) != 1
 
-    fileinfo = root.find("fits:fileinfo", ns)
+    # The tier is "triage" if the identification is from the reduced FITS tools in triage mode (see FitsTriage),
+    # or "full" if it is from the full FITS tools, which is all FITS XML made without triage mode.
+    file_data["FITS_Tier"] = root.get("tier", "full")
 
-    # Converts the date last modified from a timestamp to something that is human readable.
-    # Only uses the first 10 digits to get year, month, and day. Will be formatted YYYY-MM-DD.
-    timestamp = get_text(fileinfo, "fslastmodified")
-    date = datetime.date.fromtimestamp(int(timestamp[:10]))
-    file_data.append(date)
-
-    # Converts size from bytes to KB to be easier to read.
-    # Rounded to 3 decimal places unless that will make it 0.
-    size = get_text(fileinfo, "size")
-    size = float(size) / 1000
-    if size > .001:
-        size = round(size, 3)
-    file_data.append(size)
-
-    # The rest of the data do not require reformatting.
-    file_data.append(get_text(fileinfo, "md5checksum"))
-    file_data.append(get_text(fileinfo, "creatingApplicationName"))
-    filestatus = root.find("fits:filestatus", ns)
-    file_data.append(get_text(filestatus, "valid"))
-    file_data.append(get_text(filestatus, "well-formed"))
-    file_data.append(get_text(filestatus, "message"))
-
-    # Creates a list for each format identification by combining the file path, information from the formats_dictionary,
-    # and the file_data list, and saves that list to the list which this function will return.
+    # Creates a record for each format identification by combining information from the formats_dictionary
+    # and file_data, in the order of FITS_COLUMNS, and saves it to the list which this function will return.
     fits_rows = []
     for format_id in formats_dictionary:
-        row = [get_text(fileinfo, "filepath"), formats_dictionary[format_id]["name"],
-               formats_dictionary[format_id]["version"], formats_dictionary[format_id]["puid"],
-               formats_dictionary[format_id]["tools"]]
-        row.extend(file_data)
-        fits_rows.append(row)
+        values = dict(file_data)
+        values["FITS_Format_Name"] = formats_dictionary[format_id]["name"]
+        values["FITS_Format_Version"] = formats_dictionary[format_id]["version"]
+        values["FITS_PUID"] = formats_dictionary[format_id]["puid"]
+        values["FITS_Identifying_Tool(s)"] = formats_dictionary[format_id]["tools"]
+        fits_rows.append(fits_record([values[column] for column in FITS_COLUMNS]))
 
     return fits_rows
 
 
-def make_fits_csv(fits_output, collection_folder, accession_number):
+class FitsRowCache:
+    """Saves the rows for the FITS CSV from each FITS XML (see fits_row()) in a SQLite file in the FITS folder,
+    with the size and date modified of the XML, so the next time the FITS CSV is made only FITS XML that is new
+    or changed since its rows were saved needs to be read. The rows are saved as compressed JSON,
+    so dates are saved as text, which is how they are saved in the FITS CSV.
+    The columns are saved too, and if FITS_COLUMNS is different, such as after adding a field to FITS_FIELDS,
+    the saved rows are deleted, so the FITS XML is read again."""
+
+    def __init__(self, fits_output):
+        self.connection = sqlite3.connect(os.path.join(fits_output, FITS_ROWS))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fits_rows "
+                                "(name TEXT PRIMARY KEY, size INTEGER, modified INTEGER, fits_rows BLOB)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fits_columns (columns TEXT)")
+        columns = self.connection.execute("SELECT columns FROM fits_columns").fetchone()
+        if columns is None or json.loads(columns[0]) != FITS_COLUMNS:
+            self.connection.execute("DELETE FROM fits_rows")
+            self.connection.execute("DELETE FROM fits_columns")
+            self.connection.execute("INSERT INTO fits_columns VALUES (?)", (json.dumps(FITS_COLUMNS),))
+        self.connection.commit()
+
+    def get(self, entries):
+        """Returns a dictionary with the FITS XML name as the key and the saved rows as the value for each FITS XML
+        in entries (see fits_xml_entries()) that has the same size and date modified as when its rows were saved."""
+        saved = {name: (size, modified, fits_rows) for name, size, modified, fits_rows
+                 in self.connection.execute("SELECT name, size, modified, fits_rows FROM fits_rows")}
+        rows = {}
+        for name, xml_size, xml_modified in entries:
+            if name in saved and saved[name][:2] == (xml_size, xml_modified):
+                rows[name] = [fits_record(row) for row in json.loads(zlib.decompress(saved[name][2]))]
+        return rows
+
+    def saved(self, entries):
+        """Returns a set of the names of the FITS XML in entries (see fits_xml_entries()) that have saved rows
+        and the same size and date modified as when the rows were saved, without reading the rows."""
+        saved = {name: (size, modified) for name, size, modified
+                 in self.connection.execute("SELECT name, size, modified FROM fits_rows")}
+        return {name for name, xml_size, xml_modified in entries if saved.get(name) == (xml_size, xml_modified)}
+
+    def save(self, entries, rows):
+        """Saves the rows for each FITS XML in entries (see fits_xml_entries()) that is in the rows dictionary,
+        and deletes the rows for FITS XML that is no longer in the FITS folder.
+        FITS XML that could not be read (the rows are None) is not saved, so it is read again next time."""
+        names = set()
+        for name, xml_size, xml_modified in entries:
+            names.add(name)
+            if rows.get(name) is not None:
+                fits_rows = zlib.compress(json.dumps(rows[name], default=str).encode("utf-8"))
+                self.connection.execute("INSERT OR REPLACE INTO fits_rows VALUES (?, ?, ?, ?)",
+                                        (name, xml_size, xml_modified, fits_rows))
+        for (name,) in self.connection.execute("SELECT name FROM fits_rows").fetchall():
+            if name not in names:
+                self.connection.execute("DELETE FROM fits_rows WHERE name = ?", (name,))
+        self.connection.commit()
+
+    def close(self):
+        """Saves any changes and closes the database."""
+        self.connection.commit()
+        self.connection.close()
+
+
+def make_fits_csv(fits_output, collection_folder, accession_number, workers=None, background=False, rows=None):
     """Makes a single CSV with FITS information for all files in the accession.
-    Each row in the CSV is a single format identification. A file may have multiple identifications."""
+    Each row in the CSV is a single format identification. A file may have multiple identifications.
+    Reading the FITS XML takes most of the time, so it is divided between workers processes
+    (the number of processor cores if it is not given), in chunks of FITS_CSV_CHUNK files.
+    The rows are in the order of the FITS XML names, so the CSV is the same every time it is made.
+    Returns the same information as a dataframe (see fits_dataframe()), so it does not need to be read from the CSV.
+    If background is True, the CSV is saved in a thread and the dataframe is returned without waiting for it.
+    rows is a dictionary with the rows for FITS XML that was already read, such as by update_fits(),
+    with the FITS XML name as the key. The rows from earlier runs are saved in the FITS folder (see FitsRowCache),
+    so only FITS XML that is not in rows and is new or changed since the last run is read."""
+
+    # Gets the rows that were saved for FITS XML that has not changed, and the rows that were already read.
+    entries = sorted(fits_xml_entries(fits_output))
+    fits_names = [fits_name for fits_name, xml_size, xml_modified in entries]
+    row_cache = FitsRowCache(fits_output)
+    rows = {**row_cache.get(entries), **(rows or {})}
+
+    # Extracts select format information for each FITS file that was not already read, with some data reformatting.
+    # If there are only a few files, it is faster to read them in this process than to start more processes.
+    read_names = [fits_name for fits_name in fits_names if fits_name not in rows]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(read_names) > FITS_CSV_CHUNK:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            read_rows = list(executor.map(fits_xml_file_rows, [fits_output] * len(read_names), read_names,
+                                          chunksize=FITS_CSV_CHUNK))
+
+        # The text from other processes is only shared within each chunk, so it is interned again.
+        read_rows = [None if rows_list is None else [fits_record(row) for row in rows_list] for rows_list in read_rows]
+    else:
+        archive = fits_archive(fits_output)
+        read_rows = [fits_row(fits_xml_file(fits_output, fits_name, archive)) for fits_name in read_names]
+        if archive is not None:
+            archive.close()
+    rows.update(zip(read_names, read_rows))
+    rows_lists = [rows[fits_name] for fits_name in fits_names]
+
+    # Saves the rows for the next time the FITS CSV is made.
+    row_cache.save(entries, rows)
+    row_cache.close()
+
+    # Saves the information to the CSV and returns it as a dataframe.
+    save_fits_csv(rows_lists, collection_folder, accession_number, background)
+    return fits_dataframe(rows_lists)
+
+
+def fits_xml_file_rows(fits_output, fits_name):
+    """Returns the rows from fits_row() for the FITS XML with this name (see fits_xml_entries()).
+    This is a separate function so make_fits_csv() can run it in other processes."""
+    return fits_row(fits_xml_file(fits_output, fits_name))
+
+
+def save_fits_csv(rows_lists, collection_folder, accession_number, background=False):
+    """Saves the FITS CSV with write_fits_csv(). If background is True, it is saved in a thread, so the analysis can
+    start while the CSV is saved. The thread is not a daemon, so the script still waits for the CSV before it ends.
+    Returns the thread, or None if the CSV is already saved."""
+    if not background:
+        write_fits_csv(rows_lists, collection_folder, accession_number)
+        return
+    thread = threading.Thread(target=write_fits_csv, args=(rows_lists, collection_folder, accession_number))
+    thread.start()
+    return thread
+
+
+def fits_dataframe(rows_lists):
+    """Makes a dataframe with the rows from fits_row() for each FITS XML file, in the order they are in rows_lists,
+    which is the same as reading the FITS CSV with csv_to_dataframe(): the columns are FITS_COLUMNS,
+    every value is a string, and empty values and text pandas reads as NaN (CSV_NA_VALUES) are NaN.
+    Rows that cannot be saved in the CSV due to an encoding error (see write_fits_rows()) are not included,
+    the same as if the dataframe was read from the CSV."""
+
+    # Makes a list of values for each column, instead of a dataframe row for each row, since that is much faster.
+    encoding = locale.getpreferredencoding(False)
+    columns = [[] for _ in FITS_COLUMNS]
+    for rows_list in rows_lists:
+        for row in rows_list or []:
+            try:
+                "".join(str(value) for value in row if value is not None).encode(encoding)
+            except UnicodeEncodeError:
+                continue
+            for column, value in zip(columns, row):
+                text = None if value is None else str(value)
+                column.append(math.nan if text is None or text in CSV_NA_VALUES else text)
+    return pd.DataFrame({name: pd.Series(column, dtype=object) for name, column in zip(FITS_COLUMNS, columns)})
+
+
+def write_fits_csv(rows_lists, collection_folder, accession_number):
+    """Saves the FITS CSV in the collection folder, with a header row and the rows from fits_row() for each FITS XML
+    file, in the order they are in rows_lists. If this replaces a CSV from an earlier run, it is overwritten."""
 
-    # Makes a CSV in the collection folder, with a header row, for combined FITS information.
-    header = ["FITS_File_Path", "FITS_Format_Name", "FITS_Format_Version", "FITS_PUID", "FITS_Identifying_Tool(s)",
-              "FITS_Multiple_IDs", "FITS_Date_Last_Modified", "FITS_Size_KB", "FITS_MD5", "FITS_Creating_Application",
-              "FITS_Valid", "FITS_Well-Formed", "FITS_Status_Message"]
     csv_open = open(f"{collection_folder}/{accession_number}_fits.csv", "w", newline="")
     csv_write = csv.writer(csv_open)
-    csv_write.writerow(header)
-
-    # Extracts select format information for each FITS file, with some data reformatting, and saves it to a CSV.
-    # If it cannot save due to an encoding error, saves the filepath to a text file.
-    for fits_xml in os.listdir(fits_output):
-        rows_list = fits_row(os.path.join(fits_output, fits_xml))
-        for row in rows_list:
-            try:
-                csv_write.writerow(row)
-            except UnicodeEncodeError:
-                with open(f"{collection_folder}/{accession_number}_encode_errors.txt", "a", encoding="utf-8") as text:
-                    text.write(row[0] + "\n")
+    csv_write.writerow(FITS_COLUMNS)
+    for rows_list in rows_lists:
+        write_fits_rows(csv_write, rows_list, collection_folder, accession_number)
     csv_open.close()
+    remove_duplicate_encode_errors(collection_folder, accession_number)
+
+
+def write_fits_rows(csv_write, rows_list, collection_folder, accession_number):
+    """Saves the rows from fits_row() for one FITS XML file to the FITS CSV.
+    If a row cannot be saved due to an encoding error, saves the filepath to a text file instead.
+    If fits_row() could not read the XML (rows_list is None), there is nothing to save."""
+
+    for row in rows_list or []:
+        try:
+            csv_write.writerow(row)
+        except UnicodeEncodeError:
+            with open(f"{collection_folder}/{accession_number}_encode_errors.txt", "a", encoding="utf-8") as text:
+                text.write(row[0] + "\n")
+
+
+def remove_duplicate_encode_errors(collection_folder, accession_number):
+    """If there were encoding errors when making the FITS CSV, removes any duplicate files from encode_errors.txt.
+    Files are duplicated in encode_errors.txt if they have more than one format identification."""
 
-    # If there were encoding errors, removes any duplicate files.
-    # Files are duplicated in encode_errors.txt if they have more than one format identification.
     encode_errors_path = f"{collection_folder}/{accession_number}_encode_errors.txt"
     if os.path.exists(encode_errors_path):
         df_error = pd.read_csv(encode_errors_path, header=None)
@@ -337,6 +2338,68 @@ def make_fits_csv(fits_output, collection_folder, accession_number):
         df_error.to_csv(encode_errors_path, header=False, index=False)
 
 
+class FitsCsvStream:
+    """Makes the FITS CSV, the same as make_fits_csv(), while the FITS XML is being made instead of afterwards.
+    Each FITS XML file is added with add() as soon as it is saved, and a thread reads it with fits_row()
+    while FITS identifies the rest of the files. Reading the XML is what takes time, so when all the XML is made,
+    finish() only waits for the last few files to be read and saves the CSV, so it is done soon after FITS.
+    The rows are saved in the order of the FITS XML names, the same as make_fits_csv()."""
+
+    def __init__(self, fits_output, collection_folder, accession_number):
+        self.fits_output = fits_output
+        self.collection_folder = collection_folder
+        self.accession_number = accession_number
+        self.fits_names = queue.Queue()
+        self.rows = {}
+        self.error = None
+        self.thread = threading.Thread(target=self.read_rows, daemon=True)
+        self.thread.start()
+
+    def add(self, fits_name, archive=None):
+        """Adds a FITS XML file (the name in the FITS folder) to the CSV. Threads making XML can share the stream.
+        archive is the FITS archive the XML was saved in, if any, which has the XML before it is committed.
+        Raises any error from reading the XML added earlier, so the script stops instead of running FITS
+        on the rest of the accession for a CSV that cannot be made."""
+        if self.error is not None:
+            raise self.error
+        self.fits_names.put((fits_name, archive))
+
+    def read_rows(self):
+        """Reads each FITS XML file as it is added and keeps its rows for the CSV, until finish() adds None.
+        If there is an error, keeps it for add() and finish() to raise and skips the rest of the files,
+        so add() never has to wait. XML that cannot be parsed is reported and left out by fits_row() instead."""
+        while True:
+            fits_name, archive = self.fits_names.get()
+            if fits_name is None:
+                self.fits_names.task_done()
+                return
+            if self.error is None:
+                try:
+                    self.rows[fits_name] = fits_row(fits_xml_file(self.fits_output, fits_name, archive))
+                except Exception as error:
+                    self.error = error
+            self.fits_names.task_done()
+
+    def wait(self):
+        """Waits until every FITS XML file that was added has been read."""
+        self.fits_names.join()
+
+    def finish(self, background=False):
+        """Waits for the rest of the FITS XML to be read, saves the CSV and the rows (see FitsRowCache),
+        and returns the dataframe, the same as make_fits_csv().
+        Raises any error from reading the XML, since the CSV would be incomplete."""
+        self.fits_names.put((None, None))
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        rows_lists = [self.rows[fits_name] for fits_name in sorted(self.rows)]
+        save_fits_csv(rows_lists, self.collection_folder, self.accession_number, background)
+        row_cache = FitsRowCache(self.fits_output)
+        row_cache.save(fits_xml_entries(self.fits_output), self.rows)
+        row_cache.close()
+        return fits_dataframe(rows_lists)
+
+
 def update_risk(df_fits, df_risk, csv_path):
     """When the acc_full_risk_data.csv was produced during a previous iteration of the script,
     removes files in the risk csv which were deleted by the archivist since the csv was made and
@@ -586,6 +2649,47 @@ def match_nara_risk(df_fits, df_nara):
     return df_result
 
 
+def preview_risk(accession_folder, df_nara):
+    """Matches risk information from NARA to every file in the accession folder by file extension only, without FITS,
+    for a preliminary analysis report. The extension matching is the same as techniques 6 and 7 of match_nara_risk().
+    Returns a dataframe with the columns of the FITS CSV that can be made without FITS (the format name says it is a
+    preview), File_Extension for subtotals, the NARA columns, and NARA_Match_Type."""
+
+    # Makes a dataframe with the file path, date last modified, and size of every file.
+    # Size is in KB and the date is YYYY-MM-DD, the same as the FITS CSV.
+    rows = []
+    for path in accession_file_list(accession_folder):
+        file_stat = os.stat(path)
+        size = file_stat.st_size / 1000
+        if size > .001:
+            size = round(size, 3)
+        rows.append([path, "Preview (not identified)", datetime.date.fromtimestamp(file_stat.st_mtime), size,
+                     Path(path).suffix.lower()])
+    df_files = pd.DataFrame(rows, columns=["FITS_File_Path", "FITS_Format_Name", "FITS_Date_Last_Modified",
+                                           "FITS_Size_KB", "File_Extension"])
+
+    # Makes a column with the file extension, the same way as match_nara_risk(),
+    # and a copy of NARA with one row per file extension if there is more than one.
+    df_files["fits_ext_lower"] = df_files["FITS_File_Path"].str.lower().str.split(".").str[-1]
+    df_nara_expanded = df_nara[["NARA_Format_Name", "NARA_File_Extensions", "NARA_PRONOM_URL", "NARA_Risk_Level",
+                                "NARA_Proposed_Preservation_Plan"]].copy()
+    df_nara_expanded["nara_ext_separate"] = df_nara_expanded["NARA_File_Extensions"].str.lower().str.split(r"|")
+    df_nara_expanded = df_nara_expanded.explode("nara_ext_separate")
+
+    # Merges NARA into the files based on the extension and adds default text for files that did not match.
+    df_result = pd.merge(df_files, df_nara_expanded, left_on="fits_ext_lower", right_on="nara_ext_separate",
+                         how="left")
+    df_result["NARA_Match_Type"] = "File Extension"
+    df_result.loc[df_result["NARA_Risk_Level"].isnull(), ["NARA_Format_Name", "NARA_Risk_Level",
+                                                           "NARA_Match_Type"]] = ["No Match", "No Match",
+                                                                                  "No NARA Match"]
+
+    # Removes the temporary columns used for matching.
+    df_result.drop(["fits_ext_lower", "nara_ext_separate"], inplace=True, axis=1)
+
+    return df_result
+
+
 def match_technical_appraisal(df_results, df_ita):
     """Adds technical appraisal categories to the results dataframe, which will already have FITS and NARA information.
     The categories are formats specified in the ITA spreadsheet, temporary files, and files in trash folders.
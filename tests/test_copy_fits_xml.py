@@ -0,0 +1,56 @@
+"""Tests the function copy_fits_xml, which makes FITS XML for a file by copying the FITS XML
+of a file with the same content and updating the path, name, and date last modified.
+
+For input, tests use FITS files that are in the tests folder of this script repo."""
+
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from format_analysis_functions import copy_fits_xml
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes a file to use as the copy, with a known date last modified.
+        """
+        with open('copy.txt', 'w') as file:
+            file.write('Text')
+        os.utime('copy.txt', (1671044173, 1671044173))
+
+    def tearDown(self):
+        """
+        Deletes the file used as the copy.
+        """
+        os.remove('copy.txt')
+
+    def test_copy(self):
+        """
+        Test for copying FITS XML.
+        Result for testing is the fileinfo values in the copy and the original.
+        """
+        # Runs the function being tested.
+        tree = ET.parse(os.path.join('test_FITS', 'fits_row_FITS', 'tools.txt.fits.xml'))
+        copy_path = os.path.join(os.getcwd(), 'copy.txt')
+        result_tree = copy_fits_xml(tree, copy_path)
+
+        # Makes a list of the fileinfo values from the copy and the original.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        result = []
+        for fits_tree in (result_tree, tree):
+            fileinfo = fits_tree.getroot().find('fits:fileinfo', ns)
+            result.append([fileinfo.find(f'fits:{name}', ns).text
+                           for name in ('filepath', 'filename', 'md5checksum', 'fslastmodified')])
+
+        # Creates a list with the expected result. The MD5 is the same and the original is not changed.
+        expected = [[copy_path, 'copy.txt', '7b71af3fdf4a2f72a378e3e77815e497', '1671044173000'],
+                    ['C:\\accession\\disk1\\tools.txt', 'tools.txt', '7b71af3fdf4a2f72a378e3e77815e497',
+                     '1671044173061']]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, expected, 'Problem with copy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests the function duplicate_files, which finds files with the same content so FITS only identifies one of them."""
+
+import os
+import shutil
+import unittest
+from format_analysis_functions import duplicate_files
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files that have the same and different content.
+        """
+        os.makedirs(os.path.join('accession', 'dir'))
+        files = {'same.txt': 'Text', os.path.join('dir', 'same.txt'): 'Text', 'renamed.txt': 'Text',
+                 'other_extension.csv': 'Text', 'same_size.txt': 'Tex!', 'different.txt': 'Different text'}
+        for file_path, text in files.items():
+            with open(os.path.join('accession', file_path), 'w') as file:
+                file.write(text)
+
+    def tearDown(self):
+        """
+        Deletes the accession folder.
+        """
+        shutil.rmtree('accession')
+
+    def test_duplicates(self):
+        """
+        Test for a mix of files, where files are only duplicates if the content and extension are the same.
+        Result for testing is the dictionary returned by the function.
+        """
+        # Runs the function being tested.
+        paths = [os.path.join('accession', 'same.txt'), os.path.join('accession', 'dir', 'same.txt'),
+                 os.path.join('accession', 'renamed.txt'), os.path.join('accession', 'other_extension.csv'),
+                 os.path.join('accession', 'same_size.txt'), os.path.join('accession', 'different.txt')]
+        result = duplicate_files(paths)
+
+        # Creates a dictionary with the expected result.
+        expected = {os.path.join('accession', 'same.txt'): [os.path.join('accession', 'dir', 'same.txt'),
+                                                            os.path.join('accession', 'renamed.txt')],
+                    os.path.join('accession', 'other_extension.csv'): [],
+                    os.path.join('accession', 'same_size.txt'): [],
+                    os.path.join('accession', 'different.txt'): []}
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, expected, 'Problem with duplicates')
+
+    def test_md5_values(self):
+        """
+        Test for keeping the MD5 calculated for each file, which is only calculated for files with the same size
+        and extension as another file.
+        Result for testing is the dictionary of MD5s given to the function.
+        """
+        # Runs the function being tested.
+        paths = [os.path.join('accession', 'same.txt'), os.path.join('accession', 'same_size.txt'),
+                 os.path.join('accession', 'different.txt')]
+        md5_values = {}
+        duplicate_files(paths, md5_values)
+
+        # Creates a dictionary with the expected result.
+        expected = {os.path.join('accession', 'same.txt'): '9dffbf69ffba8bc38bc4e01abf4b1675',
+                    os.path.join('accession', 'same_size.txt'): '3f98f4115e5160698cb20a395bf7c212'}
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(md5_values, expected, 'Problem with md5 values')
+
+    def test_missing(self):
+        """
+        Test for a file that cannot be read, which is kept on its own.
+        Result for testing is the dictionary returned by the function.
+        """
+        # Runs the function being tested.
+        paths = [os.path.join('accession', 'missing.txt'), os.path.join('accession', 'different.txt')]
+        result = duplicate_files(paths)
+
+        # Creates a dictionary with the expected result.
+        expected = {os.path.join('accession', 'missing.txt'): [], os.path.join('accession', 'different.txt'): []}
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, expected, 'Problem with missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests the file_changed function, which uses the FITS index entry for a file
+to tell if the file was edited or replaced since its FITS XML was made."""
+
+import os
+import unittest
+from format_analysis_functions import file_changed, fits_modified, md5
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes a file and a FITS index entry that matches it.
+        """
+        with open('file.txt', 'w') as file:
+            file.write('Text')
+        self.entry = {'File_Size': str(os.path.getsize('file.txt')),
+                      'File_Modified': str(fits_modified(os.stat('file.txt'))),
+                      'File_MD5': md5('file.txt')}
+
+    def tearDown(self):
+        """
+        Deletes the file.
+        """
+        os.remove('file.txt')
+
+    def test_unchanged(self):
+        """
+        Test for a file that has not changed.
+        """
+        self.assertEqual(file_changed('file.txt', self.entry), False, 'Problem with unchanged')
+
+    def test_size(self):
+        """
+        Test for a file with a different size.
+        """
+        with open('file.txt', 'a') as file:
+            file.write(' and more text')
+        self.assertEqual(file_changed('file.txt', self.entry), True, 'Problem with size')
+
+    def test_same_content(self):
+        """
+        Test for a file with a different date last modified but the same content, which is not a change.
+        """
+        os.utime('file.txt', (0, 0))
+        self.assertEqual(file_changed('file.txt', self.entry), False, 'Problem with same content')
+
+    def test_same_size(self):
+        """
+        Test for a file with a different date last modified and different content of the same size.
+        """
+        with open('file.txt', 'w') as file:
+            file.write('Test')
+        os.utime('file.txt', (0, 0))
+        self.assertEqual(file_changed('file.txt', self.entry), True, 'Problem with same size')
+
+    def test_exact_milliseconds(self):
+        """
+        Test for a date last modified that is an exact number of milliseconds, where multiplying the seconds by 1000
+        is one millisecond less. The MD5 in the entry is changed, so the result is only False if the date matches.
+        """
+        os.utime('file.txt', ns=(1090544175544000000, 1090544175544000000))
+        self.entry['File_Modified'] = '1090544175544'
+        self.entry['File_MD5'] = 'not used'
+        self.assertEqual(file_changed('file.txt', self.entry), False, 'Problem with exact milliseconds')
+
+    def test_missing_values(self):
+        """
+        Test for FITS XML without the size, date last modified, or MD5, which cannot be used to find changes.
+        """
+        entry = {'File_Size': '', 'File_Modified': '', 'File_MD5': ''}
+        self.assertEqual(file_changed('file.txt', entry), False, 'Problem with missing values')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests the archive layout of the FITS folder (FITS_LAYOUT in the configuration file), where FITS XML is saved in
+one SQLite file (FitsArchive), and reading it with make_fits_csv and update_fits.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import csv
+import os
+import shutil
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+import configuration as c
+from format_analysis_functions import FITS_ARCHIVE, FitsArchive, FitsCommand, FitsCsvStream, fits_archive, \
+    fits_xml_list, make_fits_csv, make_fits_xml, update_fits
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend, and changes to the archive layout.
+        Saves the layout from the configuration file, so it can be restored.
+        """
+        os.mkdir('accession')
+        for file_name in ('file.txt', 'data.csv', 'other.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'other.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.layout = getattr(c, 'FITS_LAYOUT', 'flat')
+        c.FITS_LAYOUT = 'archive'
+
+    def tearDown(self):
+        """
+        Deletes the accession folder, the FITS folder, the export folder, and the FITS CSV, and restores the layout.
+        """
+        c.FITS_LAYOUT = self.layout
+        for folder in ('accession', 'accession_FITS', 'export'):
+            if os.path.exists(folder):
+                shutil.rmtree(folder)
+        if os.path.exists('accession_fits.csv'):
+            os.remove('accession_fits.csv')
+
+    def test_archive(self):
+        """
+        Test for making FITS XML with the archive layout, with two FITS processes.
+        Result for testing is the contents of the FITS folder and the names of the FITS XML.
+        """
+        # Runs the function being tested.
+        make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(os.listdir('accession_FITS'), [FITS_ARCHIVE], 'Problem with archive, FITS folder')
+        expected = [os.path.join(FITS_ARCHIVE, f'{file_name}.fits.xml')
+                    for file_name in ('data.csv', 'file.txt', 'other.txt')]
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), expected, 'Problem with archive, names')
+
+    def test_csv(self):
+        """
+        Test for making the FITS CSV from the archive.
+        Result for testing is the file paths in the FITS CSV.
+        """
+        # Runs the function being tested.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, self.backend)
+        make_fits_csv('accession_FITS', os.getcwd(), 'accession')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        with open('accession_fits.csv', newline='') as fits_csv:
+            result = sorted(row[0] for row in list(csv.reader(fits_csv))[1:])
+        self.assertEqual(result, sorted(self.paths), 'Problem with csv')
+
+    def test_batch(self):
+        """
+        Test for saving FITS XML with one connection, which only commits when there are enough changes or it is closed,
+        so the XML is not in the archive for another connection until then.
+        Result for testing is the number of FITS XML another connection finds before and after it is closed.
+        """
+        # Runs the function being tested.
+        tree = ET.parse(os.path.join('test_FITS', 'csv_one_id_FITS', 'file.txt.fits.xml'))
+        archive = FitsArchive('accession_FITS')
+        archive.save(tree, self.paths[0])
+        before = fits_archive('accession_FITS')
+        before_count = len(before.entries())
+        before.close()
+        archive.close()
+        after = fits_archive('accession_FITS')
+        after_count = len(after.entries())
+        after.close()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual([before_count, after_count], [0, 1], 'Problem with batch')
+
+    def test_stream(self):
+        """
+        Test for making the FITS CSV while the FITS XML is saved in the archive (see FitsCsvStream),
+        which reads the XML with the same connection before it is committed.
+        Result for testing is the file paths in the dataframe returned by the stream.
+        """
+        # Runs the function being tested.
+        fits_csv = FitsCsvStream('accession_FITS', os.getcwd(), 'accession')
+        make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend, fits_csv=fits_csv)
+        df_fits = fits_csv.finish()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(df_fits['FITS_File_Path']), sorted(self.paths), 'Problem with stream')
+
+    def test_update(self):
+        """
+        Test for updating the archive when one file was deleted from the accession and one was added.
+        Result for testing is the names of the FITS XML.
+        """
+        # Makes FITS XML for two files and deletes one of them.
+        make_fits_xml(self.paths[:2], 'accession_FITS', 1, 500, self.backend)
+        os.remove(self.paths[1])
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [os.path.join(FITS_ARCHIVE, 'file.txt.fits.xml'), os.path.join(FITS_ARCHIVE, 'other.txt.fits.xml')]
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), expected, 'Problem with update')
+
+    def test_export(self):
+        """
+        Test for saving the FITS XML in the archive as files in another folder.
+        Result for testing is the contents of the export folder, which should be the same as the flat layout.
+        """
+        # Makes FITS XML in the archive.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, self.backend)
+        os.mkdir('export')
+
+        # Runs the function being tested.
+        archive = fits_archive('accession_FITS')
+        count = archive.export('export')
+        archive.close()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = ['data.csv.fits.xml', 'file.txt.fits.xml', 'other.txt.fits.xml']
+        self.assertEqual(sorted(os.listdir('export')), expected, 'Problem with export')
+        self.assertEqual(count, 3, 'Problem with export, count')
+
+
+if __name__ == '__main__':
+    unittest.main()
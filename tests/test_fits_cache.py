@@ -0,0 +1,114 @@
+"""Tests the FitsCache class, which saves FITS identifications so files with the same content are not identified again.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import unittest
+from format_analysis_functions import FitsCache, FitsCommand, make_fits_xml
+
+
+class CountingCommand(FitsCommand):
+    """FitsCommand that keeps a list of every path it identifies, to test which files were not in the cache."""
+
+    def __init__(self):
+        super().__init__(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.identified = []
+
+    def identify(self, paths, staging_folder, timeout=None):
+        self.identified.extend(paths)
+        return super().identify(paths, staging_folder, timeout)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the cache to test.
+        """
+        os.mkdir('accession')
+        for file_name, text in (('file.txt', 'Text'), ('data.csv', 'a,b')):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(text)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv')]
+        os.mkdir('accession_FITS')
+        self.cache = FitsCache('fits_cache.db', 1)
+
+    def tearDown(self):
+        """
+        Closes the cache and deletes the test files.
+        """
+        self.cache.close()
+        os.remove('fits_cache.db')
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_cache_hit(self):
+        """
+        Test for making FITS XML twice with the same cache, with one new file with the same content
+        as a file from the first time. The second time, only the file that is not in the cache should be identified.
+        Result for testing is the files identified the second time and the contents of the second FITS folder.
+        """
+        # Makes FITS XML the first time and adds a file with the same content as file.txt and a new file.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, CountingCommand(), self.cache)
+        shutil.rmtree('accession_FITS')
+        os.mkdir('accession_FITS')
+        for file_name, text in (('same.txt', 'Text'), ('new.txt', 'New text')):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(text)
+        paths = [os.path.join(os.getcwd(), 'accession', 'same.txt'),
+                 os.path.join(os.getcwd(), 'accession', 'new.txt')]
+
+        # Runs the function being tested.
+        backend = CountingCommand()
+        errors = make_fits_xml(paths, 'accession_FITS', 1, 500, backend, self.cache)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(backend.identified, [paths[1]], 'Problem with cache hit, identified')
+        self.assertEqual(sorted(os.listdir('accession_FITS')), ['new.txt.fits.xml', 'same.txt.fits.xml'],
+                         'Problem with cache hit, FITS folder')
+        self.assertEqual(errors, [], 'Problem with cache hit, errors')
+
+    def test_cache_path(self):
+        """
+        Test for the FITS XML made from the cache, which should have the path of the new file.
+        Result for testing is the filepath and filename in the FITS XML.
+        """
+        # Makes FITS XML the first time and adds a file with the same content as file.txt.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, CountingCommand(), self.cache)
+        with open(os.path.join('accession', 'same.txt'), 'w') as file:
+            file.write('Text')
+        same_path = os.path.join(os.getcwd(), 'accession', 'same.txt')
+
+        # Runs the function being tested.
+        tree = self.cache.get(same_path)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        # The cache has the path of the first file with that content.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        result = [tree.getroot().find('fits:fileinfo/fits:filename', ns).text,
+                  tree.getroot().find('fits:metadata', ns)]
+        self.assertEqual(result, ['file.txt', None], 'Problem with cache path')
+
+    def test_evict(self):
+        """
+        Test for deleting the least recently used identification when the cache is larger than the size limit.
+        Result for testing is which files are still in the cache.
+        """
+        # Makes the cache and sets the limit to the size of one identification.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, CountingCommand(), self.cache)
+        self.cache.get(self.paths[0])
+        size = self.cache.connection.execute("SELECT MAX(size) FROM fits_cache").fetchone()[0]
+        self.cache.size_limit = size
+
+        # Runs the function being tested.
+        self.cache.evict()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [self.cache.get(path) is not None for path in self.paths]
+        self.assertEqual(result, [True, False], 'Problem with evict')
+
+
+if __name__ == '__main__':
+    unittest.main()
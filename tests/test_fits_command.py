@@ -0,0 +1,93 @@
+"""Tests the FitsCommand identification backend, which runs the FITS command line tool on a batch of files.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from format_analysis_functions import FitsCommand, replace_staged_path
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, including two with the same name, and the backend to test.
+        """
+        os.makedirs(os.path.join('accession', 'dir'))
+        for file_path in ('file.txt', 'data.csv', os.path.join('dir', 'file.txt')):
+            with open(os.path.join('accession', file_path), 'w') as file:
+                file.write('Text')
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'dir', 'file.txt')]
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and staging folder, if present.
+        """
+        shutil.rmtree('accession')
+        if os.path.exists('accession_staging'):
+            shutil.rmtree('accession_staging')
+
+    def test_identify(self):
+        """
+        Test for identifying a batch of files, where the FITS XML should have the original path.
+        Result for testing is the path in each FITS XML returned by the function.
+        """
+        # Runs the function being tested.
+        fits_trees = self.backend.identify(self.paths, 'accession_staging')
+
+        # Makes a list of the key and path from the FITS XML for each file in the result.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        result = []
+        for path, tree in fits_trees.items():
+            result.append([path, tree.getroot().find('fits:fileinfo/fits:filepath', ns).text])
+
+        # Creates a list with the expected result.
+        expected = [[path, path] for path in sorted(self.paths)]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(result), expected, 'Problem with identify')
+        self.assertFalse(os.path.exists('accession_staging'), 'Problem with identify, staging')
+
+    def test_missing_file(self):
+        """
+        Test for identifying a batch where one of the files cannot be staged because it was deleted.
+        Result for testing is the files in the dictionary returned by the function, which should not include it.
+        """
+        # Runs the function being tested with a path that does not exist.
+        missing = os.path.join(os.getcwd(), 'accession', 'missing.txt')
+        fits_trees = self.backend.identify([missing] + self.paths, 'accession_staging')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(fits_trees.keys()), sorted(self.paths), 'Problem with missing file')
+
+    def test_replace_staged_path(self):
+        """
+        Test for replacing the staged path and folder everywhere in FITS XML, including the tool output.
+        Result for testing is the FITS XML after the paths are replaced.
+        """
+        # Makes FITS XML with the staged path in fileinfo and in the tool output, for test input.
+        staged = os.path.join(os.getcwd(), 'accession_staging', 'input', '1', 'file.txt')
+        tree = ET.ElementTree(ET.fromstring(
+            f'<fits><fileinfo><filepath>{staged}</filepath></fileinfo>'
+            f'<toolOutput><tool name="Jhove"><repInfo uri="{staged}" /></tool>'
+            f'<tool name="Exiftool"><SourceFile>{staged}</SourceFile>'
+            f'<Directory>{os.path.dirname(staged)}</Directory></tool></toolOutput></fits>'))
+
+        # Runs the function being tested.
+        replace_staged_path(tree, staged, self.paths[0])
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two strings.
+        expected = f'<fits><fileinfo><filepath>{self.paths[0]}</filepath></fileinfo>' \
+                   f'<toolOutput><tool name="Jhove"><repInfo uri="{self.paths[0]}" /></tool>' \
+                   f'<tool name="Exiftool"><SourceFile>{self.paths[0]}</SourceFile>' \
+                   f'<Directory>{os.path.dirname(self.paths[0])}</Directory></tool></toolOutput></fits>'
+        self.assertEqual(ET.tostring(tree.getroot(), encoding='unicode'), expected, 'Problem with replace staged path')
+
+
+if __name__ == '__main__':
+    unittest.main()
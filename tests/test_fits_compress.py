@@ -0,0 +1,97 @@
+"""Tests pruned and compressed FITS XML (FITS_COMPRESS in the configuration file), which only keeps the parts of the
+FITS XML used by the script and saves it with gzip, and reading it with fits_row and update_fits.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import unittest
+import configuration as c
+from format_analysis_functions import FitsCommand, fits_row, fits_xml_list, make_fits_xml, update_fits
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend.
+        Saves the compress setting from the configuration file, since the tests change it.
+        """
+        os.mkdir('accession')
+        for file_name in ('file.txt', 'data.csv', 'other.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'other.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.compress = getattr(c, 'FITS_COMPRESS', False)
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and the FITS folder, and restores the compress setting.
+        """
+        c.FITS_COMPRESS = self.compress
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_same_rows(self):
+        """
+        Test for reading compressed FITS XML with fits_row, which should be the same as the uncompressed XML.
+        Result for testing is the rows from each FITS XML, and the FITS XML file names.
+        """
+        # Makes FITS XML for the same file without and then with compression.
+        c.FITS_COMPRESS = False
+        make_fits_xml(self.paths[:1], 'accession_FITS', 1, 500, self.backend)
+        c.FITS_COMPRESS = True
+        make_fits_xml(self.paths[:1], 'accession_FITS', 1, 500, self.backend)
+
+        # Runs the function being tested.
+        result = fits_row(os.path.join('accession_FITS', 'file.txt.fits.xml.gz'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = fits_row(os.path.join('accession_FITS', 'file.txt.fits.xml'))
+        self.assertEqual(result, expected, 'Problem with same rows')
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), ['file.txt.fits.xml', 'file.txt.fits.xml.gz'],
+                         'Problem with same rows, names')
+
+    def test_update(self):
+        """
+        Test for updating a FITS folder with compressed XML, when one file was deleted from the accession
+        and one was added.
+        Result for testing is the names of the FITS XML.
+        """
+        # Makes compressed FITS XML for two files and deletes one of them.
+        c.FITS_COMPRESS = True
+        make_fits_xml(self.paths[:2], 'accession_FITS', 1, 500, self.backend)
+        os.remove(self.paths[1])
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = ['file.txt.fits.xml.gz', 'other.txt.fits.xml.gz']
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), expected, 'Problem with update')
+
+    def test_incomplete(self):
+        """
+        Test for compressed FITS XML that was only partly saved, which fits_row cannot read.
+        Result for testing is the value returned by fits_row (None).
+        """
+        # Makes compressed FITS XML and cuts it off.
+        c.FITS_COMPRESS = True
+        make_fits_xml(self.paths[:1], 'accession_FITS', 1, 500, self.backend)
+        with open(os.path.join('accession_FITS', 'file.txt.fits.xml.gz'), 'r+') as fits_xml:
+            fits_xml.truncate(50)
+
+        # Runs the function being tested.
+        result = fits_row(os.path.join('accession_FITS', 'file.txt.fits.xml.gz'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, None, 'Problem with incomplete')
+
+
+if __name__ == '__main__':
+    unittest.main()
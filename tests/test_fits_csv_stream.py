@@ -0,0 +1,99 @@
+"""Tests the FitsCsvStream class, which makes the FITS CSV while the FITS XML is being made.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import csv
+import os
+import shutil
+import sys
+import unittest
+from format_analysis_functions import FitsCommand, FitsCsvStream, make_fits_csv, make_fits_xml
+
+
+def read_csv_rows(csv_path):
+    """Returns the header and the sorted rows of a CSV, since the order of the rows is not part of the test."""
+    with open(csv_path, newline="") as csv_file:
+        rows = list(csv.reader(csv_file))
+    return [rows[0]] + sorted(rows[1:])
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, including an empty file and two files with the same content,
+        so the XML comes from FITS, from the script, and from copies, and the FITS folder.
+        """
+        os.mkdir('accession')
+        for file_name, text in (('file.txt', 'Text'), ('copy.txt', 'Text'), ('data.csv', 'a,b'), ('empty.txt', '')):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(text)
+        self.paths = [os.path.join(os.getcwd(), 'accession', file_name)
+                      for file_name in ('file.txt', 'copy.txt', 'data.csv', 'empty.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+
+    def tearDown(self):
+        """
+        Deletes the accession folder, the FITS folder, and the FITS CSVs.
+        """
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+        for csv_name in ('stream_fits.csv', 'folder_fits.csv'):
+            if os.path.exists(csv_name):
+                os.remove(csv_name)
+
+    def test_same_as_make_fits_csv(self):
+        """
+        Test for making the FITS CSV while making the FITS XML, with two FITS processes.
+        Result for testing is the CSV and the dataframe, which should be the same as make_fits_csv() made from the FITS
+        folder.
+        """
+        # Runs the function being tested.
+        fits_csv = FitsCsvStream('accession_FITS', os.getcwd(), 'stream')
+        make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend, fits_csv=fits_csv)
+        df_stream = fits_csv.finish()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        df_folder = make_fits_csv('accession_FITS', os.getcwd(), 'folder')
+        result = read_csv_rows('stream_fits.csv')
+        self.assertEqual(len(result), 5, 'Problem with same as make_fits_csv, row count')
+        self.assertEqual(result, read_csv_rows('folder_fits.csv'), 'Problem with same as make_fits_csv')
+        self.assertEqual(df_stream.fillna('').values.tolist(), df_folder.fillna('').values.tolist(),
+                         'Problem with same as make_fits_csv, dataframe')
+
+    def test_unreadable(self):
+        """
+        Test for FITS XML that cannot be read, which is left out of the CSV like it is by make_fits_csv().
+        Result for testing is the CSV, which should only have the header.
+        """
+        # Makes FITS XML that cannot be read.
+        with open(os.path.join('accession_FITS', 'bad.txt.fits.xml'), 'w') as fits_xml:
+            fits_xml.write('<fits')
+
+        # Runs the function being tested.
+        fits_csv = FitsCsvStream('accession_FITS', os.getcwd(), 'stream')
+        fits_csv.add('bad.txt.fits.xml')
+        fits_csv.finish()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(len(read_csv_rows('stream_fits.csv')), 1, 'Problem with unreadable')
+
+    def test_error(self):
+        """
+        Test for an error reading FITS XML, which is raised by the next add() instead of waiting for finish().
+        Result for testing is the error raised by add() and by finish().
+        """
+        # Adds FITS XML that is not in the FITS folder, and waits for it to be read.
+        fits_csv = FitsCsvStream('accession_FITS', os.getcwd(), 'stream')
+        fits_csv.add('missing.txt.fits.xml')
+        fits_csv.wait()
+
+        # Runs the function being tested. assertRaises prints "OK" if the error is raised.
+        with self.assertRaises(FileNotFoundError, msg='Problem with error, add'):
+            fits_csv.add('file.txt.fits.xml')
+        with self.assertRaises(FileNotFoundError, msg='Problem with error, finish'):
+            fits_csv.finish()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests the FitsDaemon identification backend, which sends files to FITS daemons that keep running.
+Uses fits_standin.py --daemon instead of a FITS daemon, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import threading
+import unittest
+from format_analysis_functions import FitsDaemon, make_fits_xml
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend to test.
+        """
+        os.makedirs(os.path.join('accession', 'dir'))
+        for file_path in ('file.txt', 'data.csv', 'empty.txt', os.path.join('dir', 'file.txt')):
+            with open(os.path.join('accession', file_path), 'w') as file:
+                if file_path != 'empty.txt':
+                    file.write('Text')
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'empty.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'dir', 'file.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsDaemon(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")} --daemon')
+
+    def tearDown(self):
+        """
+        Stops the daemons and deletes the accession folder and FITS folder.
+        """
+        self.backend.close()
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_identify(self):
+        """
+        Test for identifying a batch of files, including one that is missing.
+        Result for testing is the format name in each FITS XML returned by the function.
+        """
+        # Runs the function being tested.
+        missing = os.path.join(os.getcwd(), 'accession', 'missing.txt')
+        fits_trees = self.backend.identify(self.paths + [missing], 'accession_staging')
+
+        # Makes a list of the file name and format name from the FITS XML for each file in the result.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        result = []
+        for path, tree in fits_trees.items():
+            format_name = tree.getroot().find('fits:identification/fits:identity', ns).get('format')
+            result.append([os.path.basename(path), format_name])
+
+        # Creates a list with the expected result. The missing file is not included.
+        expected = [['data.csv', 'Comma-Separated Values (CSV)'], ['empty.txt', 'empty'],
+                    ['file.txt', 'Plain text'], ['file.txt', 'Plain text']]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(result), expected, 'Problem with identify')
+
+    def test_reuse(self):
+        """
+        Test for identifying two batches one after the other, which should use the same daemon.
+        Result for testing is the number of daemons that were started.
+        """
+        # Runs the function being tested twice.
+        self.backend.identify(self.paths[:2], 'accession_staging')
+        self.backend.identify(self.paths[2:], 'accession_staging')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two numbers.
+        self.assertEqual(len(self.backend.processes), 1, 'Problem with reuse')
+
+    def test_crash(self):
+        """
+        Test for a file that makes the daemon end in the middle of a batch (fits_standin.py ends for "crash").
+        Result for testing is which files have FITS XML and which do not (None), and the number of daemons started.
+        """
+        # Makes the file that ends the daemon.
+        crash = os.path.join(os.getcwd(), 'accession', 'crash.txt')
+        with open(crash, 'w') as file:
+            file.write('Text')
+
+        # Runs the function being tested.
+        fits_trees = self.backend.identify([self.paths[0], crash, self.paths[1]], 'accession_staging')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [fits_trees[self.paths[0]] is None, fits_trees[crash] is None, fits_trees[self.paths[1]] is None]
+        self.assertEqual(result, [False, True, False], 'Problem with crash')
+        self.assertEqual(len(self.backend.processes), 2, 'Problem with crash, daemons')
+
+    def test_expire_answered(self):
+        """
+        Test for the timer of a file the daemon already responded to, which should not stop the daemon.
+        Result for testing is if the daemon is still running and if the file was reported as expired.
+        """
+        # Makes a daemon and the events for a file it has responded to.
+        process = self.backend.start()
+        answered = threading.Event()
+        answered.set()
+        expired = threading.Event()
+
+        # Runs the function being tested.
+        FitsDaemon.expire(process, answered, expired, threading.Lock())
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual([process.poll() is None, expired.is_set()], [True, False], 'Problem with expire answered')
+
+    def test_make_fits_xml(self):
+        """
+        Test for making FITS XML with the daemon backend and two workers.
+        Result for testing is the contents of the FITS folder and the list of errors returned by make_fits_xml().
+        """
+        # Runs the function being tested.
+        errors = make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend)
+
+        # Creates a list with the expected result.
+        expected = ['data.csv.fits.xml', 'empty.txt.fits.xml', 'file.txt-1.fits.xml', 'file.txt.fits.xml']
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(os.listdir('accession_FITS')), expected, 'Problem with make fits xml')
+        self.assertEqual(errors, [], 'Problem with make fits xml, errors')
+        self.assertLessEqual(len(self.backend.processes), 2, 'Problem with make fits xml, daemons')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests the function fits_dataframe, which makes the FITS dataframe from the rows for the FITS CSV,
+so it does not need to be read from the CSV. The dataframe should be the same as reading the CSV."""
+
+import datetime
+import os
+import unittest
+from format_analysis_functions import csv_to_dataframe, fits_dataframe, fits_record, write_fits_csv
+
+
+class MyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        """
+        Deletes the FITS CSV made by the test, if present.
+        """
+        if os.path.exists('accession_fits.csv'):
+            os.remove('accession_fits.csv')
+
+    def test_same_as_csv(self):
+        """
+        Test for rows with empty values and text that pandas reads as NaN from a CSV ("NA", "N/A", "null", "nan").
+        Result for testing is the dataframe, which should be the same as the CSV read with csv_to_dataframe().
+        """
+        # Makes the rows for test input.
+        rows = [[fits_record(['C:\\accession\\file.txt', 'Plain text', 'NA', None, 'Tika version 1.21', False,
+                              datetime.date(2022, 12, 14), 0.001, 'md5', 'null', '', None, 'N/A', 'full'])],
+                [fits_record(['C:\\accession\\data.csv', 'nan', None, None, 'Droid version 6.4', False,
+                              datetime.date(2022, 12, 14), 2, 'md5', None, 'true', 'true', None, 'full'])]]
+
+        # Runs the function being tested, and reads the CSV with the same rows to compare to.
+        result = fits_dataframe(rows)
+        write_fits_csv(rows, os.getcwd(), 'accession')
+        expected = csv_to_dataframe('accession_fits.csv')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result.columns.tolist(), expected.columns.tolist(), 'Problem with same as CSV, columns')
+        self.assertEqual(result.isnull().values.tolist(), expected.isnull().values.tolist(),
+                         'Problem with same as CSV, NaN')
+        self.assertEqual(result.fillna('').values.tolist(), expected.fillna('').values.tolist(),
+                         'Problem with same as CSV')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Tests the function fits_field_values, which reads the text of the FITS XML elements for the fields in FITS_FIELDS
+(or another list of fields) in one pass, reformatting it if the field has a function for that.
+In the main script, it is called by fits_row(), so it is implied to work if tests of that function pass.
+These tests make it easier to identify the problem with this specific function.
+
+For input, tests use FITS files that are in the tests folder of this script repo, or FITS XML made by the test.
+The result for testing is the dictionary returned by the function.
+"""
+
+import datetime
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from format_analysis_functions import fits_field_tree, fits_field_values
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_default_fields(self):
+        """
+        Test for the fields in FITS_FIELDS, with an element that repeats (creatingApplicationName)
+        and elements that are missing (filestatus has no children).
+        """
+        # Reads the FITS XML (fits_row function usually does this) for test input.
+        fits_file = os.path.join("test_FITS", "get_text_FITS", "element_multi.csv.fits.xml")
+        root = ET.parse(fits_file).getroot()
+
+        # Runs the function being tested and saves the result to a variable.
+        result = fits_field_values(root)
+
+        # Creates a dictionary with the expected result.
+        expected = {"FITS_File_Path": "C:\\accession\\disk1\\element_multi.csv",
+                    "FITS_Date_Last_Modified": datetime.date(2022, 12, 14),
+                    "FITS_Size_KB": 6002.01,
+                    "FITS_MD5": "f95a4c954014342e4bf03f51fcefaecd",
+                    "FITS_Creating_Application": "Creating_Tool_Option_One; Creating_Tool_Option_Two",
+                    "FITS_Valid": None,
+                    "FITS_Well-Formed": None,
+                    "FITS_Status_Message": None}
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, expected, "Problem with default fields")
+
+    def test_other_fields(self):
+        """
+        Test for a list of fields that is not the default, with an element in metadata that is more than one level
+        below the root and has a function to reformat it, and fileinfo twice, where only the first is used.
+        """
+        # Makes FITS XML for test input.
+        root = ET.fromstring('<fits xmlns="http://hul.harvard.edu/ois/xml/ns/fits/fits_output">'
+                             '<fileinfo><size>100</size></fileinfo><fileinfo><size>200</size></fileinfo>'
+                             '<metadata><image><imageWidth>640</imageWidth></image></metadata></fits>')
+
+        # Runs the function being tested and saves the result to a variable.
+        fields = [("Size", "fileinfo/size", None), ("Width", "metadata/image/imageWidth", int)]
+        result = fits_field_values(root, fields, fits_field_tree(fields))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, {"Size": "100", "Width": 640}, "Problem with other fields")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests the fits_index function, which keeps an index of the FITS XML in the FITS folder
+so the FITS XML does not need to be read every time the script is run.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import csv
+import os
+import shutil
+import sys
+import unittest
+from format_analysis_functions import FitsCommand, fits_index, fits_row, make_fits_xml
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files and the FITS folder with FITS XML for them.
+        """
+        os.mkdir('accession')
+        for file_name in ('file.txt', 'data.csv'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv')]
+        os.mkdir('accession_FITS')
+        backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, backend)
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and the FITS folder.
+        """
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_new_index(self):
+        """
+        Test for making the index when there is not one yet.
+        Result for testing is the FITS XML name and file path in the index.
+        """
+        # Runs the function being tested.
+        index = fits_index('accession_FITS')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = sorted([[name, entry['File_Path']] for name, entry in index.items()])
+        expected = [['data.csv.fits.xml', self.paths[1]], ['file.txt.fits.xml', self.paths[0]]]
+        self.assertEqual(result, expected, 'Problem with new index')
+
+    def test_saved_index(self):
+        """
+        Test for using the saved index, where only FITS XML that changed since it was saved is read again.
+        The saved file path for data.csv is edited, so the result shows if the XML was read or the index was used.
+        Result for testing is the file paths in the index.
+        """
+        # Makes the index, edits the saved path for both files, and changes the XML for file.txt.
+        fits_index('accession_FITS')
+        with open(os.path.join('accession_FITS', 'fits_index.csv'), newline='') as index_file:
+            rows = list(csv.DictReader(index_file))
+        for row in rows:
+            row['File_Path'] = 'edited'
+        with open(os.path.join('accession_FITS', 'fits_index.csv'), 'w', newline='') as index_file:
+            index_write = csv.DictWriter(index_file, fieldnames=rows[0].keys())
+            index_write.writeheader()
+            index_write.writerows(rows)
+        with open(os.path.join('accession_FITS', 'file.txt.fits.xml'), 'a') as fits_xml:
+            fits_xml.write('\n')
+
+        # Runs the function being tested.
+        index = fits_index('accession_FITS')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = sorted([[name, entry['File_Path']] for name, entry in index.items()])
+        expected = [['data.csv.fits.xml', 'edited'], ['file.txt.fits.xml', self.paths[0]]]
+        self.assertEqual(result, expected, 'Problem with saved index')
+
+    def test_rows(self):
+        """
+        Test for keeping the rows for the FITS CSV from the FITS XML that is read, when the saved index is used
+        for data.csv and file.txt changed, so only the FITS XML for file.txt is read.
+        Result for testing is the rows, which should be the same as fits_row() for the FITS XML that was read.
+        """
+        # Makes the index and changes the XML for file.txt.
+        fits_index('accession_FITS')
+        with open(os.path.join('accession_FITS', 'file.txt.fits.xml'), 'a') as fits_xml:
+            fits_xml.write('\n')
+
+        # Runs the function being tested.
+        rows = {}
+        fits_index('accession_FITS', rows=rows)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        expected = {'file.txt.fits.xml': fits_row(os.path.join('accession_FITS', 'file.txt.fits.xml'))}
+        self.assertEqual(rows, expected, 'Problem with rows')
+
+    def test_rows_error(self):
+        """
+        Test for FITS XML that can be read but does not have the identification needed for the rows,
+        which is an error that should be raised instead of hidden.
+        Result for testing is the error raised by the function.
+        """
+        # Removes the identification from the FITS XML for file.txt.
+        xml_path = os.path.join('accession_FITS', 'file.txt.fits.xml')
+        with open(xml_path) as fits_xml:
+            xml_text = fits_xml.read()
+        with open(xml_path, 'w') as fits_xml:
+            fits_xml.write(xml_text[:xml_text.index('<identification>')] +
+                           xml_text[xml_text.index('</identification>') + len('</identification>'):])
+
+        # Runs the function being tested. assertRaises prints "OK" if the error is raised.
+        with self.assertRaises(TypeError, msg='Problem with rows error'):
+            fits_index('accession_FITS', rows={})
+
+    def test_deleted_xml(self):
+        """
+        Test for updating the index after FITS XML was deleted.
+        Result for testing is the FITS XML names in the saved index.
+        """
+        # Makes the index and deletes one of the FITS XML.
+        fits_index('accession_FITS')
+        os.remove(os.path.join('accession_FITS', 'data.csv.fits.xml'))
+
+        # Runs the function being tested.
+        fits_index('accession_FITS')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        with open(os.path.join('accession_FITS', 'fits_index.csv'), newline='') as index_file:
+            result = [row['FITS_Name'] for row in csv.DictReader(index_file)]
+        self.assertEqual(result, ['file.txt.fits.xml'], 'Problem with deleted xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Tests the FitsJournal class and read_fits_journal function, which record the progress of making FITS XML,
+and resuming an interrupted run with update_fits.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from format_analysis_functions import FitsCommand, FitsJournal, make_fits_xml, read_fits_journal, update_fits
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend.
+        """
+        os.mkdir('accession')
+        for file_name in ('file.txt', 'data.csv', 'other.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'other.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+
+    def tearDown(self):
+        """
+        Deletes the accession folder, the FITS folder, and the staging folder, if present.
+        """
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+        if os.path.exists('accession_FITS_staging'):
+            shutil.rmtree('accession_FITS_staging')
+
+    def test_read_journal(self):
+        """
+        Test for reading the journal of an interrupted run.
+        Result for testing is the paths that were finished and the paths that were in progress.
+        """
+        # Records the progress of an interrupted run, without finishing the journal.
+        journal = FitsJournal('accession_FITS')
+        journal.record('STARTED', self.paths[:2])
+        journal.record('DONE', self.paths[:1])
+        journal.journal_file.close()
+
+        # Runs the function being tested.
+        result = read_fits_journal('accession_FITS')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two values.
+        expected = ({self.paths[0]}, {self.paths[1]})
+        self.assertEqual(result, expected, 'Problem with read journal')
+
+    def test_finished_run(self):
+        """
+        Test for making FITS XML without an interruption, which should delete the journal.
+        Result for testing is the value returned by read_fits_journal().
+        """
+        make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend)
+        self.assertEqual(read_fits_journal('accession_FITS'), None, 'Problem with finished run')
+
+    def test_resume(self):
+        """
+        Test for resuming an interrupted run, where one file was finished, one file has incomplete XML,
+        and one file was not started.
+        Result for testing is the contents of the FITS folder and if each FITS XML can be read.
+        """
+        # Makes FITS XML for two files, cuts off the XML for one, and makes the journal of an interrupted run.
+        make_fits_xml(self.paths[:2], 'accession_FITS', 1, 500, self.backend)
+        with open(os.path.join('accession_FITS', 'data.csv.fits.xml'), 'r+') as fits_xml:
+            fits_xml.truncate(100)
+        journal = FitsJournal('accession_FITS')
+        journal.record('STARTED', self.paths[:2])
+        journal.record('DONE', self.paths[:1])
+        journal.journal_file.close()
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = sorted(os.listdir('accession_FITS'))
+        expected = ['data.csv.fits.xml', 'file.txt.fits.xml', 'fits_index.csv', 'other.txt.fits.xml']
+        self.assertEqual(result, expected, 'Problem with resume')
+        for fits_name in expected[:2] + expected[3:]:
+            ET.parse(os.path.join('accession_FITS', fits_name))
+
+
+    def test_resume_staging(self):
+        """
+        Test for resuming an interrupted run that left its staging folder behind, with a batch that was staged
+        and partly identified by FITS, which must not stop the staging folder from being made again.
+        Result for testing is the contents of the FITS folder and if the staging folder was deleted.
+        """
+        # Makes the journal and the staging folder of a run that was interrupted while FITS identified the first shard.
+        journal = FitsJournal('accession_FITS')
+        journal.record('STARTED', self.paths)
+        journal.journal_file.close()
+        for folder in ('input', 'output'):
+            os.makedirs(os.path.join('accession_FITS_staging', '0', folder, '1'))
+        shutil.copy2(self.paths[0], os.path.join('accession_FITS_staging', '0', 'input', '1', 'file.txt'))
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = sorted(os.listdir('accession_FITS'))
+        expected = ['data.csv.fits.xml', 'file.txt.fits.xml', 'fits_index.csv', 'other.txt.fits.xml']
+        self.assertEqual(result, expected, 'Problem with resume staging')
+        self.assertEqual(os.path.exists('accession_FITS_staging'), False, 'Problem with resume staging, folder')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests the sharded layout of the FITS folder (FITS_LAYOUT in the configuration file), where FITS XML is saved in
+subfolders, and reading a FITS folder that has XML in both layouts with fits_xml_list, make_fits_csv and update_fits.
+Uses fits_standin.py instead of FITS, so the tests do not require Java."""
+
+import csv
+import hashlib
+import os
+import shutil
+import sys
+import unittest
+import configuration as c
+from format_analysis_functions import FitsCommand, fits_xml_list, make_fits_csv, make_fits_xml, update_fits
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend.
+        Saves the layout from the configuration file, since the tests change it.
+        """
+        os.mkdir('accession')
+        for file_name in ('file.txt', 'data.csv', 'other.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'other.txt')]
+        os.mkdir('accession_FITS')
+        self.backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.layout = getattr(c, 'FITS_LAYOUT', 'flat')
+
+    def tearDown(self):
+        """
+        Deletes the accession folder, the FITS folder, and the FITS CSV, and restores the layout.
+        """
+        c.FITS_LAYOUT = self.layout
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+        if os.path.exists('accession_fits.csv'):
+            os.remove('accession_fits.csv')
+
+    def test_sharded(self):
+        """
+        Test for making FITS XML with the sharded layout.
+        Result for testing is the list of FITS XML, which should be in subfolders named for the MD5 of the path.
+        """
+        # Runs the function being tested.
+        c.FITS_LAYOUT = 'sharded'
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [os.path.join(hashlib.md5(path.encode()).hexdigest()[:2], f'{os.path.basename(path)}.fits.xml')
+                    for path in self.paths]
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), sorted(expected), 'Problem with sharded')
+
+    def test_sharded_update(self):
+        """
+        Test for updating a FITS folder with the sharded layout when one file was deleted from the accession.
+        Result for testing is the subfolders of the FITS folder, which should not include an empty subfolder
+        for the deleted file.
+        """
+        # Makes FITS XML with the sharded layout and deletes one file.
+        c.FITS_LAYOUT = 'sharded'
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, self.backend)
+        os.remove(self.paths[1])
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [entry.name for entry in os.scandir('accession_FITS') if entry.is_dir()]
+        expected = {hashlib.md5(path.encode()).hexdigest()[:2] for path in (self.paths[0], self.paths[2])}
+        self.assertEqual(sorted(result), sorted(expected), 'Problem with sharded update')
+
+    def test_mixed_csv(self):
+        """
+        Test for making the FITS CSV from a FITS folder with XML in both layouts.
+        Result for testing is the file paths in the FITS CSV.
+        """
+        # Makes FITS XML for one file with the flat layout and the rest with the sharded layout.
+        c.FITS_LAYOUT = 'flat'
+        make_fits_xml(self.paths[:1], 'accession_FITS', 1, 500, self.backend)
+        c.FITS_LAYOUT = 'sharded'
+        make_fits_xml(self.paths[1:], 'accession_FITS', 1, 500, self.backend)
+
+        # Runs the function being tested.
+        make_fits_csv('accession_FITS', os.getcwd(), 'accession')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        with open('accession_fits.csv', newline='') as fits_csv:
+            result = sorted(row[0] for row in list(csv.reader(fits_csv))[1:])
+        self.assertEqual(result, sorted(self.paths), 'Problem with mixed csv')
+
+    def test_mixed_update(self):
+        """
+        Test for updating a FITS folder made with the flat layout after changing to the sharded layout,
+        when one file was deleted from the accession and one was added.
+        Result for testing is the list of FITS XML.
+        """
+        # Makes FITS XML for two files with the flat layout, deletes one, and changes the layout.
+        c.FITS_LAYOUT = 'flat'
+        make_fits_xml(self.paths[:2], 'accession_FITS', 1, 500, self.backend)
+        os.remove(self.paths[1])
+        c.FITS_LAYOUT = 'sharded'
+
+        # Runs the function being tested.
+        update_fits(os.path.join(os.getcwd(), 'accession'), 'accession_FITS', os.getcwd(), 'accession',
+                    backend=self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        shard = hashlib.md5(self.paths[2].encode()).hexdigest()[:2]
+        expected = ['file.txt.fits.xml', os.path.join(shard, 'other.txt.fits.xml')]
+        self.assertEqual(sorted(fits_xml_list('accession_FITS')), sorted(expected), 'Problem with mixed update')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests the function fits_record, which makes the FitsRecord for one format identification (a row in the FITS CSV)
+and interns the text that is usually the same for many files, and peak_memory, which reports the memory used.
+
+For input, tests use FITS files that are in the tests folder of this script repo.
+"""
+
+import os
+import unittest
+from format_analysis_functions import FITS_COLUMNS, fits_record, fits_row, peak_memory
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_interned(self):
+        """
+        Test for the rows from two FITS XML files with the same format identification.
+        Result for testing is if the text is the same object in both rows, which should only be true for
+        the columns that are interned (all but the file path and MD5).
+        """
+        # Runs the function being tested (fits_row() calls it).
+        fits_output = os.path.join('test_FITS', 'csv_one_id_FITS')
+        row_one = fits_row(os.path.join(fits_output, 'spreadsheet1.csv.fits.xml'))[0]
+        row_two = fits_row(os.path.join(fits_output, 'spreadsheet2.csv.fits.xml'))[0]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [row_one.format_name is row_two.format_name, row_one.identifying_tools is row_two.identifying_tools,
+                  row_one.file_path is row_two.file_path]
+        self.assertEqual(result, [True, True, False], 'Problem with interned')
+
+    def test_record(self):
+        """
+        Test for making a record from a list of values, which can be read by column and has the same values.
+        Result for testing is the record and its format name.
+        """
+        # Runs the function being tested.
+        values = ['C:\\accession\\file.txt', 'Plain text', None, None, 'Tika version 1.21', False, '2022-12-14',
+                  0.001, 'md5', None, None, None, None, 'full']
+        record = fits_record(values)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(len(record), len(FITS_COLUMNS), 'Problem with record, length')
+        self.assertEqual(record, tuple(values), 'Problem with record')
+        self.assertEqual(record.format_name, 'Plain text', 'Problem with record, format name')
+
+    def test_peak_memory(self):
+        """
+        Test for measuring the most memory used, which is more than 0 MB for any Python script.
+        """
+        # Runs the function being tested.
+        result = peak_memory()
+
+        # Compares the results. assertGreater prints "OK" or the two values.
+        self.assertGreater(result, 0, 'Problem with peak memory')
+
+
+if __name__ == '__main__':
+    unittest.main()
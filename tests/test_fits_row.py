@@ -25,10 +25,10 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk1\\empty_version.csv', 'Comma-Separated Values (CSV)', None,
+        expected = [('C:\\accession\\disk1\\empty_version.csv', 'Comma-Separated Values (CSV)', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18',
                      'Droid version 6.4', False, datetime.date(2022, 12, 14), 6002.01,
-                     'f95a4c954014342e4bf03f51fcefaecd', None, None, None, None]]
+                     'f95a4c954014342e4bf03f51fcefaecd', None, None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with empty version')
@@ -44,10 +44,10 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk1\\puid.csv', 'Comma-Separated Values (CSV)', None,
+        expected = [('C:\\accession\\disk1\\puid.csv', 'Comma-Separated Values (CSV)', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18', 'Droid version 6.4', False,
                      datetime.date(2022, 12, 14), 6002.01, 'f95a4c954014342e4bf03f51fcefaecd',
-                     None, None, None, None]]
+                     None, None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with PUID')
@@ -63,11 +63,11 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk1\\tools.txt', 'Plain text', None,
+        expected = [('C:\\accession\\disk1\\tools.txt', 'Plain text', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/111',
                      'Droid version 6.4; Jhove version 1.20.1; file utility version 5.03', False,
                      datetime.date(2022, 12, 14), 2, '7b71af3fdf4a2f72a378e3e77815e497',
-                     None, 'true', 'true', None]]
+                     None, 'true', 'true', None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with multiple tools')
@@ -83,17 +83,17 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk1\\multi_keep_all.xlsx', 'ZIP Format', '2.0',
+        expected = [('C:\\accession\\disk1\\multi_keep_all.xlsx', 'ZIP Format', '2.0',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/263',
                      'Droid version 6.4; file utility version 5.03; ffident version 0.2', True,
                      datetime.date(2022, 12, 14), 20.56, 'db4c3079e3805469c1b47c4864234e66', 'Microsoft Excel',
-                     None, None, None],
-                    ['C:\\accession\\disk1\\multi_keep_all.xlsx', 'XLSX', None, None, 'Exiftool version 11.54',
+                     None, None, None, 'full'),
+                    ('C:\\accession\\disk1\\multi_keep_all.xlsx', 'XLSX', None, None, 'Exiftool version 11.54',
                      True, datetime.date(2022, 12, 14), 20.56, 'db4c3079e3805469c1b47c4864234e66',
-                     'Microsoft Excel', None, None, None],
-                    ['C:\\accession\\disk1\\multi_keep_all.xlsx', 'Office Open XML Workbook', None, None,
+                     'Microsoft Excel', None, None, None, 'full'),
+                    ('C:\\accession\\disk1\\multi_keep_all.xlsx', 'Office Open XML Workbook', None, None,
                      'Tika version 1.21', True, datetime.date(2022, 12, 14), 20.56,
-                     'db4c3079e3805469c1b47c4864234e66', 'Microsoft Excel', None, None, None]]
+                     'db4c3079e3805469c1b47c4864234e66', 'Microsoft Excel', None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with multiple format ids - keep all')
@@ -109,9 +109,9 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk2\\multi_keep_empty.txt', 'empty', None, None,
+        expected = [('C:\\accession\\disk2\\multi_keep_empty.txt', 'empty', None, None,
                      'file utility version 5.03', False, datetime.date(2022, 12, 14), 0,
-                     'd41d8cd98f00b204e9800998ecf8427e', None, None, None, None]]
+                     'd41d8cd98f00b204e9800998ecf8427e', None, None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with multiple format ids - keep empty')
@@ -127,10 +127,10 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk2\\multi_keep_puid.gz', 'GZIP Format', None,
+        expected = [('C:\\accession\\disk2\\multi_keep_puid.gz', 'GZIP Format', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/266',
                      'Droid version 6.4; Tika version 1.21', False, datetime.date(2022, 12, 14), 1.993,
-                     '6749b0ec1fbc96faab1a1f98dd7b8a74', None, None, None, None]]
+                     '6749b0ec1fbc96faab1a1f98dd7b8a74', None, None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with multiple format ids - keep PUID')
@@ -146,11 +146,11 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk2\\size_less.txt', 'Plain text', None,
+        expected = [('C:\\accession\\disk2\\size_less.txt', 'Plain text', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/111',
                      'Droid version 6.4; Jhove version 1.20.1; file utility version 5.03', False,
                      datetime.date(2022, 12, 14), .000345, 'e700d0871d44af1a217f0bf32320f25c',
-                     None, 'true', 'true', None]]
+                     None, 'true', 'true', None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with size less than rounding threshold')
@@ -166,10 +166,10 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk2\\size_equal.html', 'Extensible Markup Language', '1.0',
+        expected = [('C:\\accession\\disk2\\size_equal.html', 'Extensible Markup Language', '1.0',
                      None, 'Jhove version 1.20.1', False, datetime.date(2022, 12, 14), .001,
                      'e080b3394eaeba6b118ed15453e49a34', None, 'true', 'true',
-                     'Not able to determine type of end of line severity=info']]
+                     'Not able to determine type of end of line severity=info', 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with size equal to rounding threshold')
@@ -185,10 +185,10 @@ class MyTestCase(unittest.TestCase):
         result = fits_row(os.path.join(fits_output, fits_xml))
 
         # Creates a list with the expected result.
-        expected = [['C:\\accession\\disk1\\size_greater.csv', 'Comma-Separated Values (CSV)', None,
+        expected = [('C:\\accession\\disk1\\size_greater.csv', 'Comma-Separated Values (CSV)', None,
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18',
                      'Droid version 6.4', False, datetime.date(2022, 12, 14), 4.404,
-                     'd5e857a4bd33d2b5a2f96b78ccffe1f3', None, None, None, None]]
+                     'd5e857a4bd33d2b5a2f96b78ccffe1f3', None, None, None, None, 'full')]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with size large enough to round')
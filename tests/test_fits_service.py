@@ -0,0 +1,147 @@
+"""Tests the FitsService identification backend, which sends files to the FITS web service.
+Uses a web service made by the test with fits_standin.py instead of FITS Service, so the tests do not require Java."""
+
+import os
+import shutil
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import fits_standin
+from format_analysis_functions import FitsService, make_fits_xml
+
+
+class StandinService(BaseHTTPRequestHandler):
+    """Answers requests the same way as FITS Service, with made up FITS XML from fits_standin.py.
+    Files with "slow" in the name take 3 seconds."""
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path == '/fits/version':
+            response = fits_standin.VERSION.encode('utf-8')
+        elif url.path == '/fits/examine':
+            file_path = urllib.parse.parse_qs(url.query)['file'][0]
+            try:
+                response = fits_standin.fits_xml(file_path, slow=3).encode('utf-8')
+            except OSError:
+                self.send_error(500)
+                return
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        try:
+            self.wfile.write(response)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        """Does not print each request."""
+        pass
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, the web service, and the backend to test.
+        """
+        os.makedirs(os.path.join('accession', 'dir'))
+        for file_path in ('file.txt', 'data.csv', 'empty.txt', os.path.join('dir', 'file.txt')):
+            with open(os.path.join('accession', file_path), 'w') as file:
+                if file_path != 'empty.txt':
+                    file.write('Text')
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'file.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'data.csv'),
+                      os.path.join(os.getcwd(), 'accession', 'empty.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'dir', 'file.txt')]
+        os.mkdir('accession_FITS')
+        self.server = ThreadingHTTPServer(('localhost', 0), StandinService)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.backend = FitsService(f'http://localhost:{self.server.server_address[1]}/fits/')
+
+    def tearDown(self):
+        """
+        Stops the web service and deletes the accession folder and FITS folder.
+        """
+        self.backend.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_identify(self):
+        """
+        Test for identifying a batch of files, including one that is missing.
+        Result for testing is the format name in each FITS XML returned by the function.
+        """
+        # Runs the function being tested.
+        missing = os.path.join(os.getcwd(), 'accession', 'missing.txt')
+        fits_trees = self.backend.identify(self.paths + [missing], 'accession_staging')
+
+        # Makes a list of the file name and format name from the FITS XML for each file in the result.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        result = []
+        for path, tree in fits_trees.items():
+            format_name = tree.getroot().find('fits:identification/fits:identity', ns).get('format')
+            result.append([os.path.basename(path), format_name])
+
+        # Creates a list with the expected result. The missing file is not included.
+        expected = [['data.csv', 'Comma-Separated Values (CSV)'], ['empty.txt', 'empty'],
+                    ['file.txt', 'Plain text'], ['file.txt', 'Plain text']]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(result), expected, 'Problem with identify')
+
+    def test_timeout(self):
+        """
+        Test for a file that the service takes longer than the timeout for, which has None as the value.
+        Result for testing is the dictionary returned by the function, and how long it took.
+        """
+        # Makes a file that the web service is slow for.
+        slow = os.path.join(os.getcwd(), 'accession', 'slow.txt')
+        with open(slow, 'w') as file:
+            file.write('Text')
+
+        # Runs the function being tested.
+        start = time.perf_counter()
+        fits_trees = self.backend.identify([slow, self.paths[0]], 'accession_staging', timeout=1)
+        seconds = time.perf_counter() - start
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [fits_trees[slow], fits_trees[self.paths[0]] is not None]
+        self.assertEqual(result, [None, True], 'Problem with timeout')
+        self.assertLess(seconds, 3, 'Problem with timeout, seconds')
+
+    def test_version(self):
+        """
+        Test for getting the FITS version from the service.
+        Result for testing is the version returned by the function.
+        """
+        # Runs the function being tested.
+        result = self.backend.version()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two strings.
+        self.assertEqual(result, fits_standin.VERSION, 'Problem with version')
+
+    def test_make_fits_xml(self):
+        """
+        Test for making FITS XML with the service backend and two workers.
+        Result for testing is the contents of the FITS folder and the list of errors returned by make_fits_xml().
+        """
+        # Runs the function being tested.
+        errors = make_fits_xml(self.paths, 'accession_FITS', 2, 1, self.backend)
+
+        # Creates a list with the expected result.
+        expected = ['data.csv.fits.xml', 'empty.txt.fits.xml', 'file.txt-1.fits.xml', 'file.txt.fits.xml']
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(os.listdir('accession_FITS')), expected, 'Problem with make fits xml')
+        self.assertEqual(errors, [], 'Problem with make fits xml, errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
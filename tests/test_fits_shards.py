@@ -0,0 +1,86 @@
+"""Tests the function fits_shards, which divides a list of file paths into lists for separate FITS processes,
+and the function critical_path, which estimates the work for the busiest FITS process."""
+
+import unittest
+from format_analysis_functions import critical_path, fits_shards
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_even(self):
+        """
+        Test for a number of files that divides evenly into the number of shards.
+        Result for testing is the list returned by the function.
+        """
+        # Runs the function being tested.
+        result = fits_shards(['a.txt', 'b.txt', 'c.txt', 'd.txt'], 2)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [['a.txt', 'c.txt'], ['b.txt', 'd.txt']]
+        self.assertEqual(result, expected, 'Problem with even')
+
+    def test_uneven(self):
+        """
+        Test for a number of files that does not divide evenly into the number of shards.
+        Result for testing is the list returned by the function.
+        """
+        # Runs the function being tested.
+        result = fits_shards(['a.txt', 'b.txt', 'c.txt', 'd.txt', 'e.txt'], 3)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [['a.txt', 'd.txt'], ['b.txt', 'e.txt'], ['c.txt']]
+        self.assertEqual(result, expected, 'Problem with uneven')
+
+    def test_fewer_files(self):
+        """
+        Test for fewer files than shards, so there are no empty shards.
+        Result for testing is the list returned by the function.
+        """
+        # Runs the function being tested.
+        result = fits_shards(['a.txt', 'b.txt'], 4)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [['a.txt'], ['b.txt']]
+        self.assertEqual(result, expected, 'Problem with fewer files')
+
+    def test_largest_first(self):
+        """
+        Test for dividing files by size, with the largest files first.
+        Result for testing is the list returned by the function.
+        """
+        # Runs the function being tested.
+        sizes = {'a.txt': 1, 'b.txt': 50, 'c.txt': 100, 'd.txt': 20, 'e.txt': 40}
+        result = fits_shards(['a.txt', 'b.txt', 'c.txt', 'd.txt', 'e.txt'], 2, sizes=sizes)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [['b.txt', 'e.txt', 'd.txt'], ['c.txt', 'a.txt']]
+        self.assertEqual(result, expected, 'Problem with largest first')
+
+    def test_batch_size(self):
+        """
+        Test for dividing files by size when the smallest shard is already full.
+        Result for testing is the list returned by the function.
+        """
+        # Runs the function being tested.
+        sizes = {'a.txt': 100, 'b.txt': 1, 'c.txt': 1, 'd.txt': 1}
+        result = fits_shards(['a.txt', 'b.txt', 'c.txt', 'd.txt'], 2, batch_size=2, sizes=sizes)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [['a.txt', 'd.txt'], ['b.txt', 'c.txt']]
+        self.assertEqual(result, expected, 'Problem with batch size')
+
+    def test_critical_path(self):
+        """
+        Test for estimating the work for the busiest FITS process, with more shards than workers.
+        Result for testing is the size returned by the function.
+        """
+        # Runs the function being tested.
+        sizes = {'a.txt': 100, 'b.txt': 60, 'c.txt': 30, 'd.txt': 20}
+        result = critical_path([['a.txt'], ['b.txt'], ['c.txt'], ['d.txt']], sizes, 2)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two numbers.
+        self.assertEqual(result, 110, 'Problem with critical path')
+
+
+if __name__ == '__main__':
+    unittest.main()
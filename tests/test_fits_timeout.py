@@ -0,0 +1,116 @@
+"""Tests the FITS timeout, which stops FITS for a file that takes too long, tries it again at the end,
+and makes FITS XML with "Identification Failed" if it still does not finish.
+Uses fits_standin.py with --slow instead of FITS, so the tests do not require Java or a slow file."""
+
+import os
+import shutil
+import sys
+import time
+import unittest
+from format_analysis_functions import FitsCommand, FitsDaemon, fits_row, make_fits_xml
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with a file that is fast and a file that is slow for the stand-in, and the FITS folder.
+        """
+        os.mkdir('accession')
+        for file_name in ('fast.txt', 'slow.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'fast.txt'),
+                      os.path.join(os.getcwd(), 'accession', 'slow.txt')]
+        os.mkdir('accession_FITS')
+        self.standin = f'"{sys.executable}" {os.path.join("..", "fits_standin.py")} --slow 5'
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and the FITS folder.
+        """
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_command(self):
+        """
+        Test for the command backend with a timeout.
+        Result for testing is which files have FITS XML and which timed out (None).
+        """
+        # Runs the function being tested.
+        fits_trees = FitsCommand(self.standin).identify(self.paths, 'accession_staging', 1)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [fits_trees[self.paths[0]] is None, fits_trees[self.paths[1]] is None]
+        self.assertEqual(result, [False, True], 'Problem with command')
+
+    def test_command_batch(self):
+        """
+        Test for the command backend with a timeout and a batch of many files, where the slow file takes less time
+        than the timeout for the whole batch but more than the timeout for one file, so FITS is stopped
+        when it does not finish another file in time, and the other files are still identified.
+        Result for testing is which files have FITS XML and which timed out (None).
+        """
+        # Makes more fast files for the batch.
+        paths = list(self.paths)
+        for number in range(6):
+            paths.append(os.path.join(os.getcwd(), 'accession', f'fast{number}.txt'))
+            with open(paths[-1], 'w') as file:
+                file.write('fast')
+
+        # Runs the function being tested.
+        fits_trees = FitsCommand(self.standin).identify(paths, 'accession_staging', 1)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [fits_trees[path] is None for path in paths]
+        self.assertEqual(result, [False, True, False, False, False, False, False, False], 'Problem with command batch')
+
+    def test_command_hang(self):
+        """
+        Test for the command backend with a timeout, where FITS makes XML for every file and then does not end,
+        so FITS is stopped but no file is unfinished.
+        Result for testing is which files have FITS XML and which timed out (None), and how long it took.
+        """
+        # Runs the function being tested, with only the fast file.
+        start = time.perf_counter()
+        fits_trees = FitsCommand(f'{self.standin} --hang 10').identify(self.paths[:1], 'accession_staging', 1)
+        seconds = time.perf_counter() - start
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual([fits_trees[self.paths[0]] is None], [False], 'Problem with command hang')
+        self.assertLess(seconds, 10, 'Problem with command hang, seconds')
+        self.assertFalse(os.path.exists('accession_staging'), 'Problem with command hang, staging folder')
+
+    def test_daemon(self):
+        """
+        Test for the daemon backend with a timeout.
+        Result for testing is which files have FITS XML and which timed out (None).
+        """
+        # Runs the function being tested.
+        backend = FitsDaemon(f'{self.standin} --daemon')
+        fits_trees = backend.identify(list(reversed(self.paths)), 'accession_staging', 1)
+        backend.close()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [fits_trees[self.paths[0]] is None, fits_trees[self.paths[1]] is None]
+        self.assertEqual(result, [False, True], 'Problem with daemon')
+
+    def test_identification_failed(self):
+        """
+        Test for making FITS XML for a file that does not finish when it is tried again.
+        Result for testing is the format name and status message from the FITS XML for the slow file.
+        """
+        # Runs the function being tested.
+        errors = make_fits_xml(self.paths, 'accession_FITS', 1, 500, FitsCommand(self.standin), timeout=1,
+                               retry_timeout=1)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        row = fits_row(os.path.join('accession_FITS', 'slow.txt.fits.xml'))[0]
+        result = [row[0], row[1], row[12]]
+        expected = [self.paths[1], 'Identification Failed', 'FITS did not finish in 1 seconds']
+        self.assertEqual(result, expected, 'Problem with identification failed')
+        self.assertEqual(errors, [], 'Problem with identification failed, errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Tests the FitsTriage class, which identifies files with a reduced set of FITS tools
+and then only uses the full FITS tools for files with an ambiguous result.
+Uses fits_standin.py for both tiers instead of FITS, so the tests do not require Java."""
+
+import os
+import shutil
+import sys
+import unittest
+import pandas as pd
+from format_analysis_functions import FitsCommand, FitsTriage, fits_row, make_fits_xml
+
+
+class FullCommand(FitsCommand):
+    """FitsCommand that keeps a list of every path it identifies, to test which files used the full tools."""
+
+    def __init__(self):
+        super().__init__(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.identified = []
+
+    def identify(self, paths, staging_folder, timeout=None):
+        self.identified.extend(paths)
+        return super().identify(paths, staging_folder, timeout)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files, the FITS folder, and the backend to test.
+        The stand-in identifies the PDF with a PUID and version that match NARA, the HTML with a PUID and version that
+        do not match NARA, and the text file with a PUID and no version.
+        """
+        os.mkdir('accession')
+        for file_name in ('document.pdf', 'page.html', 'notes.txt'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write(file_name)
+        self.paths = [os.path.join(os.getcwd(), 'accession', 'document.pdf'),
+                      os.path.join(os.getcwd(), 'accession', 'page.html'),
+                      os.path.join(os.getcwd(), 'accession', 'notes.txt')]
+        os.mkdir('accession_FITS')
+        df_nara = pd.DataFrame([['Portable Document Format 1.4', 'pdf',
+                                 'https://www.nationalarchives.gov.uk/PRONOM/fmt/18', 'Low Risk', 'Retain']],
+                               columns=['NARA_Format_Name', 'NARA_File_Extensions', 'NARA_PRONOM_URL',
+                                        'NARA_Risk_Level', 'NARA_Proposed_Preservation_Plan'])
+        self.full_backend = FullCommand()
+        triage_backend = FitsCommand(f'"{sys.executable}" {os.path.join("..", "fits_standin.py")}')
+        self.backend = FitsTriage(self.full_backend, triage_backend, df_nara)
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and the FITS folder.
+        """
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_identify(self):
+        """
+        Test for identifying a batch of files in triage mode.
+        Result for testing is the files identified with the full tools and the tier of each FITS XML.
+        """
+        # Runs the function being tested.
+        fits_trees = self.backend.identify(self.paths, 'accession_staging')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(self.full_backend.identified, self.paths[1:], 'Problem with identify, full tools')
+        result = [fits_trees[path].getroot().get('tier') for path in self.paths]
+        self.assertEqual(result, ['triage', None, None], 'Problem with identify, tier')
+
+    def test_tier_column(self):
+        """
+        Test for the tier in the rows for the FITS CSV, after making FITS XML in triage mode.
+        Result for testing is the file name and tier from each row.
+        """
+        # Runs the function being tested.
+        make_fits_xml(self.paths, 'accession_FITS', 1, 500, self.backend)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = []
+        for fits_xml in sorted(os.listdir('accession_FITS')):
+            row = fits_row(os.path.join('accession_FITS', fits_xml))[0]
+            result.append([os.path.basename(row[0]), row[13]])
+        expected = [['document.pdf', 'triage'], ['notes.txt', 'full'], ['page.html', 'full']]
+        self.assertEqual(result, expected, 'Problem with tier column')
+
+
+if __name__ == '__main__':
+    unittest.main()
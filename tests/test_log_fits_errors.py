@@ -0,0 +1,46 @@
+"""Tests the function log_fits_errors, which prints and saves the paths of files that FITS did not make XML for."""
+
+import os
+import unittest
+from format_analysis_functions import log_fits_errors
+
+
+class MyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        """
+        Deletes the error log created by the tests, if present.
+        """
+        if os.path.exists('accession_fits_errors.txt'):
+            os.remove('accession_fits_errors.txt')
+
+    def test_errors(self):
+        """
+        Test for a list of files with FITS errors.
+        Result for testing is the contents of the error log made by the function.
+        """
+        # Runs the function being tested.
+        errors = [os.path.join('accession', 'disk1', 'file.txt'), os.path.join('accession', 'disk2', 'data.csv')]
+        log_fits_errors(errors, os.getcwd(), 'accession')
+
+        # Reads the error log created by the function into a list.
+        with open('accession_fits_errors.txt', 'r', encoding='utf-8') as text:
+            result = text.read().splitlines()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, errors, 'Problem with errors')
+
+    def test_no_errors(self):
+        """
+        Test for an empty list of files with FITS errors, which should not make an error log.
+        Result for testing is if the error log exists.
+        """
+        # Runs the function being tested.
+        log_fits_errors([], os.getcwd(), 'accession')
+
+        # Tests that no error log was made.
+        self.assertFalse(os.path.exists('accession_fits_errors.txt'), 'Problem with no errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
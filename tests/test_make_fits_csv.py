@@ -5,24 +5,55 @@ For test input, uses FITS XML saved in the script repository tests folder."""
 
 import csv
 import os
+import shutil
 import unittest
-from format_analysis_functions import make_fits_csv
+from format_analysis_functions import FITS_CSV_CHUNK, FITS_ROWS, csv_to_dataframe, make_fits_csv
 
 
 class MyTestCase(unittest.TestCase):
 
     def tearDown(self):
         """
-        Deletes the CSVs and encode error logs created by the different tests, if present.
+        Deletes the CSVs, encode error logs, FITS folders, and saved rows created by the different tests, if present.
         """
         filenames = ('csv_multi_id_fits.csv', 'csv_multi_id_encoding_fits.csv',
                      'csv_multi_id_encoding_encode_errors.txt', 'csv_one_file_fits.csv',
                      'csv_one_id_fits.csv', 'csv_one_id_encoding_fits.csv',
-                     'csv_one_id_encoding_encode_errors.txt')
+                     'csv_one_id_encoding_encode_errors.txt', 'csv_processes_fits.csv', 'csv_one_process_fits.csv',
+                     'csv_dataframe_fits.csv', 'csv_rows_fits.csv', 'csv_saved_rows_fits.csv')
 
         for name in filenames:
             if os.path.exists(name):
                 os.remove(name)
+        for folder in ('csv_processes_FITS', 'csv_dataframe_FITS', 'csv_saved_rows_FITS'):
+            if os.path.exists(folder):
+                shutil.rmtree(folder)
+        for folder in os.listdir('test_FITS'):
+            if os.path.exists(os.path.join('test_FITS', folder, FITS_ROWS)):
+                os.remove(os.path.join('test_FITS', folder, FITS_ROWS))
+
+    def test_dataframe(self):
+        """
+        Test for the dataframe returned by the function, for FITS XML with one and multiple format identifications.
+        Result for testing is the dataframe, converted to a list for an easier comparison,
+        which should be the same as reading the CSV created by the function with csv_to_dataframe().
+        """
+        # Makes a FITS folder with FITS XML from csv_one_id_FITS and csv_multi_id_FITS.
+        os.mkdir('csv_dataframe_FITS')
+        for folder in ('csv_one_id_FITS', 'csv_multi_id_FITS'):
+            for fits_name in os.listdir(os.path.join('test_FITS', folder)):
+                shutil.copy(os.path.join('test_FITS', folder, fits_name), 'csv_dataframe_FITS')
+
+        # Runs the function being tested and converts the dataframe into a list (including the column names).
+        # Empty values are NaN, which are replaced with an empty string since NaN is not equal to NaN.
+        df = make_fits_csv('csv_dataframe_FITS', os.getcwd(), 'csv_dataframe')
+        result = [df.columns.to_list()] + df.fillna('').values.tolist()
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        df_csv = csv_to_dataframe('csv_dataframe_fits.csv')
+        expected = [df_csv.columns.to_list()] + df_csv.fillna('').values.tolist()
+        self.assertEqual(len(result), 9, 'Problem with dataframe, row count')
+        self.assertEqual(result, expected, 'Problem with dataframe')
 
     def test_multiple_ids(self):
         """
@@ -45,24 +76,25 @@ class MyTestCase(unittest.TestCase):
         # Creates a list with the expected result.
         expected = [['FITS_File_Path', 'FITS_Format_Name', 'FITS_Format_Version', 'FITS_PUID',
                      'FITS_Identifying_Tool(s)', 'FITS_Multiple_IDs', 'FITS_Date_Last_Modified', 'FITS_Size_KB',
-                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message'],
+                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message',
+                     'FITS_Tier'],
                     ['C:\\csv_multi_id\\disk2\\backup.gz', 'GZIP Format', '',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/266', 'Droid version 6.4; Tika version 1.21',
-                     'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', ''],
+                     'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', '', 'full'],
                     ['C:\\csv_multi_id\\disk2\\backup.gz', 'ZIP Format', '', '',
                      'file utility version 5.03; Exiftool version 11.54; ffident version 0.2',
-                     'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', ''],
+                     'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', '', 'full'],
                     ['C:\\csv_multi_id\\disk1\\spreadsheet.xlsx', 'ZIP Format', '2.0',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/263',
                      'Droid version 6.4; file utility version 5.03; ffident version 0.2', 'True',
                      '2022-12-14', '20.56', 'db4c3079e3805469c1b47c4864234e66', 'Microsoft Excel',
-                     '', '', ''],
+                     '', '', '', 'full'],
                     ['C:\\csv_multi_id\\disk1\\spreadsheet.xlsx', 'XLSX', '', '', 'Exiftool version 11.54', 'True',
                      '2022-12-14', '20.56', 'db4c3079e3805469c1b47c4864234e66', 'Microsoft Excel',
-                     '', '', ''],
+                     '', '', '', 'full'],
                     ['C:\\csv_multi_id\\disk1\\spreadsheet.xlsx', 'Office Open XML Workbook', '', '',
                      'Tika version 1.21', 'True', '2022-12-14', '20.56', 'db4c3079e3805469c1b47c4864234e66',
-                     'Microsoft Excel', '', '', '']]
+                     'Microsoft Excel', '', '', '', 'full']]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with multiple ids')
@@ -89,13 +121,14 @@ class MyTestCase(unittest.TestCase):
         # Creates a list with the expected result for the CSV.
         expected_csv = [['FITS_File_Path', 'FITS_Format_Name', 'FITS_Format_Version', 'FITS_PUID',
                          'FITS_Identifying_Tool(s)', 'FITS_Multiple_IDs', 'FITS_Date_Last_Modified', 'FITS_Size_KB',
-                         'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message'],
+                         'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message',
+                         'FITS_Tier'],
                         ['C:\\csv_multi_id_encoding\\disk2\\backup.gz', 'GZIP Format', '',
                          'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/266', 'Droid version 6.4; Tika version 1.21',
-                         'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', ''],
+                         'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', '', 'full'],
                         ['C:\\csv_multi_id_encoding\\disk2\\backup.gz', 'ZIP Format', '', '',
                          'file utility version 5.03; Exiftool version 11.54; ffident version 0.2',
-                         'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', '']]
+                         'True', '2022-12-14', '1.993', '6749b0ec1fbc96faab1a1f98dd7b8a74', '', '', '', '', 'full']]
 
         # Reads the log created by the function into a list.
         with open('csv_multi_id_encoding_encode_errors.txt', 'r') as file:
@@ -130,10 +163,11 @@ class MyTestCase(unittest.TestCase):
         # Creates a list with the expected result.
         expected = [['FITS_File_Path', 'FITS_Format_Name', 'FITS_Format_Version', 'FITS_PUID',
                      'FITS_Identifying_Tool(s)', 'FITS_Multiple_IDs', 'FITS_Date_Last_Modified', 'FITS_Size_KB',
-                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message'],
+                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message',
+                     'FITS_Tier'],
                     ['C:\\csv_one_file\\disk2\\web.html', 'Extensible Markup Language', '1.0', '',
                      'Jhove version 1.20.1', 'False', '2022-12-14', '0.001', 'e080b3394eaeba6b118ed15453e49a34', '',
-                     'true', 'true', 'Not able to determine type of end of line severity=info']]
+                     'true', 'true', 'Not able to determine type of end of line severity=info', 'full']]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with one file')
@@ -159,18 +193,19 @@ class MyTestCase(unittest.TestCase):
         # Creates a list with the expected result.
         expected = [['FITS_File_Path', 'FITS_Format_Name', 'FITS_Format_Version', 'FITS_PUID',
                      'FITS_Identifying_Tool(s)', 'FITS_Multiple_IDs', 'FITS_Date_Last_Modified', 'FITS_Size_KB',
-                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message'],
+                     'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message',
+                     'FITS_Tier'],
                     ['C:\\csv_one_id\\disk1\\file.txt', 'Plain text', '',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/111',
                      'Droid version 6.4; Jhove version 1.20.1; file utility version 5.03', 'False',
-                     '2022-12-14', '2.0', '7b71af3fdf4a2f72a378e3e77815e497', '', 'true', 'true', ''],
+                     '2022-12-14', '2.0', '7b71af3fdf4a2f72a378e3e77815e497', '', 'true', 'true', '', 'full'],
                     ['C:\\csv_one_id\\disk1\\spreadsheet1.csv', 'Comma-Separated Values (CSV)', '',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18', 'Droid version 6.4', 'False',
-                     '2022-12-14', '6002.01', 'f95a4c954014342e4bf03f51fcefaecd', '', '', '', ''],
+                     '2022-12-14', '6002.01', 'f95a4c954014342e4bf03f51fcefaecd', '', '', '', '', 'full'],
                     ['C:\\csv_one_id\\disk1\\spreadsheet2.csv', 'Comma-Separated Values (CSV)', '',
                      'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18',
                      'Droid version 6.4', 'False', '2022-12-14', '4.404', 'd5e857a4bd33d2b5a2f96b78ccffe1f3',
-                     '', '', '', '']]
+                     '', '', '', '', 'full']]
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with one id')
@@ -197,10 +232,11 @@ class MyTestCase(unittest.TestCase):
         # Creates a list with the expected result for the CSV.
         expected_csv = [['FITS_File_Path', 'FITS_Format_Name', 'FITS_Format_Version', 'FITS_PUID',
                          'FITS_Identifying_Tool(s)', 'FITS_Multiple_IDs', 'FITS_Date_Last_Modified', 'FITS_Size_KB',
-                         'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message'],
+                         'FITS_MD5', 'FITS_Creating_Application', 'FITS_Valid', 'FITS_Well-Formed', 'FITS_Status_Message',
+                         'FITS_Tier'],
                         ['C:\\csv_one_id_encoding\\disk1\\spreadsheet1.csv', 'Comma-Separated Values (CSV)', '',
                          'https://www.nationalarchives.gov.uk/PRONOM/x-fmt/18', 'Droid version 6.4', 'False',
-                         '2022-12-14', '6002.01', 'f95a4c954014342e4bf03f51fcefaecd', '', '', '', '']]
+                         '2022-12-14', '6002.01', 'f95a4c954014342e4bf03f51fcefaecd', '', '', '', '', 'full']]
 
         # Reads the log created by the function into a list.
         with open('csv_one_id_encoding_encode_errors.txt', 'r') as file:
@@ -215,5 +251,92 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(result_log, expected_log, 'Problem with one id, encoding errors - log')
 
 
+    def test_rows(self):
+        """
+        Test for FITS XML that was already read, where the rows are given to the function.
+        The given rows have a different file path than the FITS XML, so the result shows if the XML was read.
+        Result for testing is the file paths in the CSV created by the function.
+        """
+        # Creates variables for the test input (in the repo) and runs the function being tested.
+        fits_output = os.path.join('test_FITS', 'csv_one_id_FITS')
+        rows = {'file.txt.fits.xml': [['C:\\already_read\\file.txt', 'Plain text', '', '', 'Tika version 1.21',
+                                       False, '2022-12-14', 0.001, '', '', '', '', '', 'full']]}
+        make_fits_csv(fits_output, os.getcwd(), 'csv_rows', rows=rows)
+
+        # Reads the file paths in the CSV created by the function into a list.
+        with open('csv_rows_fits.csv', 'r') as file:
+            result = [row[0] for row in list(csv.reader(file))[1:]]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = ['C:\\already_read\\file.txt', 'C:\\csv_one_id\\disk1\\spreadsheet1.csv',
+                    'C:\\csv_one_id\\disk1\\spreadsheet2.csv']
+        self.assertEqual(result, expected, 'Problem with rows')
+
+    def test_saved_rows(self):
+        """
+        Test for making the CSV again, when the rows saved the first time are used for FITS XML that has not changed.
+        The file path in the FITS XML for file.txt is edited without changing its size or date modified,
+        so the result shows if the XML was read or the saved rows were used,
+        and the FITS XML for spreadsheet1.csv is changed, so it is read again.
+        Result for testing is the file paths in the CSV created by the function.
+        """
+        # Makes a FITS folder with the FITS XML from csv_one_id_FITS and makes the CSV, which saves the rows.
+        shutil.copytree(os.path.join('test_FITS', 'csv_one_id_FITS'), 'csv_saved_rows_FITS')
+        make_fits_csv('csv_saved_rows_FITS', os.getcwd(), 'csv_saved_rows')
+
+        # Edits the FITS XML for file.txt without changing the size or date modified, and changes spreadsheet1.csv.
+        file_xml = os.path.join('csv_saved_rows_FITS', 'file.txt.fits.xml')
+        xml_stat = os.stat(file_xml)
+        with open(file_xml, 'r') as fits_xml:
+            text = fits_xml.read()
+        with open(file_xml, 'w') as fits_xml:
+            fits_xml.write(text.replace('disk1', 'diskX'))
+        os.utime(file_xml, ns=(xml_stat.st_atime_ns, xml_stat.st_mtime_ns))
+        with open(os.path.join('csv_saved_rows_FITS', 'spreadsheet1.csv.fits.xml'), 'a') as fits_xml:
+            fits_xml.write('\n')
+
+        # Runs the function being tested.
+        make_fits_csv('csv_saved_rows_FITS', os.getcwd(), 'csv_saved_rows')
+
+        # Reads the file paths in the CSV created by the function into a list.
+        with open('csv_saved_rows_fits.csv', 'r') as file:
+            result = [row[0] for row in list(csv.reader(file))[1:]]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = ['C:\\csv_one_id\\disk1\\file.txt', 'C:\\csv_one_id\\disk1\\spreadsheet1.csv',
+                    'C:\\csv_one_id\\disk1\\spreadsheet2.csv']
+        self.assertEqual(result, expected, 'Problem with saved rows')
+
+    def test_processes(self):
+        """
+        Test for an accession with more FITS XML than one chunk, which is read by more than one process.
+        The FITS XML is copies of the FITS XML from csv_one_id_FITS, with names that are not in order when listed.
+        Result for testing is the contents of the CSV created by the function, which should be in the order of the
+        FITS XML names and the same as the CSV made by one process.
+        """
+        # Makes the FITS folder with more FITS XML than one chunk.
+        os.mkdir('csv_processes_FITS')
+        fits_names = sorted(os.listdir(os.path.join('test_FITS', 'csv_one_id_FITS')))
+        for number in range(FITS_CSV_CHUNK + 1):
+            fits_name = fits_names[number % len(fits_names)]
+            shutil.copy(os.path.join('test_FITS', 'csv_one_id_FITS', fits_name),
+                        os.path.join('csv_processes_FITS', f'{number * 7 % 1000:03}_{fits_name}'))
+
+        # Runs the function being tested, with more than one process and then with one process to compare.
+        make_fits_csv('csv_processes_FITS', os.getcwd(), 'csv_processes', 2)
+        make_fits_csv('csv_processes_FITS', os.getcwd(), 'csv_one_process', 1)
+
+        # Reads the CSVs created by the function into lists.
+        with open('csv_processes_fits.csv', 'r') as file:
+            result = list(csv.reader(file))
+        with open('csv_one_process_fits.csv', 'r') as file:
+            expected = list(csv.reader(file))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(len(result), FITS_CSV_CHUNK + 2, 'Problem with processes, row count')
+        self.assertEqual(result, expected, 'Problem with processes')
+        self.assertEqual(result[1][0], 'C:\\csv_one_id\\disk1\\file.txt', 'Problem with processes, order')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,9 +3,8 @@ iteration, including error handling for when FITS is in a different directory le
 
 import os
 import shutil
-import subprocess
 import unittest
-import configuration as c
+from format_analysis_functions import accession_file_list, FitsCommand, make_fits_xml
 
 
 class MyTestCase(unittest.TestCase):
@@ -42,8 +41,7 @@ class MyTestCase(unittest.TestCase):
             pass
         else:
             os.mkdir(fits_output)
-            fits_status = subprocess.run(f'"{c.FITS}" -r -i "{accession_folder}" -o "{fits_output}"',
-                                         shell=True, stderr=subprocess.PIPE)
+            make_fits_xml(accession_file_list(accession_folder), fits_output, 1)
 
         # Creates a list with the files that are in the accession_FITS folder after running the test.
         result = []
@@ -56,10 +54,34 @@ class MyTestCase(unittest.TestCase):
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
         self.assertEqual(result, expected, 'Problem with make fits')
 
+    def test_make_fits_workers(self):
+        """
+        Test for correctly making new FITS files with more than one FITS process at once.
+        Result for testing is the contents of the FITS folder and the list of errors returned by the function.
+        """
+        # Creates variables for the accession folder (test input) and FITS folder.
+        accession_folder = os.path.join(os.getcwd(), 'accession')
+        fits_output = os.path.join(os.getcwd(), 'accession_FITS')
+        os.mkdir(fits_output)
+
+        # Runs the function being tested.
+        errors = make_fits_xml(accession_file_list(accession_folder), fits_output, 2)
+
+        # Creates a list with the files that are in the accession_FITS folder after running the test.
+        result = sorted(os.listdir('accession_FITS'))
+
+        # Creates a list with the expected result.
+        expected = ['file.txt-1.fits.xml', 'file.txt.fits.xml', 'other.txt.fits.xml']
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, expected, 'Problem with make fits workers')
+        self.assertEqual(errors, [], 'Problem with make fits workers, errors')
+        self.assertFalse(os.path.exists('accession_FITS_staging'), 'Problem with make fits workers, staging')
+
     def test_fits_class_error(self):
         """
         Test for error handling when FITS is in a different directory letter than the accession folder.
-        Result for testing is the error message.
+        Result for testing is that the script exits after printing the error message.
         """
         # Creates variables for accession folder and FITS path (test input).
         # In format_analysis.py, the FITS path is taken from the configuration.py file.
@@ -69,23 +91,15 @@ class MyTestCase(unittest.TestCase):
 
         # Runs the code being tested.
         # Expect the "else" branch to run. The "if" branch calls update_fits() in the main script.
-        # Does not include printing messages to the terminal or existing after an error that are in the main script.
+        # The function prints the error message and exits the script when FITS has this error.
         fits_output = os.path.join(os.getcwd(), 'accession_FITS')
         if os.path.exists(fits_output):
             pass
         else:
             os.mkdir(fits_output)
-            fits_status = subprocess.run(f'"{fits_diff_path}" -r -i "{accession_folder}" -o "{fits_output}"',
-                                         shell=True, stderr=subprocess.PIPE)
-
-        # Creates a string with the resulting error message generated by the script.
-        result = fits_status.stderr.decode('utf-8')
-
-        # Creates a string with the expectd result.
-        expected = 'Error: Could not find or load main class edu.harvard.hul.ois.fits.Fits\r\n'
-
-        # Compares the results. assertEqual prints “OK” or the differences between the two strings.
-        self.assertEqual(result, expected, 'Problem with fits class error')
+            with self.assertRaises(SystemExit):
+                make_fits_xml(accession_file_list(accession_folder), fits_output, 1,
+                              backend=FitsCommand(f'"{fits_diff_path}"'))
 
 
 if __name__ == '__main__':
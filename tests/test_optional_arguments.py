@@ -0,0 +1,303 @@
+"""Tests the function optional_arguments, which gets and checks the optional script arguments
+that come after the accession folder.
+
+Note: the function will print messages about the errors if it works correctly."""
+
+import os
+import sys
+import unittest
+import configuration as c
+from format_analysis_functions import optional_arguments
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Saves the daemon, service, and triage configuration from the configuration file, since some tests change them.
+        """
+        self.daemon = getattr(c, 'FITS_DAEMON', '')
+        self.service = getattr(c, 'FITS_SERVICE', '')
+        self.triage_config = getattr(c, 'FITS_TRIAGE_CONFIG', '')
+
+    def tearDown(self):
+        """
+        Restores the daemon, service, and triage configuration.
+        """
+        c.FITS_DAEMON = self.daemon
+        c.FITS_SERVICE = self.service
+        c.FITS_TRIAGE_CONFIG = self.triage_config
+
+    def test_none(self):
+        """
+        Test for not including any optional arguments, so the values from the configuration file are used.
+        Result for testing is the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd()]
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two dictionaries.
+        expected = {'workers': getattr(c, 'FITS_WORKERS', 1), 'batch_size': getattr(c, 'FITS_BATCH_SIZE', 500),
+                    'backend': getattr(c, 'FITS_BACKEND', 'command'), 'timeout': getattr(c, 'FITS_TIMEOUT', None),
+                    'mode': getattr(c, 'FITS_MODE', 'full')}
+        self.assertEqual(result, expected, 'Problem with no optional arguments')
+
+    def test_workers(self):
+        """
+        Test for including the number of FITS workers.
+        Result for testing is the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--workers', '4']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result['workers'], 4, 'Problem with workers')
+
+    def test_workers_batch_size(self):
+        """
+        Test for including the number of FITS workers and the batch size.
+        Result for testing is the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--batch-size', '50', '--workers', '2']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual([result['workers'], result['batch_size']], [2, 50], 'Problem with workers and batch size')
+
+    def test_backend(self):
+        """
+        Test for including the identification backend.
+        Result for testing is the backend in the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'command']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two strings.
+        self.assertEqual(result['backend'], 'command', 'Problem with backend')
+
+    def test_daemon(self):
+        """
+        Test for the daemon backend with a FITS_DAEMON command for a program that exists (Python, with the stand-in).
+        Result for testing is the backend in the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the daemon in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'daemon']
+        c.FITS_DAEMON = f'"{sys.executable}" {os.path.join("..", "fits_standin.py")} --daemon'
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two strings.
+        self.assertEqual(result['backend'], 'daemon', 'Problem with daemon')
+
+    def test_service(self):
+        """
+        Test for the service backend with the address of a FITS web service.
+        Result for testing is the backend in the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the service in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'service']
+        c.FITS_SERVICE = 'http://localhost:8080/fits'
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two strings.
+        self.assertEqual(result['backend'], 'service', 'Problem with service')
+
+    def test_timeout(self):
+        """
+        Test for including the FITS timeout.
+        Result for testing is the timeout in the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--timeout', '60']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two numbers.
+        self.assertEqual(result['timeout'], 60, 'Problem with timeout')
+
+    def test_preview(self):
+        """
+        Test for including the preview mode, which does not need anything in the configuration file.
+        Result for testing is the mode in the dictionary returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--mode', 'preview']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two strings.
+        self.assertEqual(result['mode'], 'preview', 'Problem with preview')
+
+    def test_error_mode(self):
+        """
+        Test for including a mode that the script does not have.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--mode', 'quick']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error mode')
+
+    def test_error_backend(self):
+        """
+        Test for including an identification backend that the script does not have.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'java']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - backend')
+
+    def test_error_daemon_blank(self):
+        """
+        Test for the daemon backend when FITS_DAEMON is blank, which is the default in the configuration template.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the daemon in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'daemon']
+        c.FITS_DAEMON = ''
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - daemon blank')
+
+    def test_error_daemon_path(self):
+        """
+        Test for the daemon backend when the program in FITS_DAEMON does not exist.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the daemon in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'daemon']
+        c.FITS_DAEMON = f'"{os.path.join("missing folder", "fits-daemon.sh")}" --port 2113'
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - daemon path')
+
+    def test_error_service_blank(self):
+        """
+        Test for the service backend when FITS_SERVICE is blank, which is the default in the configuration template.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the service in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--backend', 'service']
+        c.FITS_SERVICE = ''
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - service blank')
+
+    def test_error_triage_blank(self):
+        """
+        Test for triage mode when FITS_TRIAGE_CONFIG is blank, which is the default in the configuration template.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script,
+        # and the triage configuration in the configuration file.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--mode', 'triage']
+        c.FITS_TRIAGE_CONFIG = ''
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - triage blank')
+
+    def test_error_workers_missing(self):
+        """
+        Test for including the workers option without a number.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--workers']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - workers missing')
+
+    def test_error_workers_zero(self):
+        """
+        Test for including the workers option with a number that is too small.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--workers', '0']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - workers zero')
+
+    def test_error_unknown(self):
+        """
+        Test for including an optional argument that the script does not have.
+        Result for testing is the value (False) returned by the function.
+        """
+        # Creates a list of arguments to simulate the contents of sys.argv when running the script.
+        arguments = [os.path.join('..', 'format_analysis.py'), os.getcwd(), '--unknown']
+
+        # Runs the function being tested.
+        result = optional_arguments(arguments)
+
+        # Compares the results to what was expected.
+        # assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, False, 'Problem with error - unknown argument')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Tests the function preview_risk, which matches NARA risk to every file in the accession folder by file extension,
+without FITS, for the preliminary report made with --mode preview."""
+
+import os
+import shutil
+import unittest
+import pandas as pd
+from format_analysis_functions import preview_risk
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with files that match NARA by one extension, one of several extensions,
+        and no extension, and the NARA dataframe.
+        """
+        os.mkdir('accession')
+        for file_name in ('document.PDF', 'notes.text', 'README'):
+            with open(os.path.join('accession', file_name), 'w') as file:
+                file.write('Text')
+        self.df_nara = pd.DataFrame([['Portable Document Format 1.4', 'pdf',
+                                      'https://www.nationalarchives.gov.uk/PRONOM/fmt/18', 'Low Risk', 'Retain'],
+                                     ['Plain Text', 'txt|text', None, 'Low Risk', 'Retain']],
+                                    columns=['NARA_Format_Name', 'NARA_File_Extensions', 'NARA_PRONOM_URL',
+                                             'NARA_Risk_Level', 'NARA_Proposed_Preservation_Plan'])
+
+    def tearDown(self):
+        """
+        Deletes the accession folder.
+        """
+        shutil.rmtree('accession')
+
+    def test_preview(self):
+        """
+        Test for matching NARA by file extension.
+        Result for testing is the file name, extension, size, NARA format name, risk, and match type for each file.
+        """
+        # Runs the function being tested.
+        df_results = preview_risk('accession', self.df_nara)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = []
+        for row in df_results.sort_values('FITS_File_Path').itertuples():
+            result.append([os.path.basename(row.FITS_File_Path), row.File_Extension, row.FITS_Size_KB,
+                           row.NARA_Format_Name, row.NARA_Risk_Level, row.NARA_Match_Type])
+        expected = [['README', '', 0.004, 'No Match', 'No Match', 'No NARA Match'],
+                    ['document.PDF', '.pdf', 0.004, 'Portable Document Format 1.4', 'Low Risk', 'File Extension'],
+                    ['notes.text', '.text', 0.004, 'Plain Text', 'Low Risk', 'File Extension']]
+        self.assertEqual(result, expected, 'Problem with preview')
+
+    def test_nara_unchanged(self):
+        """
+        Test that the NARA dataframe is not changed, since it is also used for the full analysis.
+        Result for testing is the columns of the NARA dataframe after the function runs.
+        """
+        # Runs the function being tested.
+        preview_risk('accession', self.df_nara)
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = ['NARA_Format_Name', 'NARA_File_Extensions', 'NARA_PRONOM_URL', 'NARA_Risk_Level',
+                    'NARA_Proposed_Preservation_Plan']
+        self.assertEqual(self.df_nara.columns.to_list(), expected, 'Problem with NARA unchanged')
+
+
+if __name__ == '__main__':
+    unittest.main()
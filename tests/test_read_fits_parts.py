@@ -0,0 +1,92 @@
+"""Tests the function read_fits_parts, which fits_row uses to read only the parts of the FITS XML it needs,
+with lxml if it is installed or ElementTree if it is not.
+The result of fits_row with it must be the same as from the whole FITS XML, for every FITS XML in test_FITS."""
+
+import os
+import unittest
+import xml.etree.ElementTree as ET
+import format_analysis_functions
+from format_analysis_functions import fits_row, fits_xml_rows, read_fits_parts
+
+
+def rows_or_error(function, fits_file):
+    """Returns the rows from the function for the FITS XML file, or the name of the error if there is one,
+    since some FITS XML in test_FITS is only for testing get_text and cannot be made into rows."""
+    try:
+        return function(fits_file)
+    except Exception as error:
+        return type(error).__name__
+
+
+def whole_fits_xml_rows(fits_file):
+    """Returns the rows from the whole FITS XML file, without read_fits_parts, to compare to."""
+    return fits_xml_rows(ET.parse(fits_file).getroot())
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes a list of every FITS XML file in the test_FITS folder.
+        Saves the lxml module (None if it is not installed), since a test changes it.
+        """
+        self.fits_files = []
+        for root, directories, files in os.walk('test_FITS'):
+            self.fits_files.extend(os.path.join(root, file) for file in files if file.endswith('.fits.xml'))
+        self.fits_files.sort()
+        self.lxml_etree = format_analysis_functions.lxml_etree
+
+    def tearDown(self):
+        """
+        Restores the lxml module.
+        """
+        format_analysis_functions.lxml_etree = self.lxml_etree
+
+    def test_same_rows(self):
+        """
+        Test for the rows from fits_row for every FITS XML in test_FITS.
+        Result for testing is the rows, which should be the same as the rows from the whole FITS XML.
+        """
+        # Runs the function being tested.
+        result = [rows_or_error(fits_row, fits_file) for fits_file in self.fits_files]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [rows_or_error(whole_fits_xml_rows, fits_file) for fits_file in self.fits_files]
+        self.assertEqual(len(result), 27, 'Problem with same rows, file count')
+        self.assertEqual(result, expected, 'Problem with same rows')
+
+    def test_same_rows_elementtree(self):
+        """
+        Test for the rows from fits_row for every FITS XML in test_FITS, using ElementTree even if lxml is installed.
+        Result for testing is the rows, which should be the same as the rows from the whole FITS XML.
+        """
+        # Runs the function being tested.
+        format_analysis_functions.lxml_etree = None
+        result = [rows_or_error(fits_row, fits_file) for fits_file in self.fits_files]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        expected = [rows_or_error(whole_fits_xml_rows, fits_file) for fits_file in self.fits_files]
+        self.assertEqual(result, expected, 'Problem with same rows, ElementTree')
+
+    def test_stops_reading(self):
+        """
+        Test for FITS XML with an error after the parts that are used, which is not read.
+        Result for testing is the tags of the children of the root that is returned.
+        """
+        # Makes FITS XML with the parts that are used followed by a part that is not complete.
+        ns = 'http://hul.harvard.edu/ois/xml/ns/fits/fits_output'
+        with open('stops_reading.fits.xml', 'w') as fits_xml:
+            fits_xml.write(f'<fits xmlns="{ns}"><identification/><fileinfo/><filestatus/><metadata><text>')
+
+        # Runs the function being tested.
+        root = read_fits_parts('stops_reading.fits.xml')
+        os.remove('stops_reading.fits.xml')
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = [child.tag for child in root]
+        expected = [f'{{{ns}}}identification', f'{{{ns}}}fileinfo', f'{{{ns}}}filestatus']
+        self.assertEqual(result, expected, 'Problem with stops reading')
+
+
+if __name__ == '__main__':
+    unittest.main()
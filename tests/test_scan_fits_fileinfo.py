@@ -0,0 +1,113 @@
+"""Tests the function scan_fits_fileinfo, which finds the text of elements in fileinfo by searching the bytes
+at the start of a FITS XML file, and returns None if the FITS XML needs to be read instead.
+In the main script, it is called by fits_index_entry() when update_fits() makes the FITS index.
+
+For input, tests use FITS XML that is in the tests folder of this script repo, which some tests edit.
+The result for testing is the dictionary returned by the function.
+"""
+
+import gzip
+import io
+import os
+import unittest
+from format_analysis_functions import scan_fits_fileinfo
+
+
+def fits_xml(path_text):
+    """Returns the bytes of FITS XML from the tests folder, with path_text instead of the path in filepath."""
+    with open(os.path.join('test_FITS', 'csv_one_id_FITS', 'file.txt.fits.xml'), 'rb') as xml_file:
+        return xml_file.read().replace(b'C:\\csv_one_id\\disk1\\file.txt', path_text)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        """
+        Deletes the compressed FITS XML made by the test, if present.
+        """
+        if os.path.exists('file.txt.fits.xml.gz'):
+            os.remove('file.txt.fits.xml.gz')
+
+    def test_fileinfo(self):
+        """
+        Test for FITS XML saved by FITS, with elements that are present and one that is missing.
+        """
+        # Runs the function being tested and saves the result to a variable.
+        result = scan_fits_fileinfo(os.path.join('test_FITS', 'csv_one_id_FITS', 'file.txt.fits.xml'),
+                                    ('filepath', 'size', 'md5checksum', 'creatingApplicationName'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        expected = {'filepath': 'C:\\csv_one_id\\disk1\\file.txt', 'size': '2000',
+                    'md5checksum': '7b71af3fdf4a2f72a378e3e77815e497', 'creatingApplicationName': None}
+        self.assertEqual(result, expected, 'Problem with fileinfo')
+
+    def test_entities(self):
+        """
+        Test for text with the entities defined by XML and character references, which are replaced.
+        """
+        # Runs the function being tested and saves the result to a variable.
+        xml_bytes = fits_xml(b'C:\\A &amp; B &lt;1&gt;\\caf&#233; &#x3c0;.txt')
+        result = scan_fits_fileinfo(io.BytesIO(xml_bytes), ('filepath',))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, {'filepath': 'C:\\A & B <1>\\caf\u00e9 \u03c0.txt'}, 'Problem with entities')
+
+    def test_attribute(self):
+        """
+        Test for attributes with ">" in the value, which is allowed in XML and is not the end of the tag.
+        """
+        # Runs the function being tested and saves the result to a variable.
+        xml_bytes = fits_xml(b'C:\\file.txt').replace(b'<fileinfo>', b'<fileinfo note=\'a > b\'>')
+        xml_bytes = xml_bytes.replace(b'<filepath toolname=', b'<filepath note="a > b" toolname=')
+        result = scan_fits_fileinfo(io.BytesIO(xml_bytes), ('filepath',))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, {'filepath': 'C:\\file.txt'}, 'Problem with attribute')
+
+    def test_namespace(self):
+        """
+        Test for FITS XML with a namespace prefix or a default namespace other than FITS before the end of fileinfo,
+        which must be read instead, since the elements may not be the FITS elements.
+        """
+        # Runs the function being tested for each FITS XML and saves the results to a list.
+        xml_bytes = fits_xml(b'C:\\file.txt')
+        xml_list = [xml_bytes.replace(b'<fileinfo>', b'<fileinfo xmlns="http://example.com/other">'),
+                    xml_bytes.replace(b'<filepath ', b'<filepath xmlns="" '),
+                    xml_bytes.replace(b'<fits xmlns=', b'<fits:fits xmlns:fits=').replace(b'</fits>', b'</fits:fits>'),
+                    xml_bytes.replace(b'<filepath ', b'<f:filepath xmlns:f="http://example.com/other" ')
+                    .replace(b'</filepath>', b'</f:filepath>')]
+        result = [scan_fits_fileinfo(io.BytesIO(xml_bytes), ('filepath',)) for xml_bytes in xml_list]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, [None, None, None, None], 'Problem with namespace')
+
+    def test_compressed(self):
+        """
+        Test for FITS XML that is compressed with gzip (FITS_COMPRESS in the configuration file).
+        """
+        # Makes the compressed FITS XML.
+        with gzip.open('file.txt.fits.xml.gz', 'wb') as gzip_xml:
+            gzip_xml.write(fits_xml(b'C:\\compressed\\file.txt'))
+
+        # Runs the function being tested and saves the result to a variable.
+        result = scan_fits_fileinfo('file.txt.fits.xml.gz', ('filepath',))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two dictionaries.
+        self.assertEqual(result, {'filepath': 'C:\\compressed\\file.txt'}, 'Problem with compressed')
+
+    def test_read_xml(self):
+        """
+        Test for FITS XML that is not in the form FITS saves it in, which must be read instead:
+        CDATA, a comment, an entity that XML does not define, and fileinfo that is not complete.
+        """
+        # Runs the function being tested for each FITS XML and saves the results to a list.
+        xml_list = [fits_xml(b'<![CDATA[C:\\file.txt]]>'), fits_xml(b'C:\\<!-- comment -->file.txt'),
+                    fits_xml(b'C:\\&copy;.txt'), fits_xml(b'C:\\file.txt')[:800]]
+        result = [scan_fits_fileinfo(io.BytesIO(xml_bytes), ('filepath',)) for xml_bytes in xml_list]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, [None, None, None, None], 'Problem with read xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
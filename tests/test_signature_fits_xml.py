@@ -0,0 +1,98 @@
+"""Tests the function signature_fits_xml, which makes FITS XML without FITS for files that are empty
+or have a file signature that is certain of the format."""
+
+import os
+import shutil
+import unittest
+import configuration as c
+from format_analysis_functions import FitsCommand, fits_row, make_fits_xml, signature_fits_xml
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Makes an accession folder with an empty file, a GIF, a GIF with the wrong extension, and a PDF.
+        Saves the signatures from the configuration file, since a test changes them.
+        """
+        self.signatures = getattr(c, 'FITS_SIGNATURES', [])
+        os.mkdir('accession')
+        contents = {'empty.txt': b'', 'image.gif': b'GIF89a\x01\x00\x01\x00', 'image.txt': b'GIF89a\x01\x00\x01\x00',
+                    'document.pdf': b'%PDF-1.4\n%%EOF\n'}
+        for file_name, content in contents.items():
+            with open(os.path.join('accession', file_name), 'wb') as file:
+                file.write(content)
+        os.mkdir('accession_FITS')
+
+    def tearDown(self):
+        """
+        Deletes the accession folder and the FITS folder, and restores the signatures.
+        """
+        c.FITS_SIGNATURES = self.signatures
+        shutil.rmtree('accession')
+        shutil.rmtree('accession_FITS')
+
+    def test_empty(self):
+        """
+        Test for an empty file, which is identified without FITS when "empty" is one of the signatures.
+        Result for testing is the row for the FITS CSV made from the FITS XML, without the date last modified.
+        """
+        # Runs the function being tested and saves the XML so fits_row() can read it.
+        tree = signature_fits_xml(os.path.join('accession', 'empty.txt'), ['empty'])
+        tree.write(os.path.join('accession_FITS', 'empty.txt.fits.xml'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        result = list(fits_row(os.path.join('accession_FITS', 'empty.txt.fits.xml'))[0])
+        result.pop(6)
+        expected = [os.path.join('accession', 'empty.txt'), 'empty', None, None, 'format_analysis.py version zero-byte',
+                    False, 0.0, 'd41d8cd98f00b204e9800998ecf8427e', None, None, None, None, 'signature']
+        self.assertEqual(result, expected, 'Problem with empty')
+
+    def test_signature(self):
+        """
+        Test for a file with a signature that is used.
+        Result for testing is the format name, version, PUID, and tier from the FITS XML.
+        """
+        # Runs the function being tested and saves the XML so fits_row() can read it.
+        tree = signature_fits_xml(os.path.join('accession', 'image.gif'), ['empty', 'gif'])
+        tree.write(os.path.join('accession_FITS', 'image.gif.fits.xml'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        row = fits_row(os.path.join('accession_FITS', 'image.gif.fits.xml'))[0]
+        result = [row[1], row[2], row[3], row[13]]
+        expected = ['Graphics Interchange Format', '89a', 'https://www.nationalarchives.gov.uk/PRONOM/fmt/4',
+                    'signature']
+        self.assertEqual(result, expected, 'Problem with signature')
+
+    def test_not_used(self):
+        """
+        Test for files that need FITS: a signature with the wrong extension, a PDF, which has no signature
+        that is certain of the format, and an empty file when "empty" is not one of the signatures.
+        Result for testing is the value returned by the function for each file.
+        """
+        # Runs the function being tested.
+        result = [signature_fits_xml(os.path.join('accession', 'image.txt'), ['gif']),
+                  signature_fits_xml(os.path.join('accession', 'document.pdf'), ['empty', 'gif']),
+                  signature_fits_xml(os.path.join('accession', 'empty.txt'), ['gif'])]
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(result, [None, None, None], 'Problem with not used')
+
+    def test_make_fits_xml(self):
+        """
+        Test for making FITS XML for only an empty file, which should not run FITS.
+        The backend is a command that does not exist, so there would be an error if FITS was run.
+        Result for testing is the contents of the FITS folder and the errors returned by make_fits_xml().
+        """
+        # Runs the function being tested.
+        c.FITS_SIGNATURES = ['empty']
+        errors = make_fits_xml([os.path.join(os.getcwd(), 'accession', 'empty.txt')], 'accession_FITS', 1, 500,
+                               FitsCommand('"no_fits_here"'))
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(os.listdir('accession_FITS'), ['empty.txt.fits.xml'], 'Problem with make fits xml')
+        self.assertEqual(errors, [], 'Problem with make fits xml, errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ import os
 import shutil
 import subprocess
 import unittest
+import xml.etree.ElementTree as ET
 import configuration as c
 from format_analysis_functions import update_fits
 
@@ -52,10 +53,10 @@ class MyTestCase(unittest.TestCase):
         
         # Creates a list of the expected result.
         expected = ['additional.txt.fits.xml', 'double.txt-1.fits.xml', 'double.txt.fits.xml',
-                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml', 'file.txt.fits.xml']
+                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml', 'file.txt.fits.xml', 'fits_index.csv']
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
-        self.assertEqual(result, expected, 'Problem with no change')
+        self.assertEqual(sorted(result), expected, 'Problem with no change')
 
     def test_delete_unique(self):
         """
@@ -75,10 +76,10 @@ class MyTestCase(unittest.TestCase):
 
         # Creates a list of the expected result.
         expected = ['double.txt-1.fits.xml', 'double.txt.fits.xml',
-                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml']
+                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml', 'fits_index.csv']
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
-        self.assertEqual(result, expected, 'Problem with delete unique filenames')
+        self.assertEqual(sorted(result), expected, 'Problem with delete unique filenames')
 
     def test_delete_duplicate(self):
         """
@@ -97,10 +98,11 @@ class MyTestCase(unittest.TestCase):
             result.extend(files)
 
         # Creates a list of the expected result.
-        expected = ['additional.txt.fits.xml', 'double.txt.fits.xml', 'duplicate.txt-1.fits.xml', 'file.txt.fits.xml']
+        expected = ['additional.txt.fits.xml', 'double.txt.fits.xml', 'duplicate.txt-1.fits.xml', 'file.txt.fits.xml',
+                    'fits_index.csv']
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
-        self.assertEqual(result, expected, 'Problem with delete duplicate filenames')
+        self.assertEqual(sorted(result), expected, 'Problem with delete duplicate filenames')
 
     def test_add_unique(self):
         """
@@ -124,15 +126,15 @@ class MyTestCase(unittest.TestCase):
         expected = ['additional.txt.fits.xml', 'another_new_file.txt.fits.xml',
                     'double.txt-1.fits.xml', 'double.txt.fits.xml',
                     'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml',
-                    'file.txt.fits.xml', 'new_file.txt.fits.xml']
+                    'file.txt.fits.xml', 'fits_index.csv', 'new_file.txt.fits.xml']
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
-        self.assertEqual(result, expected, 'Problem with adding unique filenames')
+        self.assertEqual(sorted(result), expected, 'Problem with adding unique filenames')
 
     def test_add_duplicate(self):
         """
         Test for running the function after adding new files with name already in the accession folder.
-        Currently, this makes no change to FITS. Future development will change that.
+        The new FITS XML is numbered, the same as FITS does for files with the same name, so no XML is replaced.
         Result for testing is the contents of the accession_FITS folder.
         """
         # Adds two files to the accession folder and runs the function being tested.
@@ -149,11 +151,56 @@ class MyTestCase(unittest.TestCase):
             result.extend(files)
 
         # Creates a list of the expected result.
-        expected = ['additional.txt.fits.xml', 'double.txt-1.fits.xml', 'double.txt.fits.xml',
-                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml', 'file.txt.fits.xml']
+        expected = ['additional.txt-1.fits.xml', 'additional.txt.fits.xml', 'double.txt-1.fits.xml',
+                    'double.txt.fits.xml', 'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml',
+                    'file.txt-1.fits.xml', 'file.txt.fits.xml', 'fits_index.csv']
 
         # Compares the results. assertEqual prints "OK" or the differences between the two lists.
-        self.assertEqual(result, expected, 'Problem with adding duplicate filenames')
+        self.assertEqual(sorted(result), expected, 'Problem with adding duplicate filenames')
+
+    def test_add_batch(self):
+        """
+        Test for running the function after adding more new files than fit in one batch.
+        Result for testing is the contents of the accession_FITS folder.
+        """
+        # Adds three files to the accession folder and runs the function being tested with a batch size of two,
+        # so the new files are identified by two FITS processes.
+        for name in ('batch_one.txt', 'batch_two.txt', 'batch_three.txt'):
+            with open(os.path.join('accession', 'dir', name), 'w') as file:
+                file.write('New Text')
+        update_fits(self.accession_path, self.fits_path, os.getcwd(), 'accession', batch_size=2)
+
+        # Creates a list of the resulting files in the accession_FITS folder.
+        result = []
+        for root, dirs, files in os.walk("accession_FITS"):
+            result.extend(files)
+
+        # Creates a list of the expected result.
+        expected = ['additional.txt.fits.xml', 'batch_one.txt.fits.xml', 'batch_three.txt.fits.xml',
+                    'batch_two.txt.fits.xml', 'double.txt-1.fits.xml', 'double.txt.fits.xml',
+                    'duplicate.txt-1.fits.xml', 'duplicate.txt.fits.xml', 'file.txt.fits.xml', 'fits_index.csv']
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two lists.
+        self.assertEqual(sorted(result), expected, 'Problem with adding files in batches')
+
+    def test_edit(self):
+        """
+        Test for running the function after editing a file, which should get new FITS XML.
+        Result for testing is the size in the FITS XML for the edited file.
+        """
+        # Edits a file in the accession folder and runs the function being tested.
+        with open(os.path.join('accession', 'file.txt'), 'w') as file:
+            file.write('Edited Text')
+        update_fits(self.accession_path, self.fits_path, os.getcwd(), 'accession')
+
+        # Gets the size from the FITS XML for the edited file.
+        ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+        tree = ET.parse(os.path.join('accession_FITS', 'file.txt.fits.xml'))
+        result = tree.getroot().find('fits:fileinfo/fits:size', ns).text
+
+        # Compares the results. assertEqual prints "OK" or the differences between the two values.
+        self.assertEqual(result, '11', 'Problem with edited file')
+
 
 
 if __name__ == '__main__':
@@ -168,7 +168,9 @@ class MyTestCase(unittest.TestCase):
         iteration_one = subprocess.run(f'python {script_path} {accession_path}', shell=True, stdout=subprocess.PIPE)
 
         # Tests if the expected messages were produced.
-        msg = '\r\nGenerating new FITS format identification information.\r\n\r\n' \
+        # The accession has 3 files with the same content as another file (duplicate_file.txt and the zip files).
+        msg = '\r\nGenerating new FITS format identification information.\r\n' \
+              'FITS will identify 9 files, since 3 files have the same content as another file.\r\n\r\n' \
               'Generating new risk data for the analysis report.\r\n'
         self.assertEqual(iteration_one.stdout.decode('utf-8'), msg, 'Problem with Iteration_Message_1')
 